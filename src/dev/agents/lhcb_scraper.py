@@ -4,9 +4,10 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from time import sleep
 import json
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 import re
 
@@ -19,6 +20,16 @@ class LHCbPaper(BaseModel):
     data_taking_years: List[str]
     run_period: str
 
+PAPER_SCHEMA = pa.schema([
+    ("lhcb_paper_id", pa.string()),
+    ("title", pa.string()),
+    ("arxiv_id", pa.string()),
+    ("journal", pa.string()),
+    ("working_groups", pa.list_(pa.string())),
+    ("data_taking_years", pa.list_(pa.string())),
+    ("run_period", pa.string()),
+])
+
 def normalize_working_group(wg: str) -> str:
     """Convert working group label to snake_case format"""
     wg = wg.strip().lower()
@@ -57,34 +68,49 @@ def parse_years(years_cells: str) -> List[str]:
         return []
     return [year.strip() for year in years_cells.split() if year.strip().isdigit()]
 
+# Cell texts of every table row with at least 8 cells, gathered in the browser and
+# returned as one JSON document, so a page costs one WebDriver round trip
+TABLE_ROWS_JS = """
+return JSON.stringify(
+    Array.from(document.querySelectorAll('tr'))
+        .map(row => Array.from(row.querySelectorAll('td')).map(cell => cell.innerText))
+        .filter(cells => cells.length >= 8)
+);
+"""
+
+# Cheap fingerprint of the table content, used to detect that the next page rendered
+TABLE_SIGNATURE_JS = """
+const rows = document.querySelectorAll('tbody tr');
+return rows.length + '|' + (rows.length ? rows[0].innerText : '') + '|'
+    + (rows.length ? rows[rows.length - 1].innerText : '');
+"""
+
 def process_page(driver) -> List[LHCbPaper]:
-    """Process a single page of papers"""
+    """Process a single page of papers, extracting the whole table in one script call"""
     page_papers = []
-    rows = driver.find_elements(By.TAG_NAME, "tr")
-    
-    for row in rows:
-        cells = row.find_elements(By.TAG_NAME, "td")
-        if len(cells) >= 8:  # Make sure we have enough cells
-            try:
-                # Get the title from the Title column (index 2)
-                title = cells[2].text.strip()
-                years = parse_years(cells[7].text)
-                working_groups = parse_working_groups(cells[6].text)
-                
-                paper = LHCbPaper(
-                    lhcb_paper_id=cells[3].text.strip(),
-                    title=title,  # Added title field
-                    arxiv_id=cells[4].text.strip(),
-                    journal=cells[5].text.strip(),
-                    working_groups=working_groups,
-                    data_taking_years=years,
-                    run_period=determine_run_period(years)
-                )
-                page_papers.append(paper)
-                print(f"Parsed paper: {paper.lhcb_paper_id} - {paper.title[:50]}...")  # Added title to logging
-            except Exception as e:
-                print(f"Error parsing row: {e}")
-                continue
+    rows = json.loads(driver.execute_script(TABLE_ROWS_JS))
+    
+    for cells in rows:
+        try:
+            # Get the title from the Title column (index 2)
+            title = cells[2].strip()
+            years = parse_years(cells[7])
+            working_groups = parse_working_groups(cells[6])
+            
+            paper = LHCbPaper(
+                lhcb_paper_id=cells[3].strip(),
+                title=title,  # Added title field
+                arxiv_id=cells[4].strip(),
+                journal=cells[5].strip(),
+                working_groups=working_groups,
+                data_taking_years=years,
+                run_period=determine_run_period(years)
+            )
+            page_papers.append(paper)
+            print(f"Parsed paper: {paper.lhcb_paper_id} - {paper.title[:50]}...")  # Added title to logging
+        except Exception as e:
+            print(f"Error parsing row: {e}")
+            continue
     
     return page_papers
 
@@ -115,9 +141,13 @@ def scrape_papers():
                     print("Reached last page")
                     break
                     
+                signature = driver.execute_script(TABLE_SIGNATURE_JS)
                 next_button.click()
                 print("Moving to next page...")
-                sleep(1)
+                # wait for the table to change instead of sleeping a fixed time
+                WebDriverWait(driver, 10).until(
+                    lambda d: d.execute_script(TABLE_SIGNATURE_JS) != signature
+                )
                 
             except Exception as e:
                 print("No more pages found")
@@ -132,15 +162,16 @@ def scrape_papers():
     return all_papers
 
 def save_papers(papers: list):
-    """Save papers to pickle format, preserving all data structures"""
+    """Save papers to Parquet, with typed list columns for working groups and years"""
     paper_dicts = [paper.dict() for paper in papers]
     pd_df = pd.DataFrame(paper_dicts)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    pickle_path = f'lhcb_papers_{timestamp}.pkl'
+    parquet_path = f'lhcb_papers_{timestamp}.parquet'
     
-    pd_df.to_pickle(pickle_path)
-    print(f"\nSaved to: {pickle_path}")
+    table = pa.Table.from_pylist(paper_dicts, schema=PAPER_SCHEMA)
+    pq.write_table(table, parquet_path, compression="zstd")
+    print(f"\nSaved to: {parquet_path}")
     
     return pd_df
 
@@ -1 +1 @@
-from .inspire import InspireClient
+from .inspire import InspireClient, InspireSearch
@@ -0,0 +1,466 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import os
+import random
+import tarfile
+import tempfile
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from api_clients.http_cache import CacheEntry, ResponseCache
+from api_clients.rate_limit import AdaptiveRateLimiter
+
+Timeout = Union[float, Tuple[float, float]]
+
+# (connect, read) timeouts in seconds for the hosts the scraper talks to
+DEFAULT_HOST_TIMEOUTS: Dict[str, Timeout] = {
+    "inspirehep.net": (5.0, 30.0),
+    "arxiv.org": (5.0, 60.0),
+    "export.arxiv.org": (5.0, 60.0),
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# statuses signalling that the server wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+HTML_SIGNATURES = (b"<html", b"<!doctype")
+GZIP_MAGIC = b"\x1f\x8b"
+PDF_MAGIC = b"%PDF-"
+
+# payload types of arXiv e-prints told apart by ``sniff_source_format``
+SOURCE_FORMATS = ("tar.gz", "tar", "gz", "pdf", "html", "unknown")
+
+
+class DownloadError(Exception):
+    """Raised when a streamed download is rejected before completion."""
+
+
+class DownloadTooLarge(DownloadError):
+    """Raised when a download exceeds its size limit."""
+
+
+class UnexpectedContent(DownloadError):
+    """Raised when a download turns out to be an HTML page (e.g. a CAPTCHA)."""
+
+
+@dataclass(frozen=True)
+class DownloadResult:
+    """Outcome of a streamed download."""
+
+    path: Path
+    size: int
+    sha256: str
+    content_type: str
+    from_cache: bool = False
+
+
+def looks_like_html(head: bytes) -> bool:
+    """Check whether the first bytes of a body look like an HTML document."""
+    return head.lstrip()[:9].lower().startswith(HTML_SIGNATURES)
+
+
+def _is_tar_header(block: bytes) -> bool:
+    """Check whether a 512-byte block is a valid tar header (checksum included)."""
+    if len(block) < tarfile.BLOCKSIZE:
+        return False
+    try:
+        tarfile.TarInfo.frombuf(block[: tarfile.BLOCKSIZE], tarfile.ENCODING, "surrogateescape")
+    except tarfile.HeaderError:
+        return False
+    return True
+
+
+def sniff_source_format(path: Path) -> str:
+    """Identify the payload type of an arXiv e-print from its magic bytes.
+
+    arXiv serves most e-prints as gzipped tarballs, but single-file submissions
+    come as a gzipped ``.tex`` file, PDF-only submissions as a bare PDF, and
+    throttled requests as an HTML page.
+
+    Parameters
+    ------------
+    path : Path
+        Downloaded e-print
+
+    Returns
+    ------------
+    str
+        One of ``SOURCE_FORMATS``
+    """
+    with path.open("rb") as f:
+        head = f.read(tarfile.BLOCKSIZE)
+
+    if head.startswith(GZIP_MAGIC):
+        try:
+            with gzip.open(path) as f:
+                block = f.read(tarfile.BLOCKSIZE)
+        except (OSError, EOFError, zlib.error):
+            return "unknown"
+        return "tar.gz" if _is_tar_header(block) else "gz"
+    if head.startswith(PDF_MAGIC):
+        return "pdf"
+    if _is_tar_header(head):
+        return "tar"
+    if looks_like_html(head):
+        return "html"
+    return "unknown"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header, given in seconds or as an HTTP date.
+
+    Parameters
+    ------------
+    value : Optional[str]
+        Header value
+
+    Returns
+    ------------
+    Optional[float]
+        Seconds to wait, or None if the header is absent or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class _JitteredRetry(Retry):
+    """Retry policy adding uniform random jitter on top of exponential backoff.
+
+    Jitter spreads out retries from concurrent workers that failed at the same time,
+    so they do not hit the server again in lockstep.
+    """
+
+    def __init__(self, *args: Any, jitter: float = 0.0, **kwargs: Any) -> None:
+        self.jitter = jitter
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs: Any) -> "_JitteredRetry":
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        return retry
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.jitter)
+
+
+class HttpTransport:
+    """Pooled HTTP transport shared by every network call of the scraper.
+
+    Wraps a single ``requests.Session`` so that connections are kept alive in
+    per-host pools, responses are gzip-negotiated, and transient failures (429 and
+    5xx) are retried with jittered exponential backoff, honouring ``Retry-After``.
+    Non-streamed GETs are served from an optional on-disk ``ResponseCache``, and
+    requests that reach the network are paced by a per-host ``AdaptiveRateLimiter``.
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff_factor: float = 1.0,
+        backoff_jitter: float = 1.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 16,
+        timeout: Timeout = (5.0, 30.0),
+        host_timeouts: Optional[Dict[str, Timeout]] = None,
+        user_agent: str = "LHCbPaperBot/1.0 (Contact: your.email@example.com)",
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+    ) -> None:
+        """Initialize the transport.
+
+        Parameters
+        ------------
+        retries : int, default=3
+            Maximum number of retries for connection errors and retryable statuses
+        backoff_factor : float, default=1.0
+            Base of the exponential backoff between retries, in seconds
+        backoff_jitter : float, default=1.0
+            Upper bound of the uniform random jitter added to each backoff, in seconds
+        pool_connections : int, default=10
+            Number of per-host connection pools to keep
+        pool_maxsize : int, default=16
+            Maximum number of keep-alive connections per host pool
+        timeout : Timeout, default=(5.0, 30.0)
+            Fallback (connect, read) timeout for hosts without a specific entry
+        host_timeouts : Optional[Dict[str, Timeout]], default=None
+            Per-host timeouts, merged over ``DEFAULT_HOST_TIMEOUTS``
+        user_agent : str
+            User-Agent header sent with every request
+        cache : Optional[ResponseCache], default=None
+            On-disk response cache consulted (and revalidated) for every GET
+        limiter : Optional[AdaptiveRateLimiter], default=None
+            Per-host adaptive rate limiter; a non-persistent one limiting the arXiv
+            hosts is created if not given
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.host_timeouts = {**DEFAULT_HOST_TIMEOUTS, **(host_timeouts or {})}
+
+        retry = _JitteredRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            jitter=backoff_jitter,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"}
+        )
+
+    def __enter__(self) -> "HttpTransport":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def timeout_for(self, url: str) -> Timeout:
+        """Return the timeout configured for the host of ``url``.
+
+        Parameters
+        ------------
+        url : str
+            Request URL
+
+        Returns
+        ------------
+        Timeout
+            Host-specific timeout, or the transport-wide fallback
+        """
+        host = urlsplit(url).hostname or ""
+        return self.host_timeouts.get(host, self.timeout)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Issue a GET request through the shared session.
+
+        Parameters
+        ------------
+        url : str
+            Request URL
+        **kwargs
+            Forwarded to ``requests.Session.get``; ``timeout`` defaults to the
+            host-specific value
+
+        Returns
+        ------------
+        requests.Response
+            Response of the final attempt
+        """
+        kwargs.setdefault("timeout", self.timeout_for(url))
+        if self.cache is None or kwargs.get("stream"):
+            return self._send(url, **kwargs)
+
+        key = self.cache.request_key(url, kwargs.get("params"))
+        entry = self.cache.lookup(key)
+        if entry is not None and self.cache.offline:
+            cached = self.cache.load(entry)
+            if cached is not None:
+                return cached
+            entry = None
+
+        response = self._send(url, **self._revalidating(entry, kwargs))
+        if response.status_code == 304 and entry is not None:
+            cached = self.cache.load(entry)
+            if cached is not None:
+                return cached
+            # the body was evicted since the lookup: fetch it unconditionally
+            response = self._send(url, **kwargs)
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+    def download(
+        self,
+        url: str,
+        dest: Path,
+        max_bytes: Optional[int] = None,
+        reject_html: bool = False,
+        chunk_size: int = 1 << 16,
+        **kwargs: Any,
+    ) -> DownloadResult:
+        """Stream a response body to ``dest`` without holding it in memory.
+
+        The body is written in chunks to a temporary file next to ``dest`` while its
+        sha256 is computed, and atomically renamed into place once complete. The
+        transfer is aborted as soon as ``max_bytes`` is exceeded, or, with
+        ``reject_html``, if the first chunk is an HTML page. Bodies are served from,
+        and stored into, the response cache when one is configured.
+
+        Parameters
+        ------------
+        url : str
+            Request URL
+        dest : Path
+            Destination file
+        max_bytes : Optional[int], default=None
+            Maximum accepted body size
+        reject_html : bool, default=False
+            Reject HTML bodies (e.g. CAPTCHA pages served instead of a file)
+        chunk_size : int, default=64 KiB
+            Size of the chunks read from the network
+        **kwargs
+            Forwarded to ``requests.Session.get``
+
+        Returns
+        ------------
+        DownloadResult
+            Path, size, sha256 and content type of the downloaded body
+
+        Raises
+        ------------
+        requests.RequestException
+            On network errors and error statuses
+        DownloadTooLarge
+            If the body exceeds ``max_bytes``
+        UnexpectedContent
+            If ``reject_html`` is set and the body is an HTML page
+        """
+        kwargs.setdefault("timeout", self.timeout_for(url))
+        key = entry = None
+        if self.cache is not None:
+            key = self.cache.request_key(url, kwargs.get("params"))
+            entry = self.cache.lookup(key)
+            if entry is not None and self.cache.offline:
+                cached = self._materialize(entry, dest)
+                if cached is not None:
+                    return cached
+                entry = None
+
+        response = self._send(url, stream=True, **self._revalidating(entry, kwargs))
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            cached = self._materialize(entry, dest)
+            if cached is not None:
+                return cached
+            # the body was evicted since the lookup: fetch it unconditionally
+            response = self._send(url, stream=True, **kwargs)
+
+        with response:
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "").lower()
+            if reject_html and "text/html" in content_type:
+                raise UnexpectedContent(f"HTML response ({content_type}) from {url}")
+            declared = int(response.headers.get("Content-Length") or 0)
+            if max_bytes is not None and declared > max_bytes:
+                raise DownloadTooLarge(
+                    f"{url} declares {declared / 1024**2:.1f}MB "
+                    f"(limit {max_bytes / 1024**2:.1f}MB)"
+                )
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.")
+            tmp = Path(tmp_name)
+            digest, size = hashlib.sha256(), 0
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if size == 0 and reject_html and looks_like_html(chunk[:512]):
+                            raise UnexpectedContent(f"HTML body received from {url}")
+                        size += len(chunk)
+                        if max_bytes is not None and size > max_bytes:
+                            raise DownloadTooLarge(
+                                f"{url} exceeded {max_bytes / 1024**2:.1f}MB"
+                            )
+                        digest.update(chunk)
+                        f.write(chunk)
+                if self.cache is not None:
+                    self.cache.store_file(key, response, tmp, digest.hexdigest())
+                os.replace(tmp, dest)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+
+        return DownloadResult(dest, size, digest.hexdigest(), content_type)
+
+    def _revalidating(
+        self, entry: Optional[CacheEntry], kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Return the request arguments, with the revalidation headers of a cached
+        entry added, if any."""
+        if entry is None:
+            return kwargs
+        headers = {
+            **self.cache.conditional_headers(entry),
+            **(kwargs.get("headers") or {}),
+        }
+        return {**kwargs, "headers": headers}
+
+    def _materialize(self, entry: CacheEntry, dest: Path) -> Optional[DownloadResult]:
+        """Write a cached body to ``dest`` and describe it as a download result, or
+        return None if the body was evicted since the lookup."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if not self.cache.materialize(entry, dest):
+            return None
+        return DownloadResult(
+            dest,
+            entry.size,
+            entry.blob,
+            CaseInsensitiveDict(entry.headers).get("Content-Type", "").lower(),
+            from_cache=True,
+        )
+
+    def _send(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET over the network, paced and adapted by the host rate limiter."""
+        host = urlsplit(url).hostname or ""
+        self.limiter.acquire(host)
+        response = self.session.get(url, **kwargs)
+
+        # statuses of the attempts urllib3 already retried internally
+        retries = getattr(response.raw, "retries", None)
+        statuses = [h.status for h in getattr(retries, "history", ())]
+        statuses.append(response.status_code)
+        if any(status in THROTTLE_STATUSES for status in statuses):
+            self.limiter.on_throttle(
+                host, parse_retry_after(response.headers.get("Retry-After"))
+            )
+        elif response.ok:
+            self.limiter.on_success(host)
+        return response
+
+    def throttled(self, url: str) -> None:
+        """Report a throttling signal detected in a response body (e.g. a CAPTCHA
+        page served with status 200) for the host of ``url``."""
+        self.limiter.on_throttle(urlsplit(url).hostname or "")
+
+    def close(self) -> None:
+        """Close all pooled connections and the response cache, if any, and persist
+        the rate-limiter state."""
+        self.limiter.save()
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,346 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import requests
+from loguru import logger
+from requests.structures import CaseInsensitiveDict
+
+# headers describing the wire encoding of the original body, which no longer apply
+# once the decoded body is served from the cache
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+# fraction of the size cap eviction frees the cache down to, so that a full cache
+# is not scanned for eviction again on every store
+_EVICT_TO = 0.9
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Index record of a cached response."""
+
+    key: str
+    url: str
+    blob: str
+    size: int
+    headers: Dict[str, str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of HTTP GET responses.
+
+    Entries are keyed by the canonical request URL (including query parameters) and
+    point to bodies stored once per sha256 digest under ``blobs/``. Stale entries are
+    revalidated with ``If-None-Match``/``If-Modified-Since``, and least-recently-used
+    entries are evicted once the total size of the stored bodies exceeds the cap.
+    The total is counted once on opening and then kept up to date in memory, so
+    the cap is only approximate when several processes share the cache directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 4 * 1024**3,
+        offline: bool = False,
+    ) -> None:
+        """Open (creating if needed) the response cache.
+
+        Parameters
+        ------------
+        cache_dir : Path
+            Directory holding the index database and the content-addressed blobs
+        max_bytes : int, default=4 GiB
+            Size cap of the stored bodies, beyond which LRU entries are evicted
+        offline : bool, default=False
+            Serve cached responses without revalidating them against the server
+        """
+        self.cache_dir = cache_dir
+        self.blob_dir = cache_dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.offline = offline
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_dir / "index.sqlite", check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, blob TEXT NOT NULL, "
+                "size INTEGER NOT NULL, headers TEXT NOT NULL, etag TEXT, "
+                "last_modified TEXT, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)"
+            )
+        self._total = self.total_bytes()
+
+    @staticmethod
+    def request_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+        """Return the cache key of a GET request.
+
+        Parameters
+        ------------
+        url : str
+            Request URL
+        params : Optional[Mapping[str, Any]], default=None
+            Query parameters, in any order
+
+        Returns
+        ------------
+        str
+            sha256 hex digest of the canonical request URL
+        """
+        if params:
+            params = dict(sorted(params.items()))
+        prepared = requests.Request("GET", url, params=params).prepare()
+        return hashlib.sha256(prepared.url.encode()).hexdigest()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the cache entry for ``key``, if its body is still on disk."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, url, blob, size, headers, etag, last_modified "
+                "FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        entry = CacheEntry(*row[:4], json.loads(row[4]), *row[5:])
+        if not self._blob_path(entry.blob).exists():
+            self._delete(key, entry.blob)
+            return None
+        return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Return the revalidation headers for a cached entry."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _touch(self, entry: CacheEntry) -> None:
+        """Mark an entry as recently used."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (time.time(), entry.key),
+            )
+
+    def load(self, entry: CacheEntry) -> Optional[requests.Response]:
+        """Rebuild a response from a cache entry, marking it as recently used.
+
+        Parameters
+        ------------
+        entry : CacheEntry
+            Entry returned by ``lookup``
+
+        Returns
+        ------------
+        Optional[requests.Response]
+            Response with status 200 and the cached body and headers, or None if
+            the body was evicted since the lookup
+        """
+        try:
+            content = self._blob_path(entry.blob).read_bytes()
+        except FileNotFoundError:
+            self._delete(entry.key, entry.blob)
+            return None
+        self._touch(entry)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.headers["X-From-Cache"] = "1"
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = content
+        return response
+
+    def materialize(self, entry: CacheEntry, dest: Path) -> bool:
+        """Copy a cached body to ``dest`` (atomically), marking it as recently used.
+
+        Parameters
+        ------------
+        entry : CacheEntry
+            Entry returned by ``lookup``
+        dest : Path
+            Destination file
+
+        Returns
+        ------------
+        bool
+            False, leaving ``dest`` untouched, if the body was evicted since the
+            lookup
+        """
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.")
+        os.close(fd)
+        try:
+            shutil.copyfile(self._blob_path(entry.blob), tmp)
+            os.replace(tmp, dest)
+        except FileNotFoundError:
+            Path(tmp).unlink(missing_ok=True)
+            self._delete(entry.key, entry.blob)
+            return False
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._touch(entry)
+        return True
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """Store a successful response body and index it under ``key``.
+
+        Parameters
+        ------------
+        key : str
+            Cache key returned by ``request_key``
+        response : requests.Response
+            Fully read response with status 200
+        """
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=blob_path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, blob_path)
+        self._index(key, response, digest, len(body))
+
+    def store_file(
+        self, key: str, response: requests.Response, path: Path, digest: str
+    ) -> None:
+        """Store a response body already streamed to disk and index it under ``key``.
+
+        Parameters
+        ------------
+        key : str
+            Cache key returned by ``request_key``
+        response : requests.Response
+            Streamed response with status 200, providing the headers
+        path : Path
+            File holding the decoded body
+        digest : str
+            sha256 hex digest of the body
+        """
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=blob_path.parent)
+            os.close(fd)
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, blob_path)
+        self._index(key, response, digest, path.stat().st_size)
+
+    def _index(
+        self, key: str, response: requests.Response, digest: str, size: int
+    ) -> None:
+        """Point ``key`` at the blob ``digest``, dropping any blob it orphans."""
+        headers = {
+            k: v for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS
+        }
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT blob, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            known = self._conn.execute(
+                "SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (digest,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, url, blob, size, headers, etag, last_modified, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response.url,
+                    digest,
+                    size,
+                    json.dumps(headers),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    time.time(),
+                ),
+            )
+            orphaned = (
+                previous is not None
+                and previous[0] != digest
+                and not self._conn.execute(
+                    "SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (previous[0],)
+                ).fetchone()
+            )
+            if not known:
+                self._total += size
+            if orphaned:
+                self._total -= previous[1]
+        if orphaned:
+            self._blob_path(previous[0]).unlink(missing_ok=True)
+        self.evict()
+
+    def _delete(self, key: str, blob: Optional[str] = None) -> int:
+        """Drop an index entry (only if it still points to ``blob``, when given),
+        removing its blob if no other entry references it.
+
+        Returns the number of bytes freed on disk.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT blob, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (blob is not None and row[0] != blob):
+                return 0
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            shared = self._conn.execute(
+                "SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (row[0],)
+            ).fetchone()
+            if not shared:
+                self._total -= row[1]
+        if shared:
+            return 0
+        self._blob_path(row[0]).unlink(missing_ok=True)
+        return row[1]
+
+    def total_bytes(self) -> int:
+        """Return the total size of the distinct bodies referenced by the index."""
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM "
+                "(SELECT blob, MAX(size) AS size FROM entries GROUP BY blob)"
+            ).fetchone()
+        return total
+
+    def evict(self) -> None:
+        """Once the cache exceeds its cap, evict least-recently-used entries until
+        it is back below ``_EVICT_TO`` of the cap."""
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            rows = self._conn.execute(
+                "SELECT key FROM entries ORDER BY last_access ASC"
+            ).fetchall()
+        target = int(self.max_bytes * _EVICT_TO)
+        for (key,) in rows:
+            self._delete(key)
+            if self._total <= target:
+                break
+        logger.debug(f"HTTP cache evicted down to {self._total / 1024**2:.1f}MB")
+
+    def close(self) -> None:
+        """Close the index database."""
+        self._conn.close()
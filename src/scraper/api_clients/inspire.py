@@ -1,18 +1,248 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Sequence, Set, Tuple
 from pathlib import Path
 import requests
 import tarfile
-from pydantic import BaseModel, ConfigDict
+import gzip
+import zlib
+import json
+from pydantic import BaseModel, ConfigDict, ValidationError
 from loguru import logger
-import subprocess
-import os
+import re
+import math
+import heapq
+import mmap
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import islice
 from tqdm import tqdm
+from core.latex_expand import (
+    BEGIN_DOCUMENT,
+    DOCUMENTCLASS_BYTES_RE,
+    HEADER_CHARS,
+    INCLUDE_TARGET_BYTES_RE,
+    UnsupportedLatex,
+    reference_key,
+    expand_members,
+    find_main_member,
+    main_file_score,
+    decode_tex,
+    include_targets,
+    normalize_member_name,
+    pick_main_file,
+    text_members,
+)
+from core.blob_store import BlobStore, write_atomic
+from core.extraction import MEMBER_LISTING, ExtractionPolicy
+from core.inspire_dump import iter_dump_hits, matches_lhcb_query
+from core.latexpand_runner import LatexpandRunner
+from core.manifest import ArtifactManifest, sha256_file
 from core.models import LHCbPaper
-import time
+from api_clients.http import (
+    DownloadError,
+    DownloadTooLarge,
+    HttpTransport,
+    UnexpectedContent,
+    sniff_source_format,
+)
+from api_clients.rate_limit import TokenBucket
 import shutil
-import tarfile
 
-class InspireClient:
+# file name given to the sources of single-file (gzipped .tex) submissions
+SINGLE_FILE_NAME = "main.tex"
+
+# default endpoints; overridable, e.g. to point the client at a mock server
+INSPIRE_API_URL = "https://inspirehep.net/api"
+ARXIV_URL = "https://arxiv.org"
+ARXIV_EXPORT_URL = "http://export.arxiv.org"
+
+# lower bound of the date windows listings are partitioned into
+EARLIEST_PAPER_DATE = date(1900, 1, 1)
+
+# sort orders full listings can be recombined in from their date windows
+WINDOWED_SORT_ORDERS = ("mostcited", "mostrecent")
+
+
+class InspireSearch:
+    """Client for the INSPIRE-HEP literature search API.
+
+    Holds the HTTP transport, the INSPIRE rate limiter and the batched metadata
+    queries, and needs no download directories, so metadata-only tools (e.g.
+    refreshing citation counts) can use it on its own.
+    """
+
+    def __init__(
+        self,
+        base_url: str = INSPIRE_API_URL,
+        max_workers: int = 4,
+        requests_per_second: float = 3.0,
+        burst: int = 15,
+        transport: Optional[HttpTransport] = None,
+    ) -> None:
+        """Initialize the search client.
+
+        Parameters
+        ------------
+        base_url : str, default=INSPIRE_API_URL
+            Base URL of the INSPIRE REST API
+        max_workers : int, default=4
+            Maximum number of queries run concurrently against INSPIRE
+        requests_per_second : float, default=3.0
+            Sustained INSPIRE request rate; INSPIRE allows 15 requests per 5 s per IP
+        burst : int, default=15
+            Maximum number of INSPIRE requests issued back-to-back
+        transport : Optional[HttpTransport], default=None
+            Pooled HTTP transport used for every request; a default one is created
+            (and closed on exit) if not given
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(rate=requests_per_second, capacity=burst)
+        self._owns_transport = transport is None
+        self.http = transport or HttpTransport()
+
+    def __enter__(self) -> "InspireSearch":
+        """Context manager entry point.
+
+        Returns
+        ------------
+        InspireSearch
+            The client instance
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Context manager exit point."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the HTTP transport, if the client created it."""
+        if self._owns_transport:
+            self.http.close()
+
+    @staticmethod
+    def normalize_arxiv_id(arxiv_id: str) -> str:
+        """Normalize an arXiv identifier for matching, dropping any ``arXiv:``
+        prefix and version suffix (e.g. ``arXiv:2401.01234v2`` -> ``2401.01234``).
+
+        Parameters
+        ----------
+        arxiv_id : str
+            arXiv identifier as found in INSPIRE records or scraped tables
+
+        Returns
+        -------
+        str
+            Normalized identifier
+        """
+        arxiv_id = re.sub(r"^arxiv:", "", arxiv_id.strip(), flags=re.IGNORECASE)
+        return re.sub(r"v\d+$", "", arxiv_id)
+
+    def _get_page(self, params: Dict[str, Any], page: int) -> Dict[str, Any]:
+        """Fetch a single page of INSPIRE literature search results.
+
+        Parameters
+        ------------
+        params : Dict[str, Any]
+            Query parameters, including the page size
+        page : int
+            1-based page number to fetch
+
+        Returns
+        ------------
+        Dict[str, Any]
+            Decoded JSON response
+        """
+        self.rate_limiter.acquire()
+        response = self.http.get(
+            f"{self.base_url}/literature", params={**params, "page": page}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _fetch_arxiv_batch(
+        self, arxiv_ids: Sequence[str], fields: str
+    ) -> List[Dict[str, Any]]:
+        """Fetch the INSPIRE records of a batch of arXiv IDs in one OR-combined query."""
+        params = {
+            "q": " or ".join(f"arxiv:{arxiv_id}" for arxiv_id in arxiv_ids),
+            "fields": [fields],
+            "size": len(arxiv_ids),
+        }
+        return self._get_page(params, 1)["hits"]["hits"]
+
+    def fetch_by_arxiv_ids(
+        self,
+        arxiv_ids: Sequence[str],
+        batch_size: int = 50,
+        fields: str = "titles,arxiv_eprints,citation_count,abstracts,control_number",
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Fetch INSPIRE metadata for many arXiv IDs using batched queries.
+
+        IDs are grouped into OR-combined queries of ``batch_size`` IDs, which are run
+        concurrently (bounded by ``max_workers`` and the INSPIRE rate limiter); hits
+        are mapped back to the requested IDs through their arXiv e-prints.
+
+        Parameters
+        ----------
+        arxiv_ids : Sequence[str]
+            arXiv identifiers to look up
+        batch_size : int, default=50
+            Number of IDs combined into a single query
+        fields : str
+            Comma-separated INSPIRE metadata fields to request
+
+        Returns
+        -------
+        Tuple[Dict[str, Dict[str, Any]], List[str]]
+            Metadata keyed by the requested arXiv ID, and the requested IDs for which
+            no INSPIRE record could be retrieved
+        """
+        wanted = {self.normalize_arxiv_id(a): a for a in arxiv_ids if a}
+        keys = list(wanted)
+        batches = [keys[i : i + batch_size] for i in range(0, len(keys), batch_size)]
+
+        found: Dict[str, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._fetch_arxiv_batch, batch, fields): batch
+                for batch in batches
+            }
+            for future in tqdm(
+                futures, desc="Fetching INSPIRE metadata by arXiv ID", total=len(batches)
+            ):
+                try:
+                    batch_found = {}
+                    for hit in future.result():
+                        metadata = hit["metadata"]
+                        for eprint in metadata.get("arxiv_eprints", []):
+                            key = self.normalize_arxiv_id(eprint.get("value", ""))
+                            if key in wanted:
+                                batch_found[wanted[key]] = metadata
+                except requests.RequestException as e:
+                    logger.error(
+                        f"INSPIRE query failed for {len(futures[future])} arXiv IDs: {e}"
+                    )
+                    continue
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # undecodable body or unexpected response shape; the whole batch
+                    # is reported missing rather than partially matched
+                    logger.error(
+                        f"Malformed INSPIRE response for {len(futures[future])} arXiv IDs: "
+                        f"{type(e).__name__}: {e}"
+                    )
+                    continue
+                found.update(batch_found)
+
+        missing = [wanted[key] for key in keys if wanted[key] not in found]
+        logger.info(
+            f"Retrieved INSPIRE metadata for {len(found)}/{len(keys)} arXiv IDs "
+            f"in {len(batches)} queries"
+        )
+        return found, missing
+
+
+class InspireClient(InspireSearch):
     """Client for interacting with the INSPIRE-HEP API."""
 
     def __init__(
@@ -21,6 +251,20 @@ class InspireClient:
         pdf_dir: Path = Path("data/pdfs"),
         source_dir: Path = Path("data/source"),
         expanded_tex_dir: Path = Path("data/expanded_tex"),
+        max_workers: int = 4,
+        page_size: int = 250,
+        requests_per_second: float = 3.0,
+        burst: int = 15,
+        transport: Optional[HttpTransport] = None,
+        max_download_bytes: int = 50 * 1024 * 1024,
+        manifest: Optional[ArtifactManifest] = None,
+        extraction_policy: ExtractionPolicy = ExtractionPolicy(),
+        latexpand_timeout: float = 60.0,
+        blob_store: Optional[BlobStore] = None,
+        base_url: str = INSPIRE_API_URL,
+        arxiv_url: str = ARXIV_URL,
+        arxiv_export_url: str = ARXIV_EXPORT_URL,
+        window_hits: int = 1000,
     ) -> None:
         """Initialize the INSPIRE-HEP client.
 
@@ -34,8 +278,50 @@ class InspireClient:
             Directory for storing LaTeX source files
         expanded_tex_dir : Path, default=Path("data/expanded_tex")
             Directory for storing expanded LaTeX files
+        max_workers : int, default=4
+            Maximum number of result pages fetched concurrently from INSPIRE
+        page_size : int, default=250
+            Number of records requested per page (250 is the INSPIRE maximum)
+        requests_per_second : float, default=3.0
+            Sustained INSPIRE request rate; INSPIRE allows 15 requests per 5 s per IP
+        burst : int, default=15
+            Maximum number of INSPIRE requests issued back-to-back
+        transport : Optional[HttpTransport], default=None
+            Pooled HTTP transport used for every request; a default one is created
+            (and closed on exit) if not given
+        max_download_bytes : int, default=50 MB
+            Size above which PDF and source downloads are aborted mid-transfer
+        manifest : Optional[ArtifactManifest], default=None
+            Artifact manifest recording every produced artifact; artifacts it holds
+            as still valid are not downloaded or rebuilt again
+        extraction_policy : ExtractionPolicy, default=ExtractionPolicy()
+            Which members of source tarballs are extracted to disk (by default
+            TeX-related files up to 5 MB) and whether a member listing is kept
+        latexpand_timeout : float, default=60.0
+            Seconds after which a latexpand job (and its process group) is killed
+        blob_store : Optional[BlobStore], default=None
+            Content-addressed store every produced artifact is deduplicated into;
+            the directory layout above is then made of links to its blobs
+        base_url : str, default=INSPIRE_API_URL
+            Base URL of the INSPIRE REST API
+        arxiv_url : str, default=ARXIV_URL
+            Base URL of the arXiv PDF and e-print links given to papers
+        arxiv_export_url : str, default=ARXIV_EXPORT_URL
+            Base URL of the arXiv mirror e-prints are downloaded from
+        window_hits : int, default=1000
+            Maximum number of results of the date windows full listings are split
+            into, i.e. the deepest offset ever paged to
         """
-        self.base_url = "https://inspirehep.net/api"
+        super().__init__(base_url, max_workers, requests_per_second, burst, transport)
+        self.arxiv_url = arxiv_url.rstrip("/")
+        self.arxiv_export_url = arxiv_export_url.rstrip("/")
+        self.page_size = page_size
+        self.window_hits = window_hits
+        self.max_download_bytes = max_download_bytes
+        self.manifest = manifest
+        self.extraction_policy = extraction_policy
+        self.latexpand = LatexpandRunner(timeout=latexpand_timeout)
+        self.blob_store = blob_store
         self.abstract_dir = abstract_dir
         self.pdf_dir = pdf_dir
         self.source_dir = source_dir
@@ -49,20 +335,6 @@ class InspireClient:
         ]:
             directory.mkdir(parents=True, exist_ok=True)
 
-    def __enter__(self) -> "InspireClient":
-        """Context manager entry point.
-
-        Returns
-        ------------
-        InspireClient
-            The client instance
-        """
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Context manager exit point."""
-        pass
-
     @staticmethod
     def get_arxiv_abstract(abstracts_list: List[Dict[str, Any]]) -> Optional[str]:
         """Extract arXiv abstract if available, otherwise take the first available abstract.
@@ -88,76 +360,310 @@ class InspireClient:
         # If no arXiv abstract, take the first available one
         return abstracts_list[0].get("value")
 
-    def _fetch_papers(self, params: dict) -> List[LHCbPaper]:
-        """Internal method to handle API requests and paper object creation.
-        Handles pagination to fetch all results when no size limit is specified.
+    def _paper_from_hit(self, hit: Dict[str, Any]) -> LHCbPaper:
+        """Build a paper object from a single INSPIRE literature hit.
+
+        Parameters
+        ------------
+        hit : Dict[str, Any]
+            Hit record as returned by the INSPIRE literature endpoint
+
+        Returns
+        ------------
+        LHCbPaper
+            Paper object populated from the hit metadata
+        """
+        metadata = hit["metadata"]
+        arxiv_id = None
+        if metadata.get("arxiv_eprints"):
+            arxiv_id = metadata["arxiv_eprints"][0].get("value")
+
+        return LHCbPaper(
+            lhcb_paper_id=None,
+            title=metadata["titles"][0]["title"],
+            citations=metadata.get("citation_count", 0),
+            arxiv_id=arxiv_id,
+            run_period=None,
+            abstract=self.get_arxiv_abstract(metadata.get("abstracts", [])) or "",
+            arxiv_pdf=f"{self.arxiv_url}/pdf/{arxiv_id}.pdf" if arxiv_id else None,
+            latex_source=f"{self.arxiv_url}/e-print/{arxiv_id}" if arxiv_id else None,
+            control_number=metadata.get("control_number"),
+            updated=hit.get("updated"),
+        )
+
+    def _iter_papers(
+        self,
+        params: dict,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[LHCbPaper]:
+        """Internal generator yielding paper objects page by page.
+
+        Without a ``size`` entry in ``params`` the whole listing is wanted, and it is
+        fetched in date windows (see ``_iter_windowed_papers``), so no request pages
+        deeper than ``window_hits`` results. A ``size`` entry caps the total number
+        of papers yielded; the top results in server sort order are then fetched by
+        offset paging: the first page is fetched on its own to learn the total number
+        of hits, the remaining pages concurrently, at most ``max_workers`` pages
+        ahead of the consumer (bounded by the INSPIRE rate limiter).
         """
         # Copy params so we don't modify the original
         params = params.copy()
-        
-        # Make initial request to get total number of papers
-        response = requests.get(f"{self.base_url}/literature", params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        total_hits = data['hits']['total']
+        max_results = params.pop("size", None)
+        if max_results is None:
+            yield from self._iter_windowed_papers(params, start_date, end_date)
+            return
+
+        page_size = min(max_results, self.page_size)
+        params["size"] = page_size
+
+        data = self._get_page(params, 1)
+        total_hits = data["hits"]["total"]
         logger.info(f"Total papers available: {total_hits}")
-        
-        if 'size' not in params:
-            # No limit specified - fetch all papers
-            params['size'] = 250  # API maximum per request
-            papers = []
-            
-            for page in tqdm(range(1, (total_hits // 250) + 2), desc="Fetching LHCb papers from INSPIRE API"):
-                params['page'] = page
-                response = requests.get(f"{self.base_url}/literature", params=params)
-                response.raise_for_status()
-                
-                for hit in response.json()['hits']['hits']:
-                    metadata = hit['metadata']
-                    arxiv_id = None
-                    if 'arxiv_eprints' in metadata and metadata['arxiv_eprints']:
-                        arxiv_id = metadata['arxiv_eprints'][0].get('value')
-
-                    print(arxiv_id)
-                    print(metadata)
-
-                    paper = LHCbPaper(
-                        title=metadata['titles'][0]['title'],
-                        citations=metadata.get('citation_count', 0),
-                        arxiv_id=arxiv_id,
-                        abstract=self.get_arxiv_abstract(metadata.get('abstracts', [])),
-                        arxiv_pdf=f"https://arxiv.org/pdf/{arxiv_id}.pdf" if arxiv_id else None,
-                        latex_source=f"https://arxiv.org/e-print/{arxiv_id}" if arxiv_id else None
+
+        remaining = min(total_hits, max_results)
+        pages = iter(range(2, math.ceil(remaining / page_size) + 1))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque(
+                executor.submit(self._get_page, params, page)
+                for page in islice(pages, self.max_workers)
+            )
+            while True:
+                hits = data["hits"]["hits"][:remaining]
+                remaining -= len(hits)
+                for hit in hits:
+                    yield self._paper_from_hit(hit)
+
+                if not pending or remaining <= 0:
+                    break
+                data = pending.popleft().result()
+                next_page = next(pages, None)
+                if next_page is not None:
+                    pending.append(executor.submit(self._get_page, params, next_page))
+
+    @staticmethod
+    def _window_params(params: Dict[str, Any], window: Tuple[date, date]) -> Dict[str, Any]:
+        """Restrict a literature query to the papers dated within ``window`` (inclusive)."""
+        start, end = window
+        return {
+            **params,
+            "q": f"{params['q']} and date>={start.isoformat()} and date<={end.isoformat()}",
+        }
+
+    def _probe_total(self, params: Dict[str, Any]) -> int:
+        """Return the number of hits of a literature query, fetching a single hit."""
+        return self._get_page({**params, "size": 1}, 1)["hits"]["total"]
+
+    def _plan_windows(
+        self, params: Dict[str, Any], window: Tuple[date, date], executor: ThreadPoolExecutor
+    ) -> List[Tuple[Tuple[date, date], int]]:
+        """Partition a date range into disjoint windows of at most ``window_hits`` hits.
+
+        Windows are probed level by level, concurrently, for their number of hits
+        only; windows with too many hits are split in half and probed again. A
+        single day with too many hits is kept as it is, and paged by offset.
+
+        Returns
+        ------------
+        List[Tuple[Tuple[date, date], int]]
+            Non-empty windows in chronological order, each with its number of hits
+        """
+        leaves = []
+        pending = [window]
+        while pending:
+            probes = [
+                (w, executor.submit(self._probe_total, self._window_params(params, w)))
+                for w in pending
+            ]
+            pending = []
+            for (start, end), probe in probes:
+                total = probe.result()
+                if total > self.window_hits and start < end:
+                    middle = start + timedelta(days=(end - start).days // 2)
+                    pending += [(start, middle), (middle + timedelta(days=1), end)]
+                    continue
+                if total > self.window_hits:
+                    logger.warning(
+                        f"{total} papers dated {start}, more than {self.window_hits}: "
+                        "paging this day by offset"
                     )
-                    papers.append(paper)
-                
-                if len(response.json()['hits']['hits']) < 250:
-                    break 
-        else:
-            # Size limit specified - fetch single page
-            papers = [
-                LHCbPaper(
-                    title=hit['metadata']['titles'][0]['title'],
-                    citations=hit['metadata'].get('citation_count', 0),
-                    arxiv_id=hit['metadata']['arxiv_eprints'][0].get('value') if 'arxiv_eprints' in hit['metadata'] and hit['metadata']['arxiv_eprints'] else None,
-                    abstract=self.get_arxiv_abstract(hit['metadata'].get('abstracts', [])),
-                    # Use the locally scoped arxiv_id from the previous line
-                    arxiv_pdf=f"https://arxiv.org/pdf/{hit['metadata']['arxiv_eprints'][0].get('value')}.pdf" if 'arxiv_eprints' in hit['metadata'] and hit['metadata']['arxiv_eprints'] else None,
-                    latex_source=f"https://arxiv.org/e-print/{hit['metadata']['arxiv_eprints'][0].get('value')}" if 'arxiv_eprints' in hit['metadata'] and hit['metadata']['arxiv_eprints'] else None
+                if total:
+                    leaves.append(((start, end), total))
+        return sorted(leaves)
+
+    def _iter_query_hits(
+        self,
+        params: Dict[str, Any],
+        total: int,
+        executor: ThreadPoolExecutor,
+        depth: int,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the hits of a query with ``total`` hits by offset paging, in server
+        sort order, keeping at most ``depth`` pages in flight."""
+        pages = iter(range(1, math.ceil(total / self.page_size) + 1))
+        pending = deque(
+            executor.submit(self._get_page, params, page) for page in islice(pages, depth)
+        )
+        while pending:
+            data = pending.popleft().result()
+            next_page = next(pages, None)
+            if next_page is not None:
+                pending.append(executor.submit(self._get_page, params, next_page))
+            yield from data["hits"]["hits"]
+
+    def _iter_windowed_papers(
+        self,
+        params: Dict[str, Any],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[LHCbPaper]:
+        """Yield every paper of a query, fetched in disjoint date windows.
+
+        Offset paging re-sorts the whole result set on the server for every page,
+        and INSPIRE refuses to page past a fixed depth, so listings of any size are
+        instead partitioned by paper date into windows of at most ``window_hits``
+        results (see ``_plan_windows``). Records without a date fall outside every
+        window; for an unrestricted listing they are fetched by a remainder query,
+        and any hits still unaccounted for are logged.
+
+        The windows are recombined in the ``sort`` order of the query: for
+        ``mostrecent`` they are paged one after the other, newest first, at most
+        ``max_workers`` pages ahead of the consumer; for ``mostcited`` they are paged
+        side by side and merged by citation count, holding one page per window.
+
+        Parameters
+        ------------
+        params : Dict[str, Any]
+            Query parameters, without a size
+        start_date : Optional[str], default=None
+            First date (YYYY-MM-DD) of the query, if it is restricted
+        end_date : Optional[str], default=None
+            Last date (YYYY-MM-DD) of the query, if it is restricted
+
+        Yields
+        ------------
+        LHCbPaper
+            Papers of the query
+
+        Raises
+        ------------
+        ValueError
+            If the query is sorted in an order the windows cannot be merged in
+        """
+        sort_by = params.get("sort", "mostrecent")
+        if sort_by not in WINDOWED_SORT_ORDERS:
+            raise ValueError(
+                f"Cannot list all papers sorted by '{sort_by}': full listings are "
+                f"sorted by one of {', '.join(WINDOWED_SORT_ORDERS)}"
+            )
+        params = {**params, "size": self.page_size}
+        window = (
+            date.fromisoformat(start_date) if start_date else EARLIEST_PAPER_DATE,
+            date.fromisoformat(end_date) if end_date else date.today() + timedelta(days=1),
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            leaves = self._plan_windows(params, window, executor)
+            # newest first, as ``mostrecent`` sorts
+            queries = [(self._window_params(params, w), total) for w, total in reversed(leaves)]
+            n_listed = sum(total for _, total in queries)
+
+            if not (start_date or end_date):
+                n_total = self._probe_total(params)
+                if n_total > n_listed:
+                    remainder_params = {**params, "q": f"{params['q']} and not date:*"}
+                    n_remainder = self._probe_total(remainder_params)
+                    if n_remainder:
+                        # undated records sort last by date
+                        queries.append((remainder_params, n_remainder))
+                        n_listed += n_remainder
+                    if n_total > n_listed:
+                        logger.warning(
+                            f"{n_total - n_listed} of {n_total} papers fall outside the "
+                            "date windows and are not listed"
+                        )
+            logger.info(f"Total papers available: {n_listed} in {len(leaves)} date windows")
+
+            if sort_by == "mostcited":
+                hits: Iterator[Dict[str, Any]] = heapq.merge(
+                    *(self._iter_query_hits(q, total, executor, 1) for q, total in queries),
+                    key=lambda hit: -hit["metadata"].get("citation_count", 0),
+                )
+            else:
+                hits = (
+                    hit
+                    for q, total in queries
+                    for hit in self._iter_query_hits(q, total, executor, self.max_workers)
                 )
-                for hit in data['hits']['hits']
-            ] 
-        
+
+            seen = set()
+            for hit in hits:
+                # records shifting between windows while paging must not repeat
+                control_number = hit["metadata"].get("control_number")
+                if control_number is not None:
+                    if control_number in seen:
+                        continue
+                    seen.add(control_number)
+                yield self._paper_from_hit(hit)
+
+    def _fetch_papers(
+        self,
+        params: dict,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[LHCbPaper]:
+        """Internal method to handle API requests and paper object creation.
+        Handles pagination to fetch all results, see ``_iter_papers``.
+        """
+        papers = list(
+            tqdm(
+                self._iter_papers(params, start_date, end_date),
+                desc="Fetching LHCb papers from INSPIRE API",
+                unit="paper",
+            )
+        )
+
         logger.info(f"Fetching COMPLETE: identified {len(papers)} papers on INSPIRE in TOTAL.")
         return papers
 
+    @staticmethod
+    def _lhcb_query_params(
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        max_results: Optional[int] = None,
+        sort_by: str = "mostcited",
+        updated_since: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the INSPIRE literature query parameters for LHCb papers, see
+        ``fetch_lhcb_papers``."""
+        query = 'collaboration:"LHCb" and document_type:article'
+        if start_date:
+            query += f" and date>={start_date}"
+        if end_date:
+            query += f" and date<={end_date}"
+        if updated_since:
+            query += f" and du>={updated_since}"
+
+        params = {
+            "q": query,
+            "sort": sort_by,
+            "fields": ["titles,arxiv_eprints,dois,citation_count,abstracts,control_number"],
+        }
+
+        # if explicit limit is set on number of papers, cap the fetched results
+        if max_results is not None:
+            params["size"] = max_results
+
+        return params
+
     def fetch_lhcb_papers(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         max_results: Optional[int] = None,
         sort_by: str = "mostcited",
+        updated_since: Optional[str] = None,
     ) -> List[LHCbPaper]:
         """Fetch LHCb collaboration papers from INSPIRE-HEP API.
 
@@ -170,30 +676,222 @@ class InspireClient:
         max_results : Optional[int], default=None
             Maximum number of papers to retrieve
         sort_by : str, default='mostcited'
-            Sorting method for results ('mostcited', 'mostrecent')
+            Sorting method for results ('mostcited', 'mostrecent'); without
+            ``max_results`` the listing is fetched in date windows, which are merged
+            back in this order (only these two orders are supported then)
+        updated_since : Optional[str], default=None
+            Only return records created or updated on INSPIRE on or after this date
+            (YYYY-MM-DD)
 
         Returns
         ------------
         List[LHCbPaper]
-            List of paper objects matching the search criteria
+            List of paper objects matching the search criteria, in ``sort_by`` order
+
+        Raises
+        ------------
+        ValueError
+            If ``max_results`` is not set and ``sort_by`` is not supported for
+            windowed listings
         """
-        query = 'collaboration:"LHCb" and document_type:article'
-        if start_date:
-            query += f" and date>={start_date}"
-        if end_date:
-            query += f" and date<={end_date}"
+        return self._fetch_papers(
+            self._lhcb_query_params(
+                start_date, end_date, max_results, sort_by, updated_since
+            ),
+            start_date,
+            end_date,
+        )
 
-        params = {
-            "q": query,
-            "sort": sort_by,
-            "fields": ["titles,arxiv_eprints,dois,citation_count,abstracts"],
-        }
+    def iter_lhcb_papers(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        max_results: Optional[int] = None,
+        sort_by: str = "mostcited",
+        updated_since: Optional[str] = None,
+    ) -> Iterator[LHCbPaper]:
+        """Stream LHCb collaboration papers from INSPIRE-HEP API.
 
-        # if explicit limit is set on number of papers, cap the fetched results
+        Generator counterpart of ``fetch_lhcb_papers``: papers are yielded as soon as
+        their result page arrives, keeping at most ``max_workers`` pages in flight,
+        so consumers can start processing before the listing is complete.
+
+        Parameters
+        ------------
+        start_date : str, optional
+            Start date in YYYY-MM-DD format
+        end_date : str, optional
+            End date in YYYY-MM-DD format
+        max_results : Optional[int], default=None
+            Maximum number of papers to retrieve
+        sort_by : str, default='mostcited'
+            Sorting method for results ('mostcited', 'mostrecent'), see
+            ``fetch_lhcb_papers``
+        updated_since : Optional[str], default=None
+            Only return records created or updated on INSPIRE on or after this date
+            (YYYY-MM-DD)
+
+        Yields
+        ------------
+        LHCbPaper
+            Paper objects matching the search criteria, in ``sort_by`` order
+
+        Raises
+        ------------
+        ValueError
+            If ``max_results`` is not set and ``sort_by`` is not supported for
+            windowed listings
+        """
+        yield from self._iter_papers(
+            self._lhcb_query_params(
+                start_date, end_date, max_results, sort_by, updated_since
+            ),
+            start_date,
+            end_date,
+        )
+
+    def iter_dump_papers(
+        self,
+        dump: Path,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        max_results: Optional[int] = None,
+        sort_by: str = "mostcited",
+        updated_since: Optional[str] = None,
+    ) -> Iterator[LHCbPaper]:
+        """Stream LHCb collaboration papers from a local INSPIRE literature dump.
+
+        Offline counterpart of ``iter_lhcb_papers``: the dump is parsed line by line
+        and the LHCb article query, with its date restrictions, is evaluated locally
+        (see ``core.inspire_dump``); papers are built exactly as from API hits.
+        Without ``max_results`` papers are yielded in dump order; with it, the top
+        ``max_results`` papers in ``sort_by`` order are kept in a bounded heap.
+
+        Parameters
+        ------------
+        dump : Path
+            JSONL literature dump, optionally gzipped
+        start_date : str, optional
+            Start date in YYYY-MM-DD format
+        end_date : str, optional
+            End date in YYYY-MM-DD format
+        max_results : Optional[int], default=None
+            Maximum number of papers to retrieve
+        sort_by : str, default='mostcited'
+            Order in which the ``max_results`` papers are selected ('mostcited',
+            'mostrecent')
+        updated_since : Optional[str], default=None
+            Only return records updated on or after this date (YYYY-MM-DD)
+
+        Yields
+        ------------
+        LHCbPaper
+            Paper objects matching the search criteria
+        """
+        hits = (
+            hit
+            for hit in iter_dump_hits(dump)
+            if matches_lhcb_query(hit, start_date, end_date, updated_since)
+        )
         if max_results is not None:
-            params["size"] = max_results
+            field, missing = (
+                ("earliest_date", "") if sort_by == "mostrecent" else ("citation_count", 0)
+            )
+            hits = iter(
+                heapq.nlargest(
+                    max_results, hits, key=lambda hit: hit["metadata"].get(field, missing)
+                )
+            )
 
-        return self._fetch_papers(params)
+        n_papers = 0
+        for hit in hits:
+            try:
+                paper = self._paper_from_hit(hit)
+            except (KeyError, IndexError) as e:
+                logger.warning(
+                    f"Skipping dump record {hit['metadata'].get('control_number')}: "
+                    f"missing {e}"
+                )
+                continue
+            except ValidationError as e:
+                logger.warning(
+                    f"Skipping dump record {hit['metadata'].get('control_number')}: "
+                    f"invalid metadata: {e}"
+                )
+                continue
+            n_papers += 1
+            yield paper
+        logger.info(f"Read {n_papers} LHCb papers from {dump}")
+
+    def completed_artifact(self, paper: LHCbPaper, artifact: str) -> Optional[Path]:
+        """Return the path of an artifact the manifest holds as still valid.
+
+        Parameters
+        ------------
+        paper : LHCbPaper
+            Paper object
+        artifact : str
+            Artifact type ('pdf', 'abstract', 'source', 'expanded_tex')
+
+        Returns
+        ------------
+        Optional[Path]
+            Path of the artifact, or None if there is no manifest or the artifact
+            has to be (re)produced
+        """
+        if self.manifest is None or not paper.arxiv_id:
+            return None
+        path = self.manifest.completed(paper.arxiv_id, artifact, paper.updated)
+        if path is None and self.blob_store is not None:
+            # deleted from the legacy layout but still held in the blob store
+            recorded = self.manifest.recorded_path(paper.arxiv_id, artifact)
+            if recorded and self.blob_store.restore(paper.arxiv_id, recorded):
+                path = self.manifest.completed(paper.arxiv_id, artifact, paper.updated)
+        if path is not None:
+            logger.debug(f"Skipping {artifact} of {paper.arxiv_id}: valid at {path}")
+        return path
+
+    def no_source(self, paper: LHCbPaper) -> bool:
+        """Check whether the manifest holds the paper's e-print as having no LaTeX
+        source (e.g. a PDF-only submission), so it need not be downloaded again."""
+        if self.manifest is None or not paper.arxiv_id:
+            return False
+        source_format = self.manifest.no_source(paper.arxiv_id, paper.updated)
+        if source_format is not None:
+            logger.debug(f"Skipping source of {paper.arxiv_id}: {source_format} e-print")
+        return source_format is not None
+
+    def _record_artifact(
+        self, paper: LHCbPaper, artifact: str, path: Path, **kwargs: Any
+    ) -> None:
+        """Record a produced artifact in the manifest, if any, and move its content
+        into the blob store, if any."""
+        if self.blob_store is not None and paper.arxiv_id:
+            # tarball digests describe the archive, not the extracted files
+            digest = kwargs.get("sha256") if path.is_file() else None
+            digest = self.blob_store.ingest(paper.arxiv_id, path, digest)
+            if digest:
+                kwargs["sha256"] = digest
+        if self.manifest is not None and paper.arxiv_id:
+            self.manifest.record(
+                paper.arxiv_id, artifact, path, inspire_updated=paper.updated, **kwargs
+            )
+
+    def _recorded_main_file(self, paper: LHCbPaper) -> Optional[str]:
+        """Return the main TeX file name the manifest holds for the paper's
+        extracted sources, if any."""
+        if self.manifest is None or not paper.arxiv_id:
+            return None
+        return self.manifest.main_file(paper.arxiv_id)
+
+    def _record_failure(
+        self, paper: LHCbPaper, artifact: str, source_url: Optional[str] = None
+    ) -> None:
+        """Record a failed artifact in the manifest, if any."""
+        if self.manifest is not None and paper.arxiv_id:
+            self.manifest.record_failure(
+                paper.arxiv_id, artifact, source_url, inspire_updated=paper.updated
+            )
 
     def download_abstract(self, paper: LHCbPaper) -> Optional[Path]:
         """Save paper abstract to file if available.
@@ -206,14 +904,16 @@ class InspireClient:
         Returns
         ------------
         Optional[Path]
-            Path to the saved abstract file, or None if abstract not available
+            Path to the saved abstract file, or None if abstract not available (or
+            the paper has no arXiv ID to name the file by)
         """
-        if not paper.abstract:
+        if not paper.abstract or not paper.arxiv_id:
             return None
 
         try:
             filepath = self.abstract_dir / f"{paper.arxiv_id}.tex"
-            filepath.write_text(paper.abstract)
+            write_atomic(filepath, paper.abstract)
+            self._record_artifact(paper, "abstract", filepath)
             return filepath
 
         except Exception as e:
@@ -236,21 +936,33 @@ class InspireClient:
         if not paper.arxiv_pdf:
             return None
 
-        try:
-            response = requests.get(paper.arxiv_pdf)
-            response.raise_for_status()
+        completed = self.completed_artifact(paper, "pdf")
+        if completed is not None:
+            return completed
 
-            filepath = self.pdf_dir / f"{paper.arxiv_id}.pdf"
-            filepath.write_bytes(response.content)
+        filepath = self.pdf_dir / f"{paper.arxiv_id}.pdf"
+        try:
+            result = self.http.download(
+                paper.arxiv_pdf, filepath, max_bytes=self.max_download_bytes
+            )
+            self._record_artifact(
+                paper, "pdf", filepath, sha256=result.sha256, source_url=paper.arxiv_pdf
+            )
             return filepath
 
-        except requests.RequestException as e:
+        except (requests.RequestException, DownloadError) as e:
             logger.error(f"Failed to download PDF: {e}")
+            self._record_failure(paper, "pdf", paper.arxiv_pdf)
             return None
 
     def find_main_tex(self, directory: Path) -> Optional[Path]:
         """Find the main TeX file in a directory.
 
+        Top-level ``.tex`` files are scored with ``main_file_score`` from a
+        memory-mapped view of each file: ``\\documentclass`` is only looked for in
+        the header, and ``\\begin{document}`` and include targets are searched for
+        without copying file contents.
+
         Parameters
         ------------
         directory : Path
@@ -261,25 +973,52 @@ class InspireClient:
         Optional[Path]
             Path to the main TeX file, or None if not found
         """
-        tex_files = list(directory.glob("*.tex"))
+        facts: Dict[str, Tuple[bool, bool]] = {}
+        references: Counter = Counter()
+        for tex_file in directory.rglob("*.tex"):
+            if not tex_file.is_file() or tex_file.stat().st_size == 0:
+                continue
+            with tex_file.open("rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as view:
+                references.update(
+                    reference_key(target.decode(errors="ignore"))
+                    for target in INCLUDE_TARGET_BYTES_RE.findall(view)
+                )
+                if tex_file.parent == directory:
+                    facts[tex_file.name] = (
+                        DOCUMENTCLASS_BYTES_RE.search(view, 0, HEADER_CHARS) is not None,
+                        view.find(BEGIN_DOCUMENT.encode()) != -1,
+                    )
 
-        main_candidates = ["main.tex", "paper.tex", "article.tex"]
-        for candidate in main_candidates:
-            main_file = directory / candidate
-            if main_file in tex_files:
-                return main_file
+        main_tex = pick_main_file(
+            {
+                name: main_file_score(name, *flags, references[reference_key(name)])
+                for name, flags in facts.items()
+            }
+        )
+        if main_tex is None:
+            return None
+        return directory / main_tex
 
-        for tex_file in tex_files:
-            content = tex_file.read_text(errors="ignore")
-            if r"\documentclass" in content:
-                return tex_file
+    def unpack_source(
+        self, paper: LHCbPaper, source_file: Path, source_format: Optional[str] = None
+    ) -> Optional[Tuple[Path, Dict[str, str]]]:
+        """Extract a downloaded source tarball, keeping its TeX members in memory.
 
-        return None
+        The tarball is read as a stream in a single pass: members selected by the
+        client's extraction policy are written to the paper's source directory
+        (needed if latexpand has to be used as a fallback), and the text of
+        TeX-related members is kept so includes can be resolved in-process. Figures
+        and other binaries are skipped without being read.
 
-    def extract_and_expand_latex(
-        self, paper: LHCbPaper, source_file: Path
-    ) -> Optional[Path]:
-        """Extract and expand LaTeX source into a single file.
+        The payload type is sniffed from its magic bytes first: single-file
+        submissions (a gzipped ``.tex``) are decompressed as ``main.tex``, while
+        PDF-only submissions, HTML pages and unrecognized payloads are not handed
+        to ``tarfile``: PDF-only submissions are recorded in the manifest as having
+        no source, so later runs do not download them again, while HTML (CAPTCHA or
+        error) pages and unrecognized payloads are recorded as failures, to be
+        retried, and HTML pages slow down further requests to the host.
 
         Parameters
         ------------
@@ -287,11 +1026,14 @@ class InspireClient:
             Paper object to process
         source_file : Path
             Path to the downloaded source tarball
+        source_format : Optional[str], default=None
+            Payload type from ``sniff_source_format``; sniffed here if not given
 
         Returns
         ------------
-        Optional[Path]
-            Path to the expanded LaTeX file, or None if processing failed
+        Optional[Tuple[Path, Dict[str, str]]]
+            Directory holding the extracted sources and the decoded TeX members
+            keyed by normalized member name, or None if extraction failed
         """
         if not source_file.exists():
             logger.error(f"Source file not found: {source_file}")
@@ -302,68 +1044,296 @@ class InspireClient:
             logger.error(f"Source file is empty: {source_file}")
             return None
 
+        if source_format is None:
+            source_format = sniff_source_format(source_file)
+        if source_format not in ("tar.gz", "tar", "gz"):
+            source_file.unlink(missing_ok=True)
+            if source_format == "pdf":
+                # terminal: the same PDF would be served again
+                logger.warning(f"No LaTeX source for {paper.arxiv_id}: PDF-only submission")
+                if self.manifest is not None:
+                    self.manifest.record_no_source(
+                        paper.arxiv_id, source_format, paper.latex_source, paper.updated
+                    )
+                return None
+
+            # CAPTCHA and error pages are transient: back off and retry next run
+            source_url = f"{self.arxiv_export_url}/e-print/{paper.arxiv_id}"
+            if source_format == "html":
+                logger.error(f"Received an HTML page instead of the source of {paper.arxiv_id}")
+                self.http.throttled(source_url)
+            else:
+                logger.error(f"Unrecognized source format for {paper.arxiv_id}")
+            self._record_failure(paper, "source", source_url)
+            return None
+
         paper_dir = self.source_dir / f"{paper.arxiv_id}"
         paper_dir.mkdir(exist_ok=True)
 
         try:
-            with tarfile.open(source_file) as tar:
-                # Check for suspicious paths before extraction
-                for member in tar.getmembers():
-                    if member.name.startswith('/') or '..' in member.name:
-                        logger.error(f"Suspicious path in tarfile: {member.name}")
-                        return None
-                tar.extractall(path=paper_dir)
-
+            tarball_sha256 = sha256_file(source_file)
+            if source_format == "gz":
+                members = self._unpack_gzip(source_file, paper_dir)
+            else:
+                members = self._unpack_tar(source_file, paper_dir)
+            if members is None:
+                shutil.rmtree(paper_dir, ignore_errors=True)
+                return None
             source_file.unlink(missing_ok=True)
-        except tarfile.ReadError as e:
-            logger.error(f"Failed to extract source: {e}")
+        except (tarfile.TarError, EOFError, zlib.error) as e:
+            logger.error(f"Failed to extract {source_format} source: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error during extraction: {e}")
             return None
 
-        main_tex = self.find_main_tex(paper_dir)
-        if not main_tex:
-            logger.error(f"Could not find main TeX file for {paper.arxiv_id}")
+        logger.debug(
+            f"Extracted {len(members)} source files for {paper.arxiv_id} "
+            f"({source_format}, {sum(map(len, members.values()))} bytes)"
+        )
+        texts = text_members(members)
+        # recorded with the sources, for the in-process expansion, a latexpand
+        # fallback and later rebuilds from the same extraction
+        self._record_artifact(
+            paper,
+            "source",
+            paper_dir,
+            sha256=tarball_sha256,
+            source_format=source_format,
+            main_file=find_main_member(texts),
+        )
+        return paper_dir, texts
+
+    def _unpack_tar(self, source_file: Path, paper_dir: Path) -> Optional[Dict[str, bytes]]:
+        """Stream through a (possibly compressed) tarball, extracting the members
+        selected by the extraction policy; None if the tarball holds unsafe paths."""
+        policy = self.extraction_policy
+        members: Dict[str, bytes] = {}
+        listing: List[Dict[str, Any]] = []
+        # skipped for their extension only, extracted after all if included
+        skipped_files: Set[str] = set()
+        with tarfile.open(source_file, mode="r|*") as tar:
+            for member in tar:
+                # Check for suspicious paths before extracting each member
+                if member.name.startswith('/') or '..' in member.name:
+                    logger.error(f"Suspicious path in tarfile: {member.name}")
+                    return None
+                name = normalize_member_name(member.name)
+                skipped = policy.skip_reason(member) if name else "type"
+                if policy.keep_listing and not member.isdir():
+                    listing.append(
+                        {"name": member.name, "size": member.size, "skipped": skipped}
+                    )
+                if skipped:
+                    # skipped members are never read, the stream moves past them
+                    if skipped == "extension" and member.size <= policy.max_member_bytes:
+                        skipped_files.add(name)
+                    continue
+
+                data = tar.extractfile(member).read()
+                target = paper_dir / name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                write_atomic(target, data)
+                members[name] = data
+
+        self._extract_included(source_file, paper_dir, members, skipped_files)
+        if policy.keep_listing:
+            (paper_dir / MEMBER_LISTING).write_text(json.dumps(listing, indent=2))
+        return members
+
+    def _extract_included(
+        self,
+        source_file: Path,
+        paper_dir: Path,
+        members: Dict[str, bytes],
+        skipped_files: Set[str],
+    ) -> None:
+        """Extract the members skipped for their extension that the extracted
+        sources include (e.g. ``\\input{figs/plot.pgf}``), so both the in-process
+        expansion and latexpand find them.
+
+        The include targets are only known once the TeX members are read, so the
+        tarball is streamed through again, once per level of includes found.
+        """
+        targets = include_targets(text_members(members).values())
+        wanted = {name for name in skipped_files if reference_key(name) in targets}
+        while wanted:
+            extracted: Dict[str, bytes] = {}
+            with tarfile.open(source_file, mode="r|*") as tar:
+                for member in tar:
+                    name = normalize_member_name(member.name)
+                    if name not in wanted or not member.isfile():
+                        continue
+                    data = tar.extractfile(member).read()
+                    write_atomic(paper_dir / name, data)
+                    extracted[name] = data
+            logger.debug(f"Extracted {len(extracted)} included members of {source_file.name}")
+            members.update(extracted)
+            skipped_files -= wanted
+            targets = include_targets(decode_tex(data) for data in extracted.values())
+            wanted = {name for name in skipped_files if reference_key(name) in targets}
+
+    def _unpack_gzip(self, source_file: Path, paper_dir: Path) -> Optional[Dict[str, bytes]]:
+        """Decompress a single-file (gzipped ``.tex``) submission as ``main.tex``."""
+        limit = self.extraction_policy.max_member_bytes
+        with gzip.open(source_file) as f:
+            data = f.read(limit + 1)
+        if len(data) > limit:
+            logger.error(f"Single-file source exceeds {limit} bytes: {source_file}")
             return None
 
-        expanded_tex = (self.expanded_tex_dir / f"{paper.arxiv_id}.tex").resolve()
+        write_atomic(paper_dir / SINGLE_FILE_NAME, data)
+        return {SINGLE_FILE_NAME: data}
+
+    def extract_source(self, paper: LHCbPaper, source_file: Path) -> Optional[Path]:
+        """Extract a downloaded source tarball into the paper's source directory.
+
+        Parameters
+        ------------
+        paper : LHCbPaper
+            Paper object to process
+        source_file : Path
+            Path to the downloaded source tarball
+
+        Returns
+        ------------
+        Optional[Path]
+            Directory holding the extracted sources, or None if extraction failed
+        """
+        unpacked = self.unpack_source(paper, source_file)
+        return unpacked[0] if unpacked else None
+
+    def expand_members(
+        self, paper: LHCbPaper, members: Dict[str, str]
+    ) -> Optional[Path]:
+        """Expand the main TeX file in-process, from the tarball's TeX members.
+
+        Needs neither a working directory nor a subprocess, so papers can be
+        expanded concurrently on threads. Sources using constructs the expander does
+        not handle (``\\import``, macros in include paths, ...) are left to latexpand.
+
+        Parameters
+        ------------
+        paper : LHCbPaper
+            Paper object to process
+        members : Dict[str, str]
+            Decoded TeX members keyed by normalized member name
+
+        Returns
+        ------------
+        Optional[Path]
+            Path to the expanded LaTeX file, or None if latexpand has to be used
+        """
+        completed = self.completed_artifact(paper, "expanded_tex")
+        if completed is not None:
+            return completed
+
+        main_tex = self._recorded_main_file(paper)
+        if main_tex not in members:
+            main_tex = find_main_member(members)
+        if main_tex is None:
+            return None
 
-        cwd = Path.cwd()
         try:
-            os.chdir(main_tex.parent)
-            
-            # Check if latexpand is available
-            if not shutil.which('latexpand'):
-                logger.error("latexpand command not found. Please install it.")
-                return None
-                
-            result = subprocess.run(
-                ["latexpand", main_tex.name],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=60  # Add timeout to prevent hanging
-            )
-            
-            if not result.stdout.strip():
-                logger.error("latexpand produced empty output")
-                return None
-                
-            expanded_tex.write_text(result.stdout)
-            return expanded_tex
+            expanded = expand_members(members, main_tex)
+        except UnsupportedLatex as e:
+            logger.debug(f"Falling back to latexpand for {paper.arxiv_id}: {e}")
+            return None
 
-        except subprocess.CalledProcessError as e:
-            logger.error(f"latexpand failed: {e.stderr}")
+        if not expanded.strip():
             return None
-        except subprocess.TimeoutExpired:
-            logger.error("latexpand timed out")
+
+        expanded_tex = (self.expanded_tex_dir / f"{paper.arxiv_id}.tex").resolve()
+        write_atomic(expanded_tex, expanded)
+        self._record_artifact(paper, "expanded_tex", expanded_tex)
+        return expanded_tex
+
+    def expand_latex(self, paper: LHCbPaper, paper_dir: Path) -> Optional[Path]:
+        """Expand the main TeX file of extracted sources into a single file.
+
+        latexpand runs through the client's ``LatexpandRunner``, in its own process
+        group with its working directory set to the main file's directory (rather
+        than changing the process-wide one), so papers can be expanded concurrently.
+
+        Parameters
+        ------------
+        paper : LHCbPaper
+            Paper object to process
+        paper_dir : Path
+            Directory holding the extracted sources
+
+        Returns
+        ------------
+        Optional[Path]
+            Path to the expanded LaTeX file, or None if processing failed
+        """
+        completed = self.completed_artifact(paper, "expanded_tex")
+        if completed is not None:
+            return completed
+
+        recorded = self._recorded_main_file(paper)
+        if recorded and (paper_dir / recorded).is_file():
+            main_tex = paper_dir / recorded
+        else:
+            main_tex = self.find_main_tex(paper_dir)
+            if not main_tex:
+                logger.error(f"Could not find main TeX file for {paper.arxiv_id}")
+                return None
+            if self.manifest is not None:
+                self.manifest.record_main_file(paper.arxiv_id, main_tex.name)
+
+        expanded_tex = (self.expanded_tex_dir / f"{paper.arxiv_id}.tex").resolve()
+
+        # Check if latexpand is available
+        if not self.latexpand.available:
+            logger.error("latexpand command not found. Please install it.")
             return None
-        except Exception as e:
+
+        try:
+            result = self.latexpand.run(main_tex)
+        except OSError as e:
             logger.error(f"Failed to process LaTeX source: {e}")
             return None
-        finally:
-            os.chdir(cwd)
+
+        if result.timed_out:
+            logger.error(f"latexpand timed out after {self.latexpand.timeout:.0f}s")
+            return None
+        if result.returncode != 0:
+            logger.error(f"latexpand failed: {result.stderr}")
+            return None
+        if not result.stdout.strip():
+            logger.error("latexpand produced empty output")
+            return None
+
+        write_atomic(expanded_tex, result.stdout)
+        self._record_artifact(paper, "expanded_tex", expanded_tex)
+        return expanded_tex
+
+    def extract_and_expand_latex(
+        self, paper: LHCbPaper, source_file: Path
+    ) -> Optional[Path]:
+        """Extract and expand LaTeX source into a single file.
+
+        Includes are resolved in-process when possible, with latexpand as fallback.
+
+        Parameters
+        ------------
+        paper : LHCbPaper
+            Paper object to process
+        source_file : Path
+            Path to the downloaded source tarball
+
+        Returns
+        ------------
+        Optional[Path]
+            Path to the expanded LaTeX file, or None if processing failed
+        """
+        unpacked = self.unpack_source(paper, source_file)
+        if unpacked is None:
+            return None
+
+        paper_dir, members = unpacked
+        return self.expand_members(paper, members) or self.expand_latex(paper, paper_dir)
 
     def download_paper_source(self, paper: LHCbPaper) -> Optional[Path]:
         """Download and process paper source files.
@@ -380,8 +1350,8 @@ class InspireClient:
         """
         return self.download_source(paper)
 
-    def download_source(self, paper: LHCbPaper) -> Optional[Path]:
-        """Download paper source files using arXiv's API endpoint.
+    def fetch_source(self, paper: LHCbPaper) -> Optional[Path]:
+        """Download the paper source tarball using arXiv's API endpoint.
 
         Parameters
         ------------
@@ -391,69 +1361,52 @@ class InspireClient:
         Returns
         ------------
         Optional[Path]
-            Path to the expanded LaTeX file, or None if processing failed
+            Path to the downloaded source tarball, or None if download failed
         """
-        if not paper.latex_source or not paper.arxiv_id:
+        if not paper.latex_source or not paper.arxiv_id or self.no_source(paper):
             return None
 
         try:
             # Use arXiv's API endpoint instead of direct download
-            source_url = f"http://export.arxiv.org/e-print/{paper.arxiv_id}"
+            source_url = f"{self.arxiv_export_url}/e-print/{paper.arxiv_id}"
             headers = {
-                'User-Agent': 'LHCbPaperBot/1.0 (Contact: your.email@example.com)',
                 'Accept': 'application/x-tar, application/x-gzip, */*'
             }
 
-            # Add delay to respect rate limits
-            time.sleep(3)  # Wait between requests
+            source_file = self.source_dir / f"{paper.arxiv_id}_source.tar.gz"
 
-            response = requests.get(
+            # requests to arXiv are paced by the transport's adaptive rate limiter;
+            # the body is streamed to disk, aborting early on CAPTCHA pages or
+            # oversized tarballs
+            result = self.http.download(
                 source_url,
-                timeout=30,
-                verify=True,
-                headers=headers
+                source_file,
+                max_bytes=self.max_download_bytes,
+                reject_html=True,
+                headers=headers,
             )
-            response.raise_for_status()
-
-            # Check for CAPTCHA or HTML response
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' in content_type or response.content[:100].decode('utf-8', errors='ignore').strip().startswith(('<html', '<!DOCTYPE')):
-                logger.error(f"Received CAPTCHA or HTML instead of tar.gz for {paper.arxiv_id}")
-                logger.debug(f"Headers: {response.headers}")
-                logger.debug(f"Content start: {response.content[:200]}")
-                return None
 
             # File size checks
-            content_length = len(response.content)
-            if content_length == 0:
+            if result.size == 0:
                 logger.error("Received empty file")
+                source_file.unlink(missing_ok=True)
                 return None
-            if content_length < 1000:  
-                logger.error(f"Suspiciously small file: {content_length} bytes")
-                return None
-            if content_length > 50 * 1024 * 1024:
-                logger.error(f"File too large: {content_length / 1024 / 1024:.1f}MB")
+            if result.size < 1000:
+                logger.error(f"Suspiciously small file: {result.size} bytes")
+                source_file.unlink(missing_ok=True)
                 return None
 
-            source_file = self.source_dir / f"{paper.arxiv_id}_source.tar.gz"
-            source_file.write_bytes(response.content)
-
-            # Add exponential backoff for retries
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    expanded_file = self.extract_and_expand_latex(paper, source_file)
-                    if expanded_file:
-                        return expanded_file
-                except Exception as e:
-                    wait_time = 2 ** attempt  # 1, 2, 4 seconds
-                    logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}. Waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    if attempt == max_retries - 1:
-                        raise
+            logger.debug(f"Downloaded {source_url} ({result.size} bytes, sha256 {result.sha256})")
+            return source_file
 
+        except UnexpectedContent as e:
+            logger.error(f"Received CAPTCHA or HTML instead of tar.gz for {paper.arxiv_id}: {e}")
+            self.http.throttled(source_url)
+            self._record_failure(paper, "source", source_url)
+            return None
+        except DownloadTooLarge as e:
+            logger.error(f"File too large: {e}")
             return None
-
         except requests.Timeout:
             logger.error("Download timed out")
             return None
@@ -463,3 +1416,29 @@ class InspireClient:
         except Exception as e:
             logger.error(f"Unexpected error during download: {e}")
             return None
+
+    def download_source(self, paper: LHCbPaper) -> Optional[Path]:
+        """Download paper source files using arXiv's API endpoint and expand them.
+
+        Parameters
+        ------------
+        paper : LHCbPaper
+            Paper object containing the source URL
+
+        Returns
+        ------------
+        Optional[Path]
+            Path to the expanded LaTeX file, or None if processing failed
+        """
+        source_file = self.fetch_source(paper)
+        if source_file is None:
+            return None
+
+        # Transient network errors are already retried, with backoff, by the
+        # transport; extraction failures are not, as they would recur on the same
+        # bytes (e.g. PDF-only submissions)
+        try:
+            return self.extract_and_expand_latex(paper, source_file)
+        except Exception as e:
+            logger.error(f"Unexpected error during extraction: {e}")
+            return None
@@ -0,0 +1,202 @@
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import json
+import os
+import threading
+import time
+
+from loguru import logger
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+
+    Tokens are replenished continuously at ``rate`` per second up to ``capacity``;
+    each request consumes one token, blocking until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize the token bucket.
+
+        Parameters
+        ------------
+        rate : float
+            Sustained number of requests allowed per second
+        capacity : int
+            Maximum burst size, i.e. the number of tokens the bucket can hold
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Top up the bucket according to the time elapsed since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """Per-host adaptive (AIMD) rate limiter with state persisted across runs.
+
+    Each host starts at ``initial_rate`` requests per second. Clean responses raise
+    the rate additively, up to ``max_rate``; throttling signals (429/503 responses,
+    or an HTML page served instead of the expected payload) cut it multiplicatively,
+    down to ``min_rate``, and a ``Retry-After`` delay blocks the host until it has
+    elapsed. Hosts not listed in ``hosts`` are not limited.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str] = ("arxiv.org", "export.arxiv.org"),
+        initial_rate: float = 1 / 3,
+        min_rate: float = 1 / 60,
+        max_rate: float = 1.0,
+        increase: float = 0.01,
+        decrease: float = 0.5,
+        state_file: Optional[Path] = None,
+        save_interval: float = 30.0,
+    ) -> None:
+        """Initialize the limiter, restoring any persisted per-host state.
+
+        Parameters
+        ------------
+        hosts : Iterable[str], default=("arxiv.org", "export.arxiv.org")
+            Hosts subject to rate limiting
+        initial_rate : float, default=1/3
+            Starting request rate per host, in requests per second (arXiv asks for
+            one request every 3 s)
+        min_rate : float, default=1/60
+            Lower bound of the adapted rate
+        max_rate : float, default=1.0
+            Upper bound of the adapted rate
+        increase : float, default=0.01
+            Rate added after each clean response
+        decrease : float, default=0.5
+            Factor applied to the rate after each throttling signal
+        state_file : Optional[Path], default=None
+            JSON file the per-host rates and blocks are loaded from and saved to
+        save_interval : float, default=30.0
+            Minimum number of seconds between periodic saves of the state file
+        """
+        self.hosts = set(hosts)
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.state_file = state_file
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._rates: Dict[str, float] = {}
+        # wall-clock times, so that blocks survive across runs
+        self._blocked_until: Dict[str, float] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._last_save = time.monotonic()
+        self._load()
+
+    def _load(self) -> None:
+        if self.state_file is None or not self.state_file.exists():
+            return
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rate-limit state {self.state_file}: {e}")
+            return
+        for host, host_state in state.items():
+            self._rates[host] = min(max(host_state["rate"], self.min_rate), self.max_rate)
+            self._blocked_until[host] = host_state.get("blocked_until", 0.0)
+
+    def save(self) -> None:
+        """Persist the per-host state to ``state_file``, if configured."""
+        if self.state_file is None:
+            return
+        with self._lock:
+            state = {
+                host: {"rate": rate, "blocked_until": self._blocked_until.get(host, 0.0)}
+                for host, rate in self._rates.items()
+            }
+            self._last_save = time.monotonic()
+        with self._save_lock:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=2))
+            os.replace(tmp, self.state_file)
+
+    def rate(self, host: str) -> float:
+        """Return the current request rate of ``host``, in requests per second."""
+        with self._lock:
+            return self._rates.get(host, self.initial_rate)
+
+    def acquire(self, host: str) -> None:
+        """Block until a request to ``host`` is allowed, reserving its slot.
+
+        Parameters
+        ------------
+        host : str
+            Hostname of the request
+        """
+        if host not in self.hosts:
+            return
+        with self._lock:
+            now = time.monotonic()
+            blocked = self._blocked_until.get(host, 0.0) - time.time()
+            slot = max(now + max(blocked, 0.0), self._next_slot.get(host, now))
+            rate = self._rates.setdefault(host, self.initial_rate)
+            self._next_slot[host] = slot + 1 / rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self, host: str) -> None:
+        """Additively increase the rate of ``host`` after a clean response."""
+        if host not in self.hosts:
+            return
+        with self._lock:
+            rate = self._rates.get(host, self.initial_rate)
+            self._rates[host] = min(rate + self.increase, self.max_rate)
+            due = time.monotonic() - self._last_save > self.save_interval
+        if due:
+            self.save()
+
+    def on_throttle(self, host: str, retry_after: Optional[float] = None) -> None:
+        """Multiplicatively decrease the rate of ``host`` after a throttling signal.
+
+        Parameters
+        ------------
+        host : str
+            Hostname of the throttled request
+        retry_after : Optional[float], default=None
+            Seconds to wait before the next request, from a ``Retry-After`` header
+        """
+        if host not in self.hosts:
+            return
+        with self._lock:
+            rate = self._rates.get(host, self.initial_rate)
+            self._rates[host] = max(rate * self.decrease, self.min_rate)
+            if retry_after:
+                self._blocked_until[host] = time.time() + retry_after
+            # push back requests already scheduled at the old rate
+            self._next_slot[host] = time.monotonic() + 1 / self._rates[host]
+        logger.warning(
+            f"Throttled by {host}: rate lowered to {self._rates[host]:.3f} req/s"
+            + (f", pausing {retry_after:.0f}s" if retry_after else "")
+        )
+        self.save()
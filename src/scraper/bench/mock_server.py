@@ -0,0 +1,435 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+import gzip
+import io
+import json
+import random
+import re
+import tarfile
+import threading
+import time
+
+from loguru import logger
+
+# layout of a recording directory, see ``MockCorpus.load``
+HITS_FILE = "hits.jsonl"
+EPRINT_DIR = "e-print"
+PDF_DIR = "pdf"
+
+ARXIV_QUERY_RE = re.compile(r"arxiv:(\S+)", re.IGNORECASE)
+DATE_FROM_RE = re.compile(r"\bdate>=(\S+)")
+DATE_TO_RE = re.compile(r"\bdate<=(\S+)")
+UNDATED_QUERY = "not date:*"
+
+SYNTHETIC_MAIN = r"""\documentclass[12pt]{article}
+\usepackage{amsmath}
+\title{%(title)s}
+\begin{document}
+\maketitle
+\input{sections/introduction}
+\include{sections/analysis}
+\bibliographystyle{LHCb}
+\bibliography{main}
+\end{document}
+"""
+
+SYNTHETIC_SECTION = r"""\section{%(name)s}
+%% synthetic section text
+%(text)s
+"""
+
+
+@dataclass
+class MockCorpus:
+    """Responses served by the mock server: INSPIRE literature hits, and the
+    e-print and PDF bodies of each arXiv ID."""
+
+    hits: List[Dict[str, Any]] = field(default_factory=list)
+    eprints: Dict[str, bytes] = field(default_factory=dict)
+    pdfs: Dict[str, bytes] = field(default_factory=dict)
+
+    @staticmethod
+    def arxiv_id(hit: Dict[str, Any]) -> Optional[str]:
+        """Return the arXiv ID of a literature hit, if any."""
+        eprints = hit["metadata"].get("arxiv_eprints") or [{}]
+        return eprints[0].get("value")
+
+    @classmethod
+    def load(cls, directory: Path) -> "MockCorpus":
+        """Load recorded responses.
+
+        Parameters
+        ----------
+        directory : Path
+            Recording directory holding ``hits.jsonl`` (one INSPIRE literature hit
+            per line), ``e-print/<arxiv_id>`` and ``pdf/<arxiv_id>.pdf``
+
+        Returns
+        -------
+        MockCorpus
+            Recorded responses
+        """
+        with (directory / HITS_FILE).open() as f:
+            hits = [json.loads(line) for line in f if line.strip()]
+        eprints = {p.name: p.read_bytes() for p in (directory / EPRINT_DIR).glob("*")}
+        pdfs = {p.stem: p.read_bytes() for p in (directory / PDF_DIR).glob("*.pdf")}
+        logger.info(
+            f"Loaded {len(hits)} hits, {len(eprints)} e-prints and {len(pdfs)} PDFs "
+            f"from {directory}"
+        )
+        return cls(hits, eprints, pdfs)
+
+    def save(self, directory: Path) -> None:
+        """Write the responses to a recording directory, see ``load``."""
+        (directory / EPRINT_DIR).mkdir(parents=True, exist_ok=True)
+        (directory / PDF_DIR).mkdir(parents=True, exist_ok=True)
+        with (directory / HITS_FILE).open("w") as f:
+            for hit in self.hits:
+                f.write(json.dumps(hit) + "\n")
+        for arxiv_id, data in self.eprints.items():
+            (directory / EPRINT_DIR / arxiv_id).write_bytes(data)
+        for arxiv_id, data in self.pdfs.items():
+            (directory / PDF_DIR / f"{arxiv_id}.pdf").write_bytes(data)
+
+    @classmethod
+    def synthesize(
+        cls,
+        n_papers: int,
+        seed: int = 0,
+        section_kb: int = 20,
+        figure_kb: int = 200,
+        pdf_kb: int = 500,
+    ) -> "MockCorpus":
+        """Generate a corpus of ``n_papers`` LHCb-like papers.
+
+        Each e-print is a gzipped tarball of a main file including two sections,
+        a bibliography and an (incompressible) figure, so extraction, member
+        filtering and include expansion all do real work.
+
+        Parameters
+        ----------
+        n_papers : int
+            Number of papers
+        seed : int, default=0
+            Seed of the generated content
+        section_kb : int, default=20
+            Size of each TeX section, in kB
+        figure_kb : int, default=200
+            Size of the figure member of each tarball, in kB
+        pdf_kb : int, default=500
+            Size of each PDF, in kB
+
+        Returns
+        -------
+        MockCorpus
+            Synthetic responses
+        """
+        rng = random.Random(seed)
+        words = ["meson", "decay", "asymmetry", "branching", "fraction", "LHCb", "yield",
+                 "candidate", "background", "fit", "efficiency", "systematic"]
+        corpus = cls()
+        for i in range(n_papers):
+            arxiv_id = f"{2001 + i // 99999 % 99:04d}.{i % 99999:05d}"
+            title = f"Measurement of observable {i} in $B$ decays"
+            corpus.hits.append(
+                {
+                    "id": str(1_000_000 + i),
+                    "updated": f"2024-01-{1 + i % 28:02d}T00:00:00+00:00",
+                    "metadata": {
+                        "control_number": 1_000_000 + i,
+                        "titles": [{"title": title}],
+                        "arxiv_eprints": [{"value": arxiv_id}],
+                        "citation_count": rng.randint(0, 500),
+                        "earliest_date": f"{2010 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                        "abstracts": [{"source": "arXiv", "value": f"Abstract of {title}."}],
+                    },
+                }
+            )
+
+            def text(kb: int) -> str:
+                n_words = kb * 1024 // 8
+                return " ".join(rng.choice(words) for _ in range(n_words))
+
+            members = {
+                "main.tex": (SYNTHETIC_MAIN % {"title": title}).encode(),
+                "sections/introduction.tex": (
+                    SYNTHETIC_SECTION % {"name": "Introduction", "text": text(section_kb)}
+                ).encode(),
+                "sections/analysis.tex": (
+                    SYNTHETIC_SECTION % {"name": "Analysis", "text": text(section_kb)}
+                ).encode(),
+                "main.bib": b"@article{LHCb-DP-2008-001, title={The LHCb detector}}\n",
+                "figs/mass_fit.pdf": b"%PDF-1.4\n" + rng.randbytes(figure_kb * 1024),
+            }
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w") as tar:
+                for name, data in members.items():
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    info.mtime = 0
+                    tar.addfile(info, io.BytesIO(data))
+            corpus.eprints[arxiv_id] = gzip.compress(buffer.getvalue(), mtime=0)
+            corpus.pdfs[arxiv_id] = b"%PDF-1.4\n" + rng.randbytes(pdf_kb * 1024)
+        return corpus
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """Latency and failures injected into every mock response."""
+
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 0.0
+    bandwidth: Optional[float] = None
+
+
+@dataclass
+class ServerStats:
+    """Counters of the requests served by the mock server."""
+
+    requests: int = 0
+    bytes_sent: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    attempts: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, key: str, status: int, n_bytes: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += n_bytes
+            self.statuses[status] += 1
+            self.attempts[key] += 1
+
+    @property
+    def retries(self) -> int:
+        """Number of requests repeating an earlier request for the same URL."""
+        with self._lock:
+            return sum(n - 1 for n in self.attempts.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as plain values."""
+        retries = self.retries
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "retries": retries,
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler routing INSPIRE and arXiv paths to the mock corpus."""
+
+    protocol_version = "HTTP/1.1"
+    server: "_MockHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.trace(f"mock server: {format % args}")
+
+    def do_GET(self) -> None:
+        mock = self.server.mock
+        url = urlsplit(self.path)
+        fault = mock.draw_fault()
+        time.sleep(fault["delay"])
+
+        if fault["status"] is not None:
+            headers = {}
+            if fault["status"] == 429 and mock.faults.retry_after:
+                headers["Retry-After"] = f"{mock.faults.retry_after:g}"
+            self._send(fault["status"], b"", "text/plain", headers)
+            return
+
+        if url.path.rstrip("/") == "/api/literature":
+            try:
+                body = json.dumps(mock.literature(parse_qs(url.query))).encode()
+            except ValueError as e:
+                logger.error(f"mock server: {e}")
+                self._send(400, str(e).encode(), "text/plain")
+                return
+            self._send(200, body, "application/json")
+        elif url.path.startswith("/e-print/") and url.path[9:] in mock.corpus.eprints:
+            self._send(200, mock.corpus.eprints[url.path[9:]], "application/gzip")
+        elif url.path.startswith("/pdf/") and url.path[5:].removesuffix(".pdf") in mock.corpus.pdfs:
+            self._send(200, mock.corpus.pdfs[url.path[5:].removesuffix(".pdf")], "application/pdf")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        bandwidth = self.server.mock.faults.bandwidth
+        chunk_size = max(int(bandwidth / 20), 1024) if bandwidth else len(body) or 1
+        try:
+            for start in range(0, len(body), chunk_size):
+                chunk = body[start : start + chunk_size]
+                self.wfile.write(chunk)
+                if bandwidth:
+                    time.sleep(len(chunk) / bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.server.mock.stats.record(self.path, status, len(body))
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockServer"
+
+
+class MockServer:
+    """Local HTTP server standing in for INSPIRE and arXiv.
+
+    Serves ``/api/literature`` search pages (honouring ``page``, ``size``, arXiv-ID
+    and date filters of the query), ``/e-print/<arxiv_id>`` and
+    ``/pdf/<arxiv_id>.pdf`` from a ``MockCorpus``, with the latency, bandwidth,
+    5xx errors and 429 throttling of a ``FaultProfile``. Point ``InspireClient``
+    at ``inspire_url`` and ``arxiv_url`` to exercise the scraper without touching
+    the real services.
+    """
+
+    def __init__(
+        self,
+        corpus: MockCorpus,
+        faults: FaultProfile = FaultProfile(),
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialize the server (not started yet).
+
+        Parameters
+        ----------
+        corpus : MockCorpus
+            Responses to serve
+        faults : FaultProfile, default=FaultProfile()
+            Latency and failures to inject
+        seed : int, default=0
+            Seed of the injected faults
+        host : str, default="127.0.0.1"
+            Interface to listen on
+        port : int, default=0
+            Port to listen on (any free port if 0)
+        """
+        self.corpus = corpus
+        self.faults = faults
+        self.stats = ServerStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._httpd = _MockHTTPServer((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MockServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, also standing in for the arXiv hosts."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def inspire_url(self) -> str:
+        """Base URL of the mock INSPIRE API."""
+        return f"{self.url}/api"
+
+    @property
+    def arxiv_url(self) -> str:
+        """Base URL of the mock arXiv."""
+        return self.url
+
+    def start(self) -> None:
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="mock-server", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Mock INSPIRE/arXiv server listening on {self.url}")
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def draw_fault(self) -> Dict[str, Any]:
+        """Draw the delay and the injected error status (if any) of a response."""
+        faults = self.faults
+        with self._rng_lock:
+            delay = max(faults.latency + self._rng.uniform(-faults.jitter, faults.jitter), 0.0)
+            draw = self._rng.random()
+        status = None
+        if draw < faults.throttle_rate:
+            status = 429
+        elif draw < faults.throttle_rate + faults.error_rate:
+            status = 503 if draw < faults.throttle_rate + faults.error_rate / 2 else 500
+        return {"delay": delay, "status": status}
+
+    def literature(self, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Answer an INSPIRE literature search.
+
+        Parameters
+        ----------
+        query : Dict[str, List[str]]
+            Parsed query string (``q``, ``page``, ``size``, ``sort``)
+
+        Returns
+        -------
+        Dict[str, Any]
+            Search response, with the hits of the requested page
+
+        Raises
+        ------
+        ValueError
+            If the query filters on dates and some hits have no ``earliest_date``
+        """
+        q = query.get("q", [""])[0]
+        page = int(query.get("page", ["1"])[0])
+        size = int(query.get("size", ["10"])[0])
+
+        hits = self.corpus.hits
+        arxiv_ids = {a.lower() for a in ARXIV_QUERY_RE.findall(q)}
+        if arxiv_ids:
+            hits = [hit for hit in hits if (MockCorpus.arxiv_id(hit) or "").lower() in arxiv_ids]
+        # conditions are ANDed, so the tightest bounds apply
+        date_from = max(DATE_FROM_RE.findall(q), default=None)
+        date_to = min(DATE_TO_RE.findall(q), default=None)
+        if date_from or date_to:
+            undated = sum(1 for hit in hits if not hit["metadata"].get("earliest_date"))
+            if undated:
+                # silently dropping them would empty windowed listings, e.g. of
+                # recordings made without the earliest_date field
+                raise ValueError(
+                    f"date-filtered query over {undated} hits without an earliest_date"
+                )
+            hits = [
+                hit
+                for hit in hits
+                if (not date_from or hit["metadata"]["earliest_date"] >= date_from)
+                and (not date_to or hit["metadata"]["earliest_date"] <= date_to)
+            ]
+        elif UNDATED_QUERY in q:
+            hits = [hit for hit in hits if not hit["metadata"].get("earliest_date")]
+        if query.get("sort", [""])[0] == "mostcited":
+            hits = sorted(hits, key=lambda hit: -hit["metadata"].get("citation_count", 0))
+
+        start = (page - 1) * size
+        return {"hits": {"total": len(hits), "hits": hits[start : start + size]}}
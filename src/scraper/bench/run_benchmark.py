@@ -0,0 +1,357 @@
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import click
+from loguru import logger
+from tqdm import tqdm
+
+from api_clients.http import HttpTransport
+from api_clients.inspire import InspireClient
+from api_clients.rate_limit import AdaptiveRateLimiter
+from bench.mock_server import EPRINT_DIR, PDF_DIR, FaultProfile, MockCorpus, MockServer
+from core.models import LHCbPaper
+from scripts.build_lhcb_corpus import N_CORES, CorpusBuilder, CorpusConfig
+
+
+@dataclass
+class PhaseResult:
+    """Throughput of one benchmark phase."""
+
+    name: str
+    papers: int
+    wall_seconds: float
+    bytes_sent: int
+    requests: int
+    retries: int
+    statuses: Dict[str, int]
+    papers_per_second: float = 0.0
+    bytes_per_second: float = 0.0
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_max: Optional[float] = None
+    # papers whose source was expanded, for the download phase
+    succeeded: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.wall_seconds > 0:
+            self.papers_per_second = self.papers / self.wall_seconds
+            self.bytes_per_second = self.bytes_sent / self.wall_seconds
+
+    def summary(self) -> str:
+        """Return a one-line summary of the phase."""
+        line = (
+            f"{self.name:<8} {self.papers} papers in {self.wall_seconds:.2f}s: "
+            f"{self.papers_per_second:.2f} papers/s, "
+            f"{self.bytes_per_second / 1024**2:.2f} MB/s, "
+            f"{self.requests} requests, {self.retries} retries"
+        )
+        if self.latency_p50 is not None:
+            line += (
+                f", per-paper latency p50={self.latency_p50:.3f}s "
+                f"p95={self.latency_p95:.3f}s max={self.latency_max:.3f}s"
+            )
+        if self.succeeded is not None:
+            line += f", {self.succeeded}/{self.papers} succeeded"
+        return line
+
+
+@dataclass
+class BenchmarkResult:
+    """Results of a benchmark run, with the settings needed to reproduce it."""
+
+    commit: Optional[str]
+    settings: Dict[str, Any]
+    phases: List[PhaseResult] = field(default_factory=list)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the ``q`` quantile (0-1) of ``values`` by nearest rank."""
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def git_commit() -> Optional[str]:
+    """Return the short hash of the checked-out commit, if run inside a git tree."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class _LatencyTracker:
+    """Records when each paper enters the download pipeline and when it leaves.
+
+    Papers are keyed by identity: INSPIRE-only hits all have ``arxiv_id=None``.
+    """
+
+    def __init__(self) -> None:
+        self._started: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+
+    def feed(self, papers: Iterable[LHCbPaper]) -> Iterator[LHCbPaper]:
+        for paper in papers:
+            with self._lock:
+                self._started[id(paper)] = time.perf_counter()
+            yield paper
+
+    def done(self, paper: LHCbPaper) -> None:
+        with self._lock:
+            self.latencies.append(time.perf_counter() - self._started.pop(id(paper)))
+
+
+def _phase(
+    name: str, server: MockServer, before: Dict[str, Any], papers: int, wall_seconds: float, **extra: Any
+) -> PhaseResult:
+    """Build a phase result from the server counters accumulated since ``before``."""
+    after = server.stats.snapshot()
+    statuses = {
+        status: n - before["statuses"].get(status, 0)
+        for status, n in after["statuses"].items()
+        if n - before["statuses"].get(status, 0)
+    }
+    return PhaseResult(
+        name=name,
+        papers=papers,
+        wall_seconds=wall_seconds,
+        bytes_sent=after["bytes_sent"] - before["bytes_sent"],
+        requests=after["requests"] - before["requests"],
+        retries=after["retries"] - before["retries"],
+        statuses=statuses,
+        **extra,
+    )
+
+
+def run_benchmark(
+    corpus: MockCorpus,
+    faults: FaultProfile,
+    output_dir: Path,
+    seed: int = 0,
+    download_workers: int = 4,
+    extract_workers: int = N_CORES,
+    latexpand_workers: int = N_CORES,
+    backoff_factor: float = 0.05,
+) -> List[PhaseResult]:
+    """Run the scraper end to end against a mock INSPIRE/arXiv server.
+
+    Two phases are timed: listing the papers through ``InspireClient`` (paged
+    INSPIRE search), and downloading, unpacking and expanding them through the
+    ``CorpusBuilder`` pipeline.
+
+    Parameters
+    ----------
+    corpus : MockCorpus
+        Responses served by the mock server
+    faults : FaultProfile
+        Latency and failures injected by the mock server
+    output_dir : Path
+        Corpus output directory (should be empty, so nothing is resumed)
+    seed : int, default=0
+        Seed of the injected faults
+    download_workers : int, default=4
+        Concurrent PDF and source downloads
+    extract_workers : int, default=number of cores - 1
+        Concurrent tarball extractions
+    latexpand_workers : int, default=number of cores - 1
+        Concurrent latexpand subprocesses
+    backoff_factor : float, default=0.05
+        Base of the transport's retry backoff, in seconds; kept small so injected
+        failures cost retries rather than sleeping
+
+    Returns
+    -------
+    List[PhaseResult]
+        Listing and download phase results
+    """
+    with MockServer(corpus, faults, seed=seed) as server:
+        config = CorpusConfig(
+            start_date=None,
+            end_date=None,
+            max_papers=None,
+            download=True,
+            output_dir=output_dir,
+            verbose=False,
+            download_workers=download_workers,
+            extract_workers=extract_workers,
+            latexpand_workers=latexpand_workers,
+            resume=False,
+            inspire_url=server.inspire_url,
+            arxiv_url=server.arxiv_url,
+            arxiv_export_url=server.arxiv_url,
+            log_file=output_dir / "corpus_build.log",
+        )
+        # the mock host is not paced by the arXiv rate limiter, so the benchmark
+        # measures the scraper rather than the politeness delays
+        transport = HttpTransport(
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor,
+            limiter=AdaptiveRateLimiter(hosts=()),
+        )
+        with transport, CorpusBuilder(config, transport=transport) as builder:
+            # CorpusBuilder sets up its own handlers; keep the benchmark output terse
+            logger.remove()
+            logger.add(sys.stderr, level="WARNING")
+
+            before = server.stats.snapshot()
+            start = time.perf_counter()
+            papers = builder.client.fetch_lhcb_papers(sort_by="mostcited")
+            listing = _phase(
+                "listing", server, before, len(papers), time.perf_counter() - start
+            )
+
+            tracker = _LatencyTracker()
+            succeeded = 0
+            before = server.stats.snapshot()
+            start = time.perf_counter()
+            for job in builder.download_papers(tracker.feed(papers)):
+                tracker.done(job.paper)
+                succeeded += job.expanded_path is not None
+            wall_seconds = time.perf_counter() - start
+
+            latencies = tracker.latencies or [0.0]
+            download = _phase(
+                "download",
+                server,
+                before,
+                len(papers),
+                wall_seconds,
+                latency_p50=statistics.median(latencies),
+                latency_p95=percentile(latencies, 0.95),
+                latency_max=max(latencies),
+                succeeded=succeeded,
+            )
+    return [listing, download]
+
+
+@click.group()
+def main() -> None:
+    """Benchmark the scraper against a local mock of INSPIRE and arXiv."""
+
+
+@main.command()
+@click.option(
+    "--recordings",
+    type=click.Path(path_type=Path, exists=True, file_okay=False),
+    default=None,
+    help="Replay a recording directory (see the record command) instead of synthetic papers",
+)
+@click.option("--papers", "-n", type=click.IntRange(1), default=100, help="Synthetic papers (default: 100)")
+@click.option("--pdf-kb", type=click.IntRange(0), default=500, help="Synthetic PDF size in kB (default: 500)")
+@click.option("--figure-kb", type=click.IntRange(0), default=200, help="Synthetic figure size per tarball in kB (default: 200)")
+@click.option("--latency", type=click.FloatRange(0), default=0.05, help="Seconds added to every response (default: 0.05)")
+@click.option("--jitter", type=click.FloatRange(0), default=0.0, help="Uniform +/- jitter on the latency, in seconds")
+@click.option("--bandwidth", type=click.FloatRange(0, min_open=True), default=None, help="Per-response bandwidth cap in bytes/s (default: none)")
+@click.option("--error-rate", type=click.FloatRange(0, 1), default=0.0, help="Fraction of responses failing with 500/503")
+@click.option("--throttle-rate", type=click.FloatRange(0, 1), default=0.0, help="Fraction of responses failing with 429")
+@click.option("--retry-after", type=click.FloatRange(0), default=0.0, help="Retry-After sent with 429s, in seconds (default: none)")
+@click.option("--backoff-factor", type=click.FloatRange(0), default=0.05, help="Retry backoff base of the client, in seconds (default: 0.05)")
+@click.option("--download-workers", type=click.IntRange(1, 64), default=4, help="Concurrent downloads (default: 4)")
+@click.option("--extract-workers", type=click.IntRange(1, 256), default=N_CORES, help="Concurrent extractions (default: number of cores - 1)")
+@click.option("--latexpand-workers", type=click.IntRange(1, 256), default=N_CORES, help="Concurrent latexpand runs (default: number of cores - 1)")
+@click.option("--seed", type=int, default=0, help="Seed of the synthetic papers and injected faults")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(path_type=Path, dir_okay=False),
+    default=None,
+    help="Write the results as JSON, e.g. to compare commits",
+)
+def run(recordings: Optional[Path], output: Optional[Path], **options: Any) -> None:
+    """Run the scraper end to end against the mock server and report throughput."""
+    if recordings:
+        corpus = MockCorpus.load(recordings)
+    else:
+        corpus = MockCorpus.synthesize(
+            options["papers"],
+            seed=options["seed"],
+            figure_kb=options["figure_kb"],
+            pdf_kb=options["pdf_kb"],
+        )
+    faults = FaultProfile(
+        latency=options["latency"],
+        jitter=options["jitter"],
+        error_rate=options["error_rate"],
+        throttle_rate=options["throttle_rate"],
+        retry_after=options["retry_after"],
+        bandwidth=options["bandwidth"],
+    )
+
+    with tempfile.TemporaryDirectory(prefix="lhcb-bench-") as tmp:
+        phases = run_benchmark(
+            corpus,
+            faults,
+            Path(tmp),
+            seed=options["seed"],
+            download_workers=options["download_workers"],
+            extract_workers=options["extract_workers"],
+            latexpand_workers=options["latexpand_workers"],
+            backoff_factor=options["backoff_factor"],
+        )
+
+    result = BenchmarkResult(
+        commit=git_commit(),
+        settings={"recordings": str(recordings) if recordings else None, **options},
+        phases=phases,
+    )
+    click.echo(f"commit {result.commit or 'unknown'}")
+    for phase in phases:
+        click.echo(phase.summary())
+    if output:
+        output.write_text(json.dumps(asdict(result), indent=2) + "\n")
+
+
+@main.command()
+@click.option(
+    "--output-dir",
+    "-o",
+    type=click.Path(path_type=Path, file_okay=False),
+    required=True,
+    help="Recording directory to write",
+)
+@click.option("--papers", "-n", type=click.IntRange(1, 250), default=20, help="Papers to record (default: 20)")
+def record(output_dir: Path, papers: int) -> None:
+    """Record real INSPIRE hits, e-prints and PDFs for replay by the mock server."""
+    with tempfile.TemporaryDirectory(prefix="lhcb-record-") as tmp, InspireClient(
+        abstract_dir=Path(tmp) / "abstracts",
+        pdf_dir=Path(tmp) / "pdfs",
+        source_dir=Path(tmp) / "source",
+        expanded_tex_dir=Path(tmp) / "expanded_tex",
+    ) as client:
+        params = client._lhcb_query_params(max_results=papers)
+        # the mock server filters date windows on the hits' earliest date
+        params["fields"] = [f"{params['fields'][0]},earliest_date"]
+        hits = client._get_page(params, 1)["hits"]["hits"][:papers]
+        MockCorpus(hits=hits).save(output_dir)
+
+        for hit in tqdm(hits, desc="Recording e-prints and PDFs", unit="paper"):
+            arxiv_id = MockCorpus.arxiv_id(hit)
+            if not arxiv_id:
+                continue
+            for url, dest in [
+                (f"{client.arxiv_export_url}/e-print/{arxiv_id}", output_dir / EPRINT_DIR / arxiv_id),
+                (f"{client.arxiv_url}/pdf/{arxiv_id}.pdf", output_dir / PDF_DIR / f"{arxiv_id}.pdf"),
+            ]:
+                try:
+                    client.http.download(url, dest, reject_html=True)
+                except Exception as e:
+                    logger.error(f"Failed to record {url}: {e}")
+    logger.info(f"Recorded {len(hits)} papers into {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+import fcntl
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+from loguru import logger
+
+from core.manifest import sha256_file
+
+# Linux ioctl cloning a file's extents (copy-on-write filesystems: btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def write_atomic(path: Path, data: Union[bytes, str]) -> None:
+    """Write a file by replacing it, never rewriting an existing inode in place.
+
+    Artifact files may be hardlinks into a ``BlobStore``; rewriting them in place
+    would silently change the blob shared with every other reference.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode() if isinstance(data, str) else data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class BlobStore:
+    """Content-addressed store of artifact files, deduplicated by sha256.
+
+    Each distinct content is stored once under ``blobs/<sha[:2]>/<sha>``; a SQLite
+    table maps every (arXiv ID, path) reference to its blob. Artifacts stay
+    reachable at their usual paths in the legacy directory layout, which are
+    materialized from the blobs as reflinks, hardlinks or, failing both, copies.
+    Blobs no longer referenced (e.g. superseded by a new arXiv version) are removed
+    by ``gc``.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Open (creating if needed) the blob store.
+
+        Parameters
+        ----------
+        root : Path
+            Directory holding the blobs and the reference index
+        """
+        self.root = root
+        self.blob_dir = root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(root / "refs.sqlite", check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS refs ("
+                "arxiv_id TEXT NOT NULL, path TEXT NOT NULL, sha256 TEXT NOT NULL, "
+                "PRIMARY KEY (arxiv_id, path))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS refs_sha256 ON refs (sha256)")
+
+    def __enter__(self) -> "BlobStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def blob_path(self, sha256: str) -> Path:
+        """Return where the blob of a digest is (or would be) stored."""
+        return self.blob_dir / sha256[:2] / sha256
+
+    def has(self, sha256: str) -> bool:
+        """Check whether content with the given digest is already stored."""
+        return self.blob_path(sha256).is_file()
+
+    def put(self, path: Path, sha256: Optional[str] = None) -> str:
+        """Store the content of a file, if not already stored.
+
+        Parameters
+        ----------
+        path : Path
+            File to store; left untouched
+        sha256 : Optional[str], default=None
+            Digest of the file, computed if not given
+
+        Returns
+        -------
+        str
+            sha256 of the content
+        """
+        sha256 = sha256 or sha256_file(path)
+        blob = self.blob_path(sha256)
+        if not blob.is_file():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=blob.parent, suffix=".part")
+            os.close(fd)
+            try:
+                shutil.copyfile(path, tmp)
+                # blobs may be shared by hardlinks: never modify them in place
+                os.chmod(tmp, 0o444)
+                os.replace(tmp, blob)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        return sha256
+
+    def materialize(self, sha256: str, dest: Path) -> None:
+        """Make ``dest`` a reflink, hardlink or copy of a stored blob.
+
+        Parameters
+        ----------
+        sha256 : str
+            Digest of the blob
+        dest : Path
+            Path to (re)create
+        """
+        blob = self.blob_path(sha256)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{threading.get_ident()}.link")
+        tmp.unlink(missing_ok=True)
+        try:
+            if not self._reflink(blob, tmp):
+                try:
+                    os.link(blob, tmp)
+                except OSError:
+                    shutil.copyfile(blob, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _reflink(src: Path, dest: Path) -> bool:
+        """Clone ``src`` into ``dest`` copy-on-write, if the filesystem supports it."""
+        with src.open("rb") as fsrc, dest.open("wb") as fdest:
+            try:
+                fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+                return True
+            except OSError:
+                pass
+        dest.unlink(missing_ok=True)
+        return False
+
+    def ingest(
+        self, arxiv_id: str, path: Path, sha256: Optional[str] = None
+    ) -> Optional[str]:
+        """Store an artifact and turn it into a link to its blob.
+
+        Directories (extracted sources) are ingested file by file.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            arXiv identifier of the paper the artifact belongs to
+        path : Path
+            Artifact file or directory, in the legacy layout
+        sha256 : Optional[str], default=None
+            Digest of a file artifact, computed if not given
+
+        Returns
+        -------
+        Optional[str]
+            Digest of a file artifact, None for directories
+        """
+        files = [path] if path.is_file() else [p for p in path.rglob("*") if p.is_file()]
+        refs = []
+        for file in files:
+            digest = self.put(file, sha256 if file == path else None)
+            self.materialize(digest, file)
+            refs.append((arxiv_id, str(file.resolve()), digest))
+        key = str(path.resolve())
+        with self._lock, self._conn:
+            # drop references to files a previous version had and this one lacks
+            self._conn.execute(
+                "DELETE FROM refs WHERE arxiv_id = ? AND (path = ? OR path LIKE ?)",
+                (arxiv_id, key, f"{key}/%"),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO refs (arxiv_id, path, sha256) VALUES (?, ?, ?)",
+                refs,
+            )
+        return refs[0][2] if path.is_file() else None
+
+    def refs(self, arxiv_id: str) -> Iterator[Tuple[Path, str]]:
+        """Yield the (path, sha256) references of a paper."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, sha256 FROM refs WHERE arxiv_id = ?", (arxiv_id,)
+            ).fetchall()
+        for path, sha256 in rows:
+            yield Path(path), sha256
+
+    def restore(self, arxiv_id: str, path: Path) -> bool:
+        """Re-materialize an artifact file or directory from its blobs.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            arXiv identifier of the paper
+        path : Path
+            Artifact file or directory to restore
+
+        Returns
+        -------
+        bool
+            True if the artifact was referenced and all its blobs were available
+        """
+        path = path.resolve()
+        refs = [
+            (ref_path, sha256)
+            for ref_path, sha256 in self.refs(arxiv_id)
+            if ref_path == path or path in ref_path.parents
+        ]
+        if not refs or not all(self.has(sha256) for _, sha256 in refs):
+            return False
+        for ref_path, sha256 in refs:
+            self.materialize(sha256, ref_path)
+        return True
+
+    def gc(self) -> Tuple[int, int]:
+        """Delete the blobs no reference points to.
+
+        Returns
+        -------
+        Tuple[int, int]
+            Number of blobs deleted and bytes freed
+        """
+        with self._lock:
+            referenced = {row[0] for row in self._conn.execute("SELECT DISTINCT sha256 FROM refs")}
+        n_deleted = n_bytes = 0
+        for blob in self.blob_dir.glob("*/*"):
+            if blob.name in referenced or blob.suffix == ".part":
+                continue
+            n_bytes += blob.stat().st_size
+            blob.unlink(missing_ok=True)
+            n_deleted += 1
+        logger.info(f"Blob store GC: removed {n_deleted} blobs ({n_bytes / 1024**2:.1f} MB)")
+        return n_deleted, n_bytes
+
+    def close(self) -> None:
+        """Close the reference index."""
+        self._conn.close()
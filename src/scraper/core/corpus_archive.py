@@ -0,0 +1,263 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import json
+import mmap
+import os
+import struct
+import threading
+
+from loguru import logger
+
+from core.blob_store import write_atomic
+
+# file signature, also closing the footer
+MAGIC = b"LHCBCZA1"
+# index offset and length, followed by MAGIC
+FOOTER = struct.Struct("<QQ8s")
+
+# artifact kind -> (directory, suffix) of the corpus directory layout
+LAYOUT: Dict[str, Tuple[str, str]] = {
+    "expanded_tex": ("expanded_tex", ".tex"),
+    "cleaned_tex": ("cleaned_tex", ".tex"),
+    "abstract": ("abstracts", ".tex"),
+}
+
+
+def _zstd() -> Any:
+    """Import zstandard lazily, as it is only needed for corpus archives."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Corpus archives need the optional 'zstandard' package: "
+            "pip install zstandard (or poetry install --extras archive)"
+        ) from e
+    return zstandard
+
+
+class CorpusArchiveWriter:
+    """Writer of a single-file corpus archive.
+
+    Every record (one artifact of one paper) is an independent zstd frame, so any
+    record can be decompressed on its own; an index of (arXiv ID, kind, offset,
+    length) entries and a fixed-size footer pointing at it close the file. The
+    archive is written to a temporary file and moved into place on close.
+    """
+
+    def __init__(self, path: Path, level: int = 10) -> None:
+        """Start writing an archive.
+
+        Parameters
+        ----------
+        path : Path
+            Archive file to create (replaced if it exists)
+        level : int, default=10
+            zstd compression level
+        """
+        self.path = path
+        self._tmp = path.with_name(f".{path.name}.part")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._compressor = _zstd().ZstdCompressor(level=level)
+        self._file = self._tmp.open("wb")
+        self._file.write(MAGIC)
+        self._index: List[List[Any]] = []
+        self._keys: set = set()
+
+    def __enter__(self) -> "CorpusArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._tmp.unlink(missing_ok=True)
+
+    def add(self, arxiv_id: str, kind: str, data: Union[bytes, str]) -> None:
+        """Append one record.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            arXiv identifier of the paper
+        kind : str
+            Artifact kind, e.g. ``expanded_tex``
+        data : Union[bytes, str]
+            Artifact content; text is stored UTF-8 encoded
+        """
+        if (arxiv_id, kind) in self._keys:
+            raise ValueError(f"Duplicate record: {arxiv_id} {kind}")
+        raw = data.encode() if isinstance(data, str) else data
+        frame = self._compressor.compress(raw)
+        self._index.append([arxiv_id, kind, self._file.tell(), len(frame), len(raw)])
+        self._keys.add((arxiv_id, kind))
+        self._file.write(frame)
+
+    def close(self) -> None:
+        """Write the index and footer and move the archive into place."""
+        index = self._compressor.compress(json.dumps(self._index).encode())
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(offset, len(index), MAGIC))
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+
+class CorpusArchive:
+    """Read-only, memory-mapped view of a corpus archive.
+
+    Records are looked up by (arXiv ID, kind) through the index and decompressed
+    straight from the mapping, so opening the archive costs one index read however
+    many papers it holds; ``__iter__`` streams all records in file order.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open an archive.
+
+        Parameters
+        ----------
+        path : Path
+            Archive file
+        """
+        self.path = path
+        self._zstd = _zstd()
+        self._local = threading.local()
+        with path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < len(MAGIC) + FOOTER.size or self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a corpus archive: {path}")
+        offset, length, magic = FOOTER.unpack(self._mmap[-FOOTER.size :])
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Truncated corpus archive: {path}")
+
+        entries = json.loads(self._decompress(offset, length))
+        self._index: Dict[Tuple[str, str], Tuple[int, int]] = {
+            (arxiv_id, kind): (start, size) for arxiv_id, kind, start, size, _ in entries
+        }
+
+    def __enter__(self) -> "CorpusArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._index
+
+    def _decompress(self, offset: int, length: int) -> bytes:
+        # decompressors are not safe to share between threads
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = self._zstd.ZstdDecompressor()
+        return decompressor.decompress(self._mmap[offset : offset + length])
+
+    def keys(self, kind: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Return the (arXiv ID, kind) keys of the records, optionally of one kind."""
+        return [key for key in self._index if kind is None or key[1] == kind]
+
+    def get(self, arxiv_id: str, kind: str) -> Optional[bytes]:
+        """Return the content of a record, or None if the archive lacks it."""
+        location = self._index.get((arxiv_id, kind))
+        return self._decompress(*location) if location else None
+
+    def text(self, arxiv_id: str, kind: str) -> Optional[str]:
+        """Return the content of a record decoded as UTF-8, or None if missing."""
+        data = self.get(arxiv_id, kind)
+        return data.decode() if data is not None else None
+
+    def iter_records(
+        self, kinds: Optional[List[str]] = None
+    ) -> Iterator[Tuple[str, str, bytes]]:
+        """Stream (arXiv ID, kind, content) records in file order.
+
+        Parameters
+        ----------
+        kinds : Optional[List[str]], default=None
+            Only stream records of these kinds (all if None); other records are
+            skipped without being decompressed
+
+        Yields
+        ------
+        Tuple[str, str, bytes]
+            arXiv ID, kind and content of each record
+        """
+        for (arxiv_id, kind), location in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if kinds is None or kind in kinds:
+                yield arxiv_id, kind, self._decompress(*location)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, bytes]]:
+        return self.iter_records()
+
+    def close(self) -> None:
+        """Unmap the archive."""
+        self._mmap.close()
+
+
+def pack_directory(
+    data_dir: Path, archive_path: Path, kinds: Optional[List[str]] = None, level: int = 10
+) -> int:
+    """Pack the artifacts of the corpus directory layout into an archive.
+
+    Parameters
+    ----------
+    data_dir : Path
+        Corpus output directory (holding ``expanded_tex/``, ``cleaned_tex/``, ...)
+    archive_path : Path
+        Archive file to create
+    kinds : Optional[List[str]], default=None
+        Artifact kinds to pack (all kinds of ``LAYOUT`` if None)
+    level : int, default=10
+        zstd compression level
+
+    Returns
+    -------
+    int
+        Number of records written
+    """
+    n_records = 0
+    with CorpusArchiveWriter(archive_path, level=level) as writer:
+        for kind in kinds or list(LAYOUT):
+            directory, suffix = LAYOUT[kind]
+            for path in sorted((data_dir / directory).glob(f"*{suffix}")):
+                writer.add(path.name[: -len(suffix)], kind, path.read_bytes())
+                n_records += 1
+    logger.info(f"Packed {n_records} records from {data_dir} into {archive_path}")
+    return n_records
+
+
+def unpack_archive(
+    archive_path: Path, data_dir: Path, kinds: Optional[List[str]] = None
+) -> int:
+    """Write the records of an archive back to the corpus directory layout.
+
+    Parameters
+    ----------
+    archive_path : Path
+        Archive file to read
+    data_dir : Path
+        Corpus output directory to write into
+    kinds : Optional[List[str]], default=None
+        Artifact kinds to unpack (all if None); kinds outside ``LAYOUT`` are
+        written to a directory named after the kind, with no suffix
+
+    Returns
+    -------
+    int
+        Number of records written
+    """
+    n_records = 0
+    with CorpusArchive(archive_path) as archive:
+        for arxiv_id, kind, data in archive.iter_records(kinds):
+            directory, suffix = LAYOUT.get(kind, (kind, ""))
+            target = data_dir / directory / f"{arxiv_id}{suffix}"
+            # targets may be read-only hardlinks into a blob store
+            write_atomic(target, data)
+            n_records += 1
+    logger.info(f"Unpacked {n_records} records from {archive_path} into {data_dir}")
+    return n_records
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import FrozenSet, Optional
+import tarfile
+
+from core.latex_expand import TEXT_SUFFIXES
+
+# sources later stages read: TeX inputs, classes/styles and bibliographies
+SOURCE_SUFFIXES = frozenset(TEXT_SUFFIXES | {".bib"})
+
+# name of the per-paper member listing written when auditing is enabled
+MEMBER_LISTING = "members.json"
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractionPolicy:
+    """Which members of an e-print tarball are materialized on disk.
+
+    Figures and other binaries (PDF/PNG/EPS, data files) make up most of an arXiv
+    e-print but are never read downstream, so by default only TeX-related members
+    below a size cap are extracted; every other member is skipped while streaming
+    through the archive, without being read.
+    """
+
+    suffixes: Optional[FrozenSet[str]] = SOURCE_SUFFIXES
+    max_member_bytes: int = 5 * 1024 * 1024
+    keep_listing: bool = False
+
+    def skip_reason(self, member: tarfile.TarInfo) -> Optional[str]:
+        """Return why a tar member is not extracted, or None if it is.
+
+        Parameters
+        ----------
+        member : tarfile.TarInfo
+            Tar member to decide on
+
+        Returns
+        -------
+        Optional[str]
+            ``"type"``, ``"extension"`` or ``"size"``, or None to extract the member
+        """
+        if not member.isfile():
+            return "type"
+        if (
+            self.suffixes is not None
+            and PurePosixPath(member.name).suffix.lower() not in self.suffixes
+        ):
+            return "extension"
+        if member.size > self.max_member_bytes:
+            return "size"
+        return None
+
+
+# materializes every regular file, as a plain ``tar.extractall`` would
+EXTRACT_ALL = ExtractionPolicy(suffixes=None, max_member_bytes=2**63 - 1)
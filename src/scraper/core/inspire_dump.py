@@ -0,0 +1,118 @@
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Optional
+import gzip
+import json
+
+from loguru import logger
+
+# first bytes of a gzip stream
+GZIP_MAGIC = b"\x1f\x8b"
+
+# the literature query of the scraper, evaluated locally on dump records
+COLLABORATION = "LHCb"
+DOCUMENT_TYPE = "article"
+
+
+def open_dump(path: Path) -> IO[str]:
+    """Open an INSPIRE literature dump for reading text, gzipped or not.
+
+    Compression is told from the magic bytes rather than the file name.
+    """
+    with path.open("rb") as f:
+        gzipped = f.read(2) == GZIP_MAGIC
+    if gzipped:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def iter_dump_hits(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream the records of a JSONL literature dump as search hits.
+
+    Lines are parsed one at a time, so memory use does not grow with the dump.
+    Lines may hold search hits (``{"metadata": ..., "updated": ...}``, as served by
+    the literature endpoint) or bare metadata records, which are wrapped into hits;
+    malformed lines are logged and skipped.
+
+    Parameters
+    ----------
+    path : Path
+        JSONL dump, optionally gzipped
+
+    Yields
+    ------
+    Dict[str, Any]
+        Hit records
+    """
+    with open_dump(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed line {line_number} of {path}: {e}")
+                continue
+            if "metadata" not in record:
+                record = {"metadata": record, "updated": record.get("updated")}
+            yield record
+
+
+def _within(value: str, start: Optional[str], end: Optional[str]) -> bool:
+    """Check a (possibly partial, e.g. ``2015`` or ``2015-06``) date against a range.
+
+    Bounds are truncated to the precision of the value, so a paper dated only by
+    its year matches any range overlapping that year.
+    """
+    if start and value < start[: len(value)]:
+        return False
+    if end and value > end[: len(value)]:
+        return False
+    return True
+
+
+def matches_lhcb_query(
+    hit: Dict[str, Any],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    updated_since: Optional[str] = None,
+) -> bool:
+    """Evaluate the scraper's literature query on a dump record.
+
+    Mirrors ``collaboration:"LHCb" and document_type:article`` with the optional
+    ``date>=``/``date<=`` (on the record's earliest date) and ``du>=`` (on its
+    last update) restrictions.
+
+    Parameters
+    ----------
+    hit : Dict[str, Any]
+        Hit record
+    start_date : Optional[str], default=None
+        First paper date (YYYY-MM-DD) to keep
+    end_date : Optional[str], default=None
+        Last paper date (YYYY-MM-DD) to keep
+    updated_since : Optional[str], default=None
+        Only keep records updated on or after this date (YYYY-MM-DD)
+
+    Returns
+    -------
+    bool
+        True if the record matches the query
+    """
+    metadata = hit["metadata"]
+    collaborations = {
+        c.get("value", "").casefold() for c in metadata.get("collaborations", [])
+    }
+    if COLLABORATION.casefold() not in collaborations:
+        return False
+    if DOCUMENT_TYPE not in metadata.get("document_type", []):
+        return False
+
+    if start_date or end_date:
+        earliest = metadata.get("earliest_date")
+        if not earliest or not _within(earliest, start_date, end_date):
+            return False
+    if updated_since:
+        updated = hit.get("updated")
+        if updated and updated[: len(updated_since)] < updated_since:
+            return False
+    return True
@@ -0,0 +1,306 @@
+from pathlib import PurePosixPath
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+import re
+
+# members whose text is kept in memory to resolve includes against
+TEXT_SUFFIXES = {".tex", ".ltx", ".bbl", ".sty", ".cls", ".def", ".cfg", ".txt"}
+
+MAIN_CANDIDATES = ["main.tex", "paper.tex", "article.tex"]
+MAIN_NAME_HINTS = ("main", "paper", "article", "ms", "manuscript", "lhcb-paper")
+AUXILIARY_NAME_HINTS = ("supp", "appendix", "response", "reply", "cover", "letter")
+
+# \documentclass is only looked for in the first HEADER_CHARS characters of a file
+HEADER_CHARS = 16 * 1024
+DOCUMENTCLASS_RE = re.compile(r"^[ \t]*\\documentclass", re.MULTILINE)
+DOCUMENTCLASS_BYTES_RE = re.compile(rb"^[ \t]*\\documentclass", re.MULTILINE)
+BEGIN_DOCUMENT = "\\begin{document}"
+END_DOCUMENT = "\\end{document}"
+# target of an include, for counting how often each file is included
+INCLUDE_TARGET_RE = re.compile(r"\\(?:input|include|subfile)(?![A-Za-z@])\s*\{?\s*([^\s{}\\%]+)")
+INCLUDE_TARGET_BYTES_RE = re.compile(INCLUDE_TARGET_RE.pattern.encode())
+
+# \input{file}, \input file, \include{file} and \subfile{file}
+_INCLUDE_RE = re.compile(
+    r"\\(?P<cmd>input|include|subfile)(?![A-Za-z@])\s*"
+    r"(?:\{(?P<braced>[^{}]*)\}|(?P<bare>[^\s{}\\%]+))"
+)
+# constructs whose file resolution we do not reproduce, deferred to latexpand
+_UNSUPPORTED_RE = re.compile(
+    r"\\(?:import|subimport|inputfrom|subinputfrom|includefrom|subincludefrom"
+    r"|includeonly|InputIfFileExists|@input|lstinputlisting)(?![A-Za-z@])"
+)
+_ENDINPUT_RE = re.compile(r"\\endinput(?![A-Za-z@])")
+_VERBATIM_RE = re.compile(r"\\begin\s*\{(?:verbatim|Verbatim|lstlisting|minted)\*?\}")
+# files of the TeX distribution commonly input by arXiv sources; never in the
+# archive, and left in place by latexpand as well
+SYSTEM_INPUTS = frozenset({"glyphtounicode", "glyphtounicode.tex"})
+
+
+class UnsupportedLatex(Exception):
+    """Raised when a source uses a construct the in-process expander cannot handle."""
+
+
+def decode_tex(data: bytes) -> str:
+    """Decode TeX source bytes as UTF-8, falling back to Latin-1."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def normalize_member_name(name: str) -> str:
+    """Normalize a tar member name to a relative POSIX path (``./a/b`` -> ``a/b``)."""
+    parts = [p for p in PurePosixPath(name).parts if p not in ("", ".")]
+    return str(PurePosixPath(*parts)) if parts else ""
+
+
+def strip_comments(text: str) -> str:
+    """Remove TeX comments, keeping the ``%`` so line joins are preserved.
+
+    A ``%`` is a comment start unless escaped by an odd number of backslashes.
+    """
+    lines = []
+    for line in text.split("\n"):
+        idx = line.find("%")
+        while idx != -1:
+            n_backslashes = len(line[:idx]) - len(line[:idx].rstrip("\\"))
+            if n_backslashes % 2 == 0:
+                line = line[: idx + 1]
+                break
+            idx = line.find("%", idx + 1)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def reference_key(target: str) -> str:
+    """Key under which an include target and a file name are matched."""
+    name = normalize_member_name(target.strip())
+    return name[: -len(".tex")] if name.endswith(".tex") else name
+
+
+def main_file_score(
+    name: str, has_documentclass: bool, has_begin_document: bool, n_references: int
+) -> int:
+    """Score how likely a top-level TeX file is to be the main file.
+
+    A ``\\documentclass`` and ``\\begin{document}`` count for a file, being
+    included by other files counts against it, and conventional names (``main``,
+    ``paper``, ...) or auxiliary ones (``supplementary``, ``response``, ...) tip
+    the balance.
+
+    Parameters
+    ----------
+    name : str
+        File name
+    has_documentclass : bool
+        Whether an uncommented ``\\documentclass`` is in the file's header
+    has_begin_document : bool
+        Whether the file contains ``\\begin{document}``
+    n_references : int
+        Number of includes of the file from the other files
+
+    Returns
+    -------
+    int
+        Score; only files scoring above zero are main-file candidates
+    """
+    stem = PurePosixPath(name).stem.lower()
+    score = 4 * has_documentclass + 3 * has_begin_document - 3 * n_references
+    if stem in MAIN_NAME_HINTS:
+        score += 2
+    if any(hint in stem for hint in AUXILIARY_NAME_HINTS):
+        score -= 2
+    return score
+
+
+def pick_main_file(scores: Mapping[str, int]) -> Optional[str]:
+    """Return the best-scoring file, ties broken by name, if any scores above zero."""
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    if ranked and ranked[0][1] > 0:
+        return ranked[0][0]
+    return None
+
+
+def find_main_member(members: Mapping[str, str]) -> Optional[str]:
+    """Find the main TeX file among in-memory tar members.
+
+    Top-level ``.tex`` members are scored with ``main_file_score``.
+
+    Parameters
+    ----------
+    members : Mapping[str, str]
+        Normalized member name -> decoded text
+
+    Returns
+    -------
+    Optional[str]
+        Name of the main member, or None if not found
+    """
+    references: Counter = Counter()
+    for text in members.values():
+        references.update(
+            reference_key(target) for target in INCLUDE_TARGET_RE.findall(text)
+        )
+
+    scores = {
+        name: main_file_score(
+            name,
+            DOCUMENTCLASS_RE.search(members[name], 0, HEADER_CHARS) is not None,
+            BEGIN_DOCUMENT in members[name],
+            references[reference_key(name)],
+        )
+        for name in members
+        if "/" not in name and name.endswith(".tex")
+    }
+    return pick_main_file(scores)
+
+
+class LatexExpander:
+    """Pure-Python resolver of ``\\input``/``\\include``/``\\subfile`` against an
+    in-memory map of tar members.
+
+    Paths are resolved, as TeX does, relative to the directory of the main file,
+    trying the name as given and with a ``.tex`` suffix. Includes of known system
+    files (``SYSTEM_INPUTS``) are left untouched, as latexpand does. Includes of
+    any other file absent from the in-memory members (e.g. a ``.pgf`` figure, or a
+    member the extraction policy skipped) and constructs with different resolution
+    rules raise ``UnsupportedLatex`` so the caller can fall back to latexpand.
+    """
+
+    def __init__(self, members: Mapping[str, str], max_depth: int = 20) -> None:
+        """Initialize the expander.
+
+        Parameters
+        ----------
+        members : Mapping[str, str]
+            Normalized member name -> decoded text
+        max_depth : int, default=20
+            Maximum include nesting depth
+        """
+        self.members = members
+        self.max_depth = max_depth
+        self.base_dir = PurePosixPath("")
+
+    def resolve(self, target: str) -> Optional[str]:
+        """Return the member name an include target refers to, if in the archive."""
+        target = target.strip()
+        if "\\" in target or "#" in target:
+            raise UnsupportedLatex(f"macro in include path: {target}")
+        name = normalize_member_name(str(self.base_dir / target))
+        for candidate in (name, f"{name}.tex"):
+            if candidate in self.members:
+                return candidate
+        return None
+
+    def expand(self, main: str) -> str:
+        """Expand a main file, inlining every include it (transitively) makes.
+
+        Parameters
+        ----------
+        main : str
+            Name of the main member
+
+        Returns
+        -------
+        str
+            Monolithic TeX source, with comments stripped
+
+        Raises
+        ------
+        UnsupportedLatex
+            If the source uses a construct that has to be handled by latexpand
+        """
+        self.base_dir = PurePosixPath(main).parent
+        return self._expand(main, [])
+
+    def _expand(self, name: str, stack: List[str]) -> str:
+        if name in stack:
+            raise UnsupportedLatex(f"circular include: {' -> '.join(stack + [name])}")
+        if len(stack) >= self.max_depth:
+            raise UnsupportedLatex(f"include depth exceeds {self.max_depth}")
+
+        text = strip_comments(self.members[name])
+        endinput = _ENDINPUT_RE.search(text)
+        if endinput:
+            # TeX stops reading the file at the end of the \endinput line
+            line_end = text.find("\n", endinput.end())
+            text = text[: endinput.start()] + (
+                text[endinput.end() : line_end] if line_end != -1 else ""
+            )
+        if _VERBATIM_RE.search(text):
+            raise UnsupportedLatex(f"verbatim environment in {name}")
+        unsupported = _UNSUPPORTED_RE.search(text)
+        if unsupported:
+            raise UnsupportedLatex(f"{unsupported.group(0)} in {name}")
+
+        def substitute(match: "re.Match[str]") -> str:
+            target = match.group("braced")
+            if target is None:
+                target = match.group("bare")
+            resolved = self.resolve(target)
+            if resolved is None:
+                if target.strip() in SYSTEM_INPUTS:
+                    return match.group(0)
+                raise UnsupportedLatex(f"unresolved include {target.strip()} in {name}")
+
+            body = self._expand(resolved, stack + [name])
+            if match.group("cmd") == "subfile":
+                body = subfile_body(body)
+            if match.group("cmd") == "include":
+                return f"\\clearpage\n{body}\n\\clearpage"
+            return body
+
+        return _INCLUDE_RE.sub(substitute, text)
+
+
+def subfile_body(text: str) -> str:
+    """Return the document body of a ``subfiles`` file, as ``\\subfile`` inlines it.
+
+    A subfile is a standalone document (``\\documentclass[main]{subfiles}`` and its
+    own ``document`` environment); only the text between ``\\begin{document}`` and
+    ``\\end{document}`` belongs in the main file. Files without a ``document``
+    environment are inlined whole.
+    """
+    begin = text.find(BEGIN_DOCUMENT)
+    if begin == -1:
+        return text
+    end = text.find(END_DOCUMENT, begin)
+    return text[begin + len(BEGIN_DOCUMENT) : end if end != -1 else len(text)]
+
+
+def expand_members(members: Mapping[str, str], main: str) -> str:
+    """Expand ``main`` against in-memory tar members, see ``LatexExpander``."""
+    return LatexExpander(members).expand(main)
+
+
+def include_targets(texts: Iterable[str]) -> Set[str]:
+    """Return the reference keys (see ``reference_key``) of every file included by
+    the given TeX texts."""
+    return {
+        reference_key(target)
+        for text in texts
+        for target in INCLUDE_TARGET_RE.findall(text)
+    }
+
+
+def text_members(members: Dict[str, bytes]) -> Dict[str, str]:
+    """Decode the members with TeX-related suffixes, and any other member they
+    (transitively) include, e.g. ``\\input{plot.pgf}``, keyed by normalized name."""
+    texts = {
+        normalize_member_name(name): decode_tex(data)
+        for name, data in members.items()
+        if PurePosixPath(name).suffix.lower() in TEXT_SUFFIXES
+    }
+    # included files may include further files in turn
+    included = texts
+    while included:
+        targets = include_targets(included.values())
+        included = {
+            normalize_member_name(name): decode_tex(data)
+            for name, data in members.items()
+            if normalize_member_name(name) not in texts
+            and reference_key(name) in targets
+        }
+        texts.update(included)
+    return texts
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import threading
+import time
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class LatexpandResult:
+    """Outcome of one latexpand job."""
+
+    main_tex: Path
+    stdout: str
+    stderr: str
+    returncode: Optional[int]
+    wall_seconds: float
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """True if latexpand exited cleanly with non-empty output."""
+        return self.returncode == 0 and bool(self.stdout.strip())
+
+
+@dataclass(frozen=True)
+class _JobSummary:
+    """What ``log_summary`` needs of a finished job; the output itself is not kept."""
+
+    main_tex: Path
+    stderr: str
+    returncode: Optional[int]
+    wall_seconds: float
+    timed_out: bool
+    ok: bool
+
+
+class LatexpandRunner:
+    """Runs latexpand jobs, each in its own process group and working directory.
+
+    Every job gets ``cwd=`` set to its main file's directory, so jobs are
+    independent of the process-wide working directory and can run concurrently
+    from several threads, e.g. the latexpand stage of the download pipeline. A job
+    exceeding the timeout has its whole process group killed. Per-job wall times
+    and stderr are collected for ``log_summary``; the expanded output is only
+    returned to the caller, so memory does not grow with the corpus.
+    """
+
+    def __init__(self, timeout: float = 60.0, executable: str = "latexpand") -> None:
+        """Initialize the runner.
+
+        Parameters
+        ----------
+        timeout : float, default=60.0
+            Seconds after which a job is killed
+        executable : str, default="latexpand"
+            latexpand command
+        """
+        self.timeout = timeout
+        self.executable = executable
+        self._lock = threading.Lock()
+        self._results: List[_JobSummary] = []
+
+    @property
+    def available(self) -> bool:
+        """True if the latexpand executable is on the PATH."""
+        return shutil.which(self.executable) is not None
+
+    def run(self, main_tex: Path) -> LatexpandResult:
+        """Expand a main TeX file.
+
+        Parameters
+        ----------
+        main_tex : Path
+            Main TeX file; latexpand runs in its directory
+
+        Returns
+        -------
+        LatexpandResult
+            Output, exit status and wall time of the job
+        """
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [self.executable, main_tex.name],
+            cwd=main_tex.parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            start_new_session=True,
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=self.timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            # kill latexpand together with anything it spawned
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            stdout, stderr = process.communicate()
+            timed_out = True
+
+        result = LatexpandResult(
+            main_tex=main_tex,
+            stdout=stdout,
+            stderr=stderr,
+            returncode=None if timed_out else process.returncode,
+            wall_seconds=time.perf_counter() - start,
+            timed_out=timed_out,
+        )
+        summary = _JobSummary(
+            main_tex=result.main_tex,
+            stderr=result.stderr,
+            returncode=result.returncode,
+            wall_seconds=result.wall_seconds,
+            timed_out=result.timed_out,
+            ok=result.ok,
+        )
+        with self._lock:
+            self._results.append(summary)
+        return result
+
+    def log_summary(self, n_slowest: int = 5) -> None:
+        """Log job counts, wall-time percentiles and the slowest or failed jobs."""
+        with self._lock:
+            results = list(self._results)
+        if not results:
+            return
+
+        walls = sorted(result.wall_seconds for result in results)
+        failed = [result for result in results if not result.ok]
+        timed_out = sum(result.timed_out for result in results)
+        p95 = walls[min(int(0.95 * len(walls)), len(walls) - 1)]
+        logger.info(
+            f"latexpand: {len(results)} jobs, {len(failed)} failed ({timed_out} timed out), "
+            f"wall p50={statistics.median(walls):.2f}s p95={p95:.2f}s max={walls[-1]:.2f}s"
+        )
+        for result in sorted(results, key=lambda r: -r.wall_seconds)[:n_slowest]:
+            logger.debug(f"latexpand slowest: {result.main_tex} {result.wall_seconds:.2f}s")
+        for result in failed:
+            stderr = result.stderr.strip().splitlines()
+            reason = "timed out" if result.timed_out else (stderr[-1] if stderr else "empty output")
+            logger.warning(f"latexpand failed on {result.main_tex}: {reason}")
@@ -0,0 +1,285 @@
+from pathlib import Path
+from typing import Optional
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# bump whenever the way artifacts are produced changes, so that stale artifacts
+# are rebuilt instead of being skipped
+PIPELINE_VERSION = "2"
+
+# columns added after the first manifests were written, with their types
+ADDED_COLUMNS = {"inspire_updated": "TEXT", "source_format": "TEXT", "main_file": "TEXT"}
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactManifest:
+    """SQLite record of the artifacts produced for each paper.
+
+    One row per arXiv ID and artifact type (``pdf``, ``abstract``, ``source``,
+    ``expanded_tex``) stores the status, path, size, sha256, source URL, the
+    pipeline version that produced it and the INSPIRE revision (``updated`` stamp)
+    of the record it was produced for, so reruns can skip work that is still valid.
+
+    Statuses are ``complete``, ``failed`` (transient, retried on the next run) and
+    ``no_source`` (terminal: the e-print holds no LaTeX source, e.g. a PDF-only
+    submission, whose detected format is kept in ``source_format``). ``source``
+    rows also hold the name of the main TeX file detected among the extracted
+    sources, so the detection runs once per tarball.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open (creating if needed) the manifest.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                "arxiv_id TEXT NOT NULL, artifact TEXT NOT NULL, status TEXT NOT NULL, "
+                "path TEXT, size INTEGER, sha256 TEXT, source_url TEXT, "
+                "pipeline_version TEXT NOT NULL, updated_at TEXT NOT NULL, "
+                "inspire_updated TEXT, source_format TEXT, main_file TEXT, "
+                "PRIMARY KEY (arxiv_id, artifact))"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(artifacts)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE artifacts ADD COLUMN {column} {column_type}"
+                    )
+
+    def __enter__(self) -> "ArtifactManifest":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _upsert(
+        self,
+        arxiv_id: str,
+        artifact: str,
+        status: str,
+        path: Optional[Path] = None,
+        size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        source_url: Optional[str] = None,
+        inspire_updated: Optional[str] = None,
+        source_format: Optional[str] = None,
+        main_file: Optional[str] = None,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (arxiv_id, artifact, status, path, "
+                "size, sha256, source_url, pipeline_version, updated_at, inspire_updated, "
+                "source_format, main_file) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    arxiv_id,
+                    artifact,
+                    status,
+                    str(path) if path else None,
+                    size,
+                    sha256,
+                    source_url,
+                    PIPELINE_VERSION,
+                    datetime.now(timezone.utc).isoformat(),
+                    inspire_updated,
+                    source_format,
+                    main_file,
+                ),
+            )
+
+    def record(
+        self,
+        arxiv_id: str,
+        artifact: str,
+        path: Path,
+        sha256: Optional[str] = None,
+        source_url: Optional[str] = None,
+        inspire_updated: Optional[str] = None,
+        source_format: Optional[str] = None,
+        main_file: Optional[str] = None,
+    ) -> None:
+        """Record a completed artifact.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            arXiv identifier of the paper
+        artifact : str
+            Artifact type
+        path : Path
+            File or directory holding the artifact
+        sha256 : Optional[str], default=None
+            Content digest; computed from the file if not given (left empty for
+            directories)
+        source_url : Optional[str], default=None
+            URL the artifact was downloaded from, if any
+        inspire_updated : Optional[str], default=None
+            INSPIRE ``updated`` stamp of the record the artifact was produced for
+        source_format : Optional[str], default=None
+            Detected format of the e-print the artifact was extracted from
+        main_file : Optional[str], default=None
+            Name of the main TeX file, for extracted sources
+        """
+        size = None
+        if path.is_file():
+            size = path.stat().st_size
+            sha256 = sha256 or sha256_file(path)
+        self._upsert(
+            arxiv_id,
+            artifact,
+            "complete",
+            path,
+            size,
+            sha256,
+            source_url,
+            inspire_updated,
+            source_format,
+            main_file,
+        )
+
+    def record_failure(
+        self,
+        arxiv_id: str,
+        artifact: str,
+        source_url: Optional[str] = None,
+        inspire_updated: Optional[str] = None,
+    ) -> None:
+        """Record that producing an artifact failed, so it is retried next run."""
+        self._upsert(
+            arxiv_id, artifact, "failed", source_url=source_url, inspire_updated=inspire_updated
+        )
+
+    def record_no_source(
+        self,
+        arxiv_id: str,
+        source_format: str,
+        source_url: Optional[str] = None,
+        inspire_updated: Optional[str] = None,
+    ) -> None:
+        """Record that a paper's e-print holds no LaTeX source, so it is not
+        downloaded again until the record or the pipeline version changes."""
+        self._upsert(
+            arxiv_id,
+            "source",
+            "no_source",
+            source_url=source_url,
+            inspire_updated=inspire_updated,
+            source_format=source_format,
+        )
+
+    def no_source(
+        self, arxiv_id: str, inspire_updated: Optional[str] = None
+    ) -> Optional[str]:
+        """Return the detected format of an e-print recorded as holding no LaTeX
+        source by the current pipeline version (for the given INSPIRE revision of
+        the record, if any), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source_format FROM artifacts WHERE arxiv_id = ? "
+                "AND artifact = 'source' AND status = 'no_source' "
+                "AND pipeline_version = ? AND (? IS NULL OR inspire_updated = ?)",
+                (arxiv_id, PIPELINE_VERSION, inspire_updated, inspire_updated),
+            ).fetchone()
+        return row[0] if row else None
+
+    def completed(
+        self, arxiv_id: str, artifact: str, inspire_updated: Optional[str] = None
+    ) -> Optional[Path]:
+        """Return the path of a still-valid completed artifact, if any.
+
+        An artifact is valid if it is recorded as complete by the current pipeline
+        version, for the given INSPIRE revision of the record (if any), and is still
+        on disk with the recorded size.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            arXiv identifier of the paper
+        artifact : str
+            Artifact type
+        inspire_updated : Optional[str], default=None
+            INSPIRE ``updated`` stamp of the record as listed now; artifacts
+            produced for another revision are stale
+
+        Returns
+        -------
+        Optional[Path]
+            Path of the artifact, or None if it has to be (re)produced
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size FROM artifacts WHERE arxiv_id = ? AND artifact = ? "
+                "AND status = 'complete' AND pipeline_version = ? "
+                "AND (? IS NULL OR inspire_updated = ?)",
+                (arxiv_id, artifact, PIPELINE_VERSION, inspire_updated, inspire_updated),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+
+        path, size = Path(row[0]), row[1]
+        if size is None:
+            return path if path.is_dir() else None
+        return path if path.is_file() and path.stat().st_size == size else None
+
+    def recorded_path(self, arxiv_id: str, artifact: str) -> Optional[Path]:
+        """Return the recorded path of a completed artifact, whether or not it is
+        still on disk."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM artifacts WHERE arxiv_id = ? AND artifact = ? "
+                "AND status = 'complete' AND pipeline_version = ?",
+                (arxiv_id, artifact, PIPELINE_VERSION),
+            ).fetchone()
+        return Path(row[0]) if row and row[0] else None
+
+    def main_file(self, arxiv_id: str) -> Optional[str]:
+        """Return the main TeX file name recorded for the extracted sources of a
+        paper by the current pipeline version, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT main_file FROM artifacts WHERE arxiv_id = ? AND artifact = 'source' "
+                "AND status = 'complete' AND pipeline_version = ?",
+                (arxiv_id, PIPELINE_VERSION),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_main_file(self, arxiv_id: str, main_file: str) -> None:
+        """Record the main TeX file name of the completed extracted sources of a paper."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE artifacts SET main_file = ? WHERE arxiv_id = ? "
+                "AND artifact = 'source' AND status = 'complete'",
+                (main_file, arxiv_id),
+            )
+
+    def digest(self, arxiv_id: str, artifact: str) -> Optional[str]:
+        """Return the recorded sha256 of a completed artifact, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM artifacts WHERE arxiv_id = ? AND artifact = ? "
+                "AND status = 'complete'",
+                (arxiv_id, artifact),
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -0,0 +1,199 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from core.models import PaperTable
+
+# typed columns of the paper metadata, following core.models.LHCbPaper
+PAPER_SCHEMA = pa.schema(
+    [
+        ("arxiv_id", pa.string()),
+        ("lhcb_paper_id", pa.string()),
+        ("title", pa.string()),
+        ("citations", pa.int64()),
+        ("working_groups", pa.list_(pa.string())),
+        ("data_taking_years", pa.list_(pa.string())),
+        ("run_period", pa.string()),
+        ("abstract", pa.string()),
+        ("latex_source", pa.string()),
+        ("arxiv_pdf", pa.string()),
+        ("control_number", pa.int64()),
+        ("updated", pa.string()),
+    ]
+)
+
+METADATA_FILE = "lhcb_papers.parquet"
+
+
+def write_papers(table: pa.Table, path: Path, row_group_size: int = 1024) -> None:
+    """Write paper metadata to Parquet.
+
+    Rows are sorted by run period and citations before writing, so the min/max
+    statistics of each row group let readers skip whole groups when filtering on
+    those columns.
+
+    Parameters
+    ----------
+    table : pa.Table
+        Paper metadata, with (at least) the columns of ``PAPER_SCHEMA``
+    path : Path
+        Parquet file to write
+    row_group_size : int, default=1024
+        Maximum number of rows per row group
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = table.sort_by([("run_period", "ascending"), ("citations", "descending")])
+    tmp = path.with_name(f".{path.name}.part")
+    pq.write_table(table, tmp, row_group_size=row_group_size, compression="zstd")
+    tmp.replace(path)
+
+
+def papers_to_table(
+    records: Iterable[Dict[str, Any]], schema: pa.Schema = PAPER_SCHEMA
+) -> pa.Table:
+    """Build a typed metadata table from paper records (e.g. ``model_dump()``s).
+
+    Parameters
+    ----------
+    records : Iterable[Dict[str, Any]]
+        One mapping per paper; keys outside ``schema`` are ignored
+    schema : pa.Schema, default=PAPER_SCHEMA
+        Schema of the table
+
+    Returns
+    -------
+    pa.Table
+        Metadata table
+    """
+    return pa.Table.from_pylist(list(records), schema=schema)
+
+
+def paper_table_to_arrow(papers: PaperTable, schema: pa.Schema = PAPER_SCHEMA) -> pa.Table:
+    """Convert a ``PaperTable`` to a metadata table, column by column."""
+    return pa.table({name: papers.column(name) for name in schema.names}, schema=schema)
+
+
+def _filter_expression(
+    run_period: Optional[Sequence[str]], min_citations: Optional[int]
+) -> Optional[pc.Expression]:
+    expression = None
+    if run_period:
+        expression = pc.field("run_period").isin(list(run_period))
+    if min_citations is not None:
+        condition = pc.field("citations") >= min_citations
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _with_working_groups(table: pa.Table, working_groups: Sequence[str]) -> pa.Table:
+    """Keep the rows whose ``working_groups`` list holds any of ``working_groups``."""
+    column = table.column("working_groups").combine_chunks()
+    flat = pc.list_flatten(column)
+    parents = pc.list_parent_indices(column)
+    # parent indices are ascending, so unique() keeps the rows in table order
+    matching = pc.unique(pc.filter(parents, pc.is_in(flat, value_set=pa.array(working_groups))))
+    return table.take(matching)
+
+
+def load_papers(
+    path: Path,
+    columns: Optional[List[str]] = None,
+    run_period: Optional[Sequence[str]] = None,
+    min_citations: Optional[int] = None,
+    working_groups: Optional[Sequence[str]] = None,
+    memory_map: bool = True,
+) -> pa.Table:
+    """Load (a filtered subset of) the paper metadata as an Arrow table.
+
+    Filters on run period and citations are pushed down to the Parquet reader,
+    which skips row groups whose statistics rule them out; the working-group filter
+    is then applied on the list column. Needs pyarrow only, not pandas.
+
+    Parameters
+    ----------
+    path : Path
+        Parquet file written by ``write_papers``
+    columns : Optional[List[str]], default=None
+        Columns to read (all if None)
+    run_period : Optional[Sequence[str]], default=None
+        Keep papers with one of these run periods, e.g. ``["Run2", "Run1+Run2"]``
+    min_citations : Optional[int], default=None
+        Keep papers with at least this many citations
+    working_groups : Optional[Sequence[str]], default=None
+        Keep papers associated with any of these working groups
+    memory_map : bool, default=True
+        Memory-map the file instead of reading it into memory
+
+    Returns
+    -------
+    pa.Table
+        Matching papers
+    """
+    read_columns = columns
+    if columns is not None and working_groups and "working_groups" not in columns:
+        read_columns = columns + ["working_groups"]
+
+    table = pq.read_table(
+        path,
+        columns=read_columns,
+        filters=_filter_expression(run_period, min_citations),
+        memory_map=memory_map,
+    )
+    if working_groups:
+        table = _with_working_groups(table, working_groups)
+        if read_columns is not columns:
+            table = table.select(columns)
+    return table
+
+
+def load_paper_table(path: Path, **filters: Any) -> PaperTable:
+    """Load (a filtered subset of) the paper metadata as a ``PaperTable``.
+
+    Parameters
+    ----------
+    path : Path
+        Parquet file written by ``write_papers``
+    **filters : Any
+        ``run_period``, ``min_citations`` and ``working_groups`` filters, see
+        ``load_papers``
+
+    Returns
+    -------
+    PaperTable
+        Matching papers
+    """
+    return PaperTable(load_papers(path, **filters).to_pydict())
+
+
+def update_citations(path: Path, citations: Mapping[str, int]) -> int:
+    """Overwrite the citation counts of stored papers.
+
+    The file is rewritten through ``write_papers``, i.e. replaced atomically;
+    papers absent from ``citations`` keep their stored count.
+
+    Parameters
+    ----------
+    path : Path
+        Parquet file written by ``write_papers``
+    citations : Mapping[str, int]
+        New citation counts, keyed by arXiv ID
+
+    Returns
+    -------
+    int
+        Number of papers whose citation count changed
+    """
+    table = pq.read_table(path)
+    arxiv_ids = table.column("arxiv_id").to_pylist()
+    stored = table.column("citations").to_pylist()
+    refreshed = [citations.get(a, n) if a else n for a, n in zip(arxiv_ids, stored)]
+
+    index = table.schema.get_field_index("citations")
+    table = table.set_column(
+        index, table.schema.field(index), pa.array(refreshed, type=pa.int64())
+    )
+    write_papers(table, path)
+    return sum(old != new for old, new in zip(stored, refreshed))
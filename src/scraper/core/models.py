@@ -1,12 +1,13 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic.fields import FieldInfo
 
 class LHCbPaper(BaseModel):
     """Model representing an LHCb paper with its metadata."""
     
     lhcb_paper_id: Optional[str] = Field(..., description="Unique identifier for the paper")
     title: str = Field(..., description="Paper title")
-    arxiv_id: str = Field(None, description="arXiv identifier if available")
+    arxiv_id: Optional[str] = Field(None, description="arXiv identifier if available")
     citations: int = Field(0, description="Number of citations")
     working_groups: Optional[List[str]] = Field(default_factory=list, description="Associated working groups")
     data_taking_years: Optional[List[str]] = Field(default_factory=list, description="Data-taking years")
@@ -14,5 +15,115 @@ class LHCbPaper(BaseModel):
     abstract: str = Field(..., description="Paper abstract")
     latex_source: Optional[str] = Field(None, description="LaTeX source code")
     arxiv_pdf: Optional[str] = Field(None, description="arXiv PDF URL")
-    
-    
\ No newline at end of file
+    control_number: Optional[int] = Field(None, description="INSPIRE record control number")
+    updated: Optional[str] = Field(None, description="INSPIRE record last-update timestamp")
+
+
+def _column_adapter(field: FieldInfo) -> TypeAdapter:
+    """Validator of a whole column of an ``LHCbPaper`` field."""
+    annotation = field.annotation
+    if not field.is_required() and field.get_default(call_default_factory=True) is None:
+        # a None default is accepted by the model, so it is by the column too
+        annotation = Optional[annotation]
+    return TypeAdapter(List[annotation])
+
+
+class PaperTable:
+    """Column-oriented collection of papers, validated one column at a time.
+
+    Each field of ``LHCbPaper`` is held as a list, validated by a single pydantic
+    call per column instead of one model validation per paper. ``LHCbPaper``
+    objects are only materialized (without re-validation) when a row is accessed,
+    and papers can be looked up by arXiv ID or LHCb paper ID in O(1).
+    """
+
+    _adapters: Dict[str, TypeAdapter] = {}
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]]) -> None:
+        """Validate the columns and build the table.
+
+        Parameters
+        ----------
+        columns : Mapping[str, Sequence[Any]]
+            Field name -> column values; columns of fields with defaults may be
+            omitted, other keys are ignored
+
+        Raises
+        ------
+        pydantic.ValidationError
+            If a column holds a value invalid for its field
+        ValueError
+            If a required column is missing or the columns differ in length
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns differ in length: {sorted(lengths)}")
+        n_rows = lengths.pop() if lengths else 0
+
+        if not PaperTable._adapters:
+            PaperTable._adapters = {
+                name: _column_adapter(field) for name, field in LHCbPaper.model_fields.items()
+            }
+
+        self.columns: Dict[str, List[Any]] = {}
+        for name, field in LHCbPaper.model_fields.items():
+            if name in columns:
+                self.columns[name] = PaperTable._adapters[name].validate_python(
+                    list(columns[name])
+                )
+            elif field.is_required():
+                raise ValueError(f"Missing required column: {name}")
+            else:
+                self.columns[name] = [
+                    field.get_default(call_default_factory=True) for _ in range(n_rows)
+                ]
+        self._n_rows = n_rows
+        self._by_arxiv_id: Optional[Dict[str, int]] = None
+        self._by_lhcb_id: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "PaperTable":
+        """Build a table from one mapping per paper (e.g. scraped rows)."""
+        records = list(records)
+        names = {name for record in records for name in record} & set(LHCbPaper.model_fields)
+        return cls(
+            {name: [record.get(name) for record in records] for name in names}
+            if records
+            else {name: [] for name in LHCbPaper.model_fields}
+        )
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Return the field values of one paper."""
+        return {name: values[index] for name, values in self.columns.items()}
+
+    def __getitem__(self, index: int) -> LHCbPaper:
+        """Materialize one paper, without validating it again."""
+        return LHCbPaper.model_construct(**self.row(index))
+
+    def __iter__(self) -> Iterator[LHCbPaper]:
+        return (self[index] for index in range(self._n_rows))
+
+    def column(self, name: str) -> List[Any]:
+        """Return the values of one field across all papers."""
+        return self.columns[name]
+
+    def _index(self, name: str) -> Dict[str, int]:
+        return {value: i for i, value in enumerate(self.columns[name]) if value}
+
+    def by_arxiv_id(self, arxiv_id: str) -> Optional[LHCbPaper]:
+        """Return the paper with the given arXiv ID, if any."""
+        if self._by_arxiv_id is None:
+            self._by_arxiv_id = self._index("arxiv_id")
+        index = self._by_arxiv_id.get(arxiv_id)
+        return self[index] if index is not None else None
+
+    def by_lhcb_id(self, lhcb_paper_id: str) -> Optional[LHCbPaper]:
+        """Return the paper with the given LHCb paper ID, if any."""
+        if self._by_lhcb_id is None:
+            self._by_lhcb_id = self._index("lhcb_paper_id")
+        index = self._by_lhcb_id.get(lhcb_paper_id)
+        return self[index] if index is not None else None
+
@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+import queue
+import threading
+import time
+
+from loguru import logger
+
+# marks the end of the stream on a stage queue
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput counters of a pipeline stage."""
+
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            self.processed += 1
+            self.failed += int(failed)
+            self.busy_seconds += elapsed
+
+    def summary(self, wall_seconds: float) -> str:
+        """Return a one-line summary of the stage throughput over ``wall_seconds``."""
+        rate = self.processed / wall_seconds if wall_seconds > 0 else 0.0
+        utilisation = self.busy_seconds / (wall_seconds * self.workers or 1)
+        return (
+            f"{self.name:<10} workers={self.workers:<3} processed={self.processed:<6} "
+            f"failed={self.failed:<5} {rate:6.2f} items/s "
+            f"busy={100 * min(utilisation, 1):5.1f}%"
+        )
+
+
+@dataclass
+class Stage:
+    """A pipeline stage: a function applied to every item by a pool of workers.
+
+    The function receives an item and returns it (possibly updated) for the next
+    stage. Exceptions are logged and counted as failures, and the item is still
+    forwarded, so later stages decide for themselves whether there is work left.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+
+
+class Pipeline:
+    """Staged producer/consumer pipeline with bounded queues between stages.
+
+    Each stage runs on its own pool of threads and hands items to the next stage
+    through a bounded queue, so a slow stage applies backpressure upstream instead
+    of letting work pile up in memory, while fast stages keep running concurrently.
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: int = 32) -> None:
+        """Initialize the pipeline.
+
+        Parameters
+        ----------
+        stages : Sequence[Stage]
+            Stages to run, in order
+        queue_size : int, default=32
+            Capacity of each inter-stage queue
+        """
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.stats = [StageStats(stage.name, stage.workers) for stage in self.stages]
+        self.wall_seconds = 0.0
+        self.source_error: Optional[BaseException] = None
+
+    def _feed(self, source: Iterable[Any], out: queue.Queue, n_workers: int) -> None:
+        try:
+            for item in source:
+                out.put(item)
+        except Exception as e:
+            # re-raised by run() once the items already fed have drained
+            logger.error(f"Pipeline source failed: {e}")
+            self.source_error = e
+        finally:
+            for _ in range(n_workers):
+                out.put(_DONE)
+
+    def _work(
+        self,
+        stage: Stage,
+        stats: StageStats,
+        inbox: queue.Queue,
+        out: queue.Queue,
+        remaining: List[int],
+        lock: threading.Lock,
+        n_downstream: int,
+    ) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+
+            start = time.perf_counter()
+            failed = False
+            try:
+                item = stage.fn(item)
+            except Exception as e:
+                failed = True
+                logger.error(f"Stage '{stage.name}' failed on {item}: {e}")
+            stats.record(time.perf_counter() - start, failed)
+            out.put(item)
+
+        # the last worker of a stage to finish propagates the end of the stream
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(n_downstream):
+                out.put(_DONE)
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Push every item of ``source`` through the stages.
+
+        Parameters
+        ----------
+        source : Iterable[Any]
+            Items to process; consumed on a background thread
+
+        Yields
+        ------
+        Any
+            Items that went through every stage, in completion order
+
+        Raises
+        ------
+        Exception
+            The exception raised by ``source``, if it failed; items it yielded
+            before failing are processed and yielded first, so callers can tell a
+            truncated stream from a complete one
+        """
+        self.source_error = None
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [
+            threading.Thread(
+                target=self._feed,
+                args=(source, queues[0], self.stages[0].workers),
+                name="pipeline-source",
+                daemon=True,
+            )
+        ]
+        for i, (stage, stats) in enumerate(zip(self.stages, self.stats)):
+            n_downstream = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            remaining, lock = [stage.workers], threading.Lock()
+            threads.extend(
+                threading.Thread(
+                    target=self._work,
+                    args=(stage, stats, queues[i], queues[i + 1], remaining, lock, n_downstream),
+                    name=f"pipeline-{stage.name}-{j}",
+                    daemon=True,
+                )
+                for j in range(stage.workers)
+            )
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self.wall_seconds = time.perf_counter() - start
+        if self.source_error is not None:
+            raise self.source_error
+
+    def log_summary(self) -> None:
+        """Log the per-stage throughput counters of the last run."""
+        logger.info(f"Pipeline finished in {self.wall_seconds:.1f}s")
+        for stats in self.stats:
+            logger.info(stats.summary(self.wall_seconds))
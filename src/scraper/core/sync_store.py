@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import Optional
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from core.models import LHCbPaper
+
+
+class SyncStore:
+    """SQLite-backed record of the INSPIRE records already synced into the corpus.
+
+    Each record is keyed by its INSPIRE control number and stores the update
+    timestamp seen when it was last downloaded, together with the date of the last
+    successful sync, so that incremental runs only process new or changed records.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open (creating if needed) the sync store.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "control_number INTEGER PRIMARY KEY, arxiv_id TEXT, "
+                "updated TEXT, synced_at TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def __enter__(self) -> "SyncStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def last_sync(self) -> Optional[str]:
+        """Return the date (YYYY-MM-DD) of the last successful sync, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = 'last_sync'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_last_sync(self, date: str) -> None:
+        """Record the date (YYYY-MM-DD) of a successful sync."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_sync', ?)",
+                (date,),
+            )
+
+    def is_current(self, paper: LHCbPaper) -> bool:
+        """Check whether a paper was already synced at its current INSPIRE revision.
+
+        Parameters
+        ----------
+        paper : LHCbPaper
+            Paper as returned by INSPIRE
+
+        Returns
+        -------
+        bool
+            True if the record is known and its update timestamp is unchanged
+        """
+        if paper.control_number is None:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated FROM records WHERE control_number = ?",
+                (paper.control_number,),
+            ).fetchone()
+        return row is not None and row[0] == paper.updated
+
+    def record(self, paper: LHCbPaper) -> None:
+        """Mark a paper as synced at its current INSPIRE revision.
+
+        Parameters
+        ----------
+        paper : LHCbPaper
+            Paper whose artifacts were successfully downloaded
+        """
+        if paper.control_number is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records "
+                "(control_number, arxiv_id, updated, synced_at) VALUES (?, ?, ?, ?)",
+                (
+                    paper.control_number,
+                    paper.arxiv_id,
+                    paper.updated,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -1,10 +1,30 @@
 import click
 from loguru import logger
 from pathlib import Path
-from api_clients.inspire import InspireClient, LHCbPaper
+from api_clients.inspire import (
+    ARXIV_EXPORT_URL,
+    ARXIV_URL,
+    INSPIRE_API_URL,
+    InspireClient,
+    LHCbPaper,
+)
+from api_clients.http import HttpTransport, sniff_source_format
+from api_clients.http_cache import ResponseCache
+from api_clients.rate_limit import AdaptiveRateLimiter
+from core.blob_store import BlobStore
+from core.extraction import EXTRACT_ALL, MEMBER_LISTING, ExtractionPolicy
+from core.manifest import ArtifactManifest
+from core.pipeline import Pipeline, Stage
+from core.sync_store import SyncStore
 from tqdm import tqdm
-from dataclasses import dataclass
-from typing import Optional, Sequence
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+import os
+
+N_CORES = max((os.cpu_count() or 2) - 1, 1)
 
 
 @dataclass(frozen=True, slots=True)
@@ -17,36 +37,136 @@ class CorpusConfig:
     download: bool
     output_dir: Path
     verbose: bool
+    incremental: bool = False
+    http_cache: Optional[Path] = None
+    http_cache_size: int = 4096
+    offline: bool = False
+    download_workers: int = 4
+    extract_workers: int = N_CORES
+    latexpand_workers: int = N_CORES
+    queue_size: int = 32
+    resume: bool = True
+    extract_all: bool = False
+    member_listing: bool = False
+    blob_store: bool = False
+    gc_blobs: bool = False
+    inspire_url: str = INSPIRE_API_URL
+    arxiv_url: str = ARXIV_URL
+    arxiv_export_url: str = ARXIV_EXPORT_URL
+    inspire_dump: Optional[Path] = None
+    log_file: Path = Path("corpus_build.log")
+
+
+@dataclass
+class PaperJob:
+    """A paper travelling through the download pipeline, with its artifacts."""
+
+    paper: LHCbPaper
+    pdf_path: Optional[Path] = None
+    abstract_path: Optional[Path] = None
+    source_file: Optional[Path] = None
+    source_dir: Optional[Path] = None
+    expanded_path: Optional[Path] = None
+    source_format: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"arXiv:{self.paper.arxiv_id}"
+
+    @property
+    def success(self) -> bool:
+        """True if either PDF, expanded source or abstract was written."""
+        return any([self.pdf_path, self.expanded_path, self.abstract_path])
 
 
 class CorpusBuilder:
-    """Class orchestrating the building an LHCb paper corpus from scraper API."""
+    """Class orchestrating the building an LHCb paper corpus from scraper API.
 
-    def __init__(self, config: CorpusConfig):
+    The builder owns the HTTP transport (unless one is passed in), the manifest and
+    the blob store it opens; use it as a context manager, or call ``close``, to
+    release them.
+    """
+
+    def __init__(self, config: CorpusConfig, transport: Optional[HttpTransport] = None):
         self.config = config
         self._setup_logger()
-        self.client = self._init_inspire_client()
+        self._resources = ExitStack()
+        self.client = self._init_inspire_client(transport)
+
+    def __enter__(self) -> "CorpusBuilder":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the transport, response cache, manifest and blob store opened by
+        the builder."""
+        self._resources.close()
 
     def _setup_logger(self):
         """Configure logger based on elected verbosity level."""
         log_level = "DEBUG" if self.config.verbose else "INFO"
         logger.remove()
         logger.add(
-            "corpus_build.log",
+            self.config.log_file,
             rotation="1 week",
             level=log_level,
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
         )
         logger.add(lambda msg: click.echo(msg, err=True), level=log_level)
 
-    def _init_inspire_client(self) -> InspireClient:
-        """Initialize INSPIRE client with configured directories."""
+    def _init_inspire_client(
+        self, transport: Optional[HttpTransport] = None
+    ) -> InspireClient:
+        """Initialize INSPIRE client with configured directories, sharing the
+        caller's HTTP transport if one is given. Otherwise the transport's arXiv
+        rate-limiter state is persisted in the output directory across runs."""
+        if transport is None:
+            cache = None
+            if self.config.http_cache:
+                cache = ResponseCache(
+                    self.config.http_cache,
+                    max_bytes=self.config.http_cache_size * 1024**2,
+                    offline=self.config.offline,
+                )
+            # closing the transport also closes its response cache
+            transport = self._resources.enter_context(
+                HttpTransport(
+                    cache=cache,
+                    limiter=AdaptiveRateLimiter(
+                        state_file=self.config.output_dir / "rate_limits.json"
+                    ),
+                )
+            )
+
+        manifest = None
+        if self.config.resume:
+            manifest = self._resources.enter_context(
+                ArtifactManifest(self.config.output_dir / "manifest.sqlite")
+            )
+
+        policy = EXTRACT_ALL if self.config.extract_all else ExtractionPolicy()
+        if self.config.member_listing:
+            policy = replace(policy, keep_listing=True)
+
+        blob_store = None
+        if self.config.blob_store:
+            blob_store = self._resources.enter_context(
+                BlobStore(self.config.output_dir / "blob_store")
+            )
 
         return InspireClient(
             abstract_dir=self.config.output_dir / "abstracts",
             pdf_dir=self.config.output_dir / "pdfs",
             source_dir=self.config.output_dir / "source",
             expanded_tex_dir=self.config.output_dir / "expanded_tex",
+            transport=transport,
+            manifest=manifest,
+            extraction_policy=policy,
+            blob_store=blob_store,
+            base_url=self.config.inspire_url,
+            arxiv_url=self.config.arxiv_url,
+            arxiv_export_url=self.config.arxiv_export_url,
         )
 
     def download_paper(self, paper: LHCbPaper) -> bool:
@@ -83,50 +203,196 @@ class CorpusBuilder:
 
         return success
 
+    def _fetch_pdf_and_abstract(self, job: PaperJob) -> PaperJob:
+        """Pipeline stage: download the PDF and write the abstract (I/O-bound)."""
+        if job.paper.arxiv_pdf:
+            job.pdf_path = self.client.download_pdf(job.paper)
+        if job.paper.abstract:
+            job.abstract_path = self.client.download_abstract(job.paper)
+        return job
+
+    def _fetch_source(self, job: PaperJob) -> PaperJob:
+        """Pipeline stage: download the e-print tarball (I/O-bound), unless the
+        manifest already holds its extracted or expanded sources."""
+        if not job.paper.latex_source:
+            return job
+        job.expanded_path = self.client.completed_artifact(job.paper, "expanded_tex")
+        if job.expanded_path is None:
+            job.source_dir = self.client.completed_artifact(job.paper, "source")
+        if job.expanded_path is None and job.source_dir is None:
+            job.source_file = self.client.fetch_source(job.paper)
+        return job
+
+    def _extract_source(self, job: PaperJob) -> PaperJob:
+        """Pipeline stage: unpack the e-print tarball and expand it in-process (CPU/disk-bound)."""
+        if job.source_file:
+            job.source_format = sniff_source_format(job.source_file)
+            unpacked = self.client.unpack_source(
+                job.paper, job.source_file, job.source_format
+            )
+            if unpacked:
+                job.source_dir, members = unpacked
+                job.expanded_path = self.client.expand_members(job.paper, members)
+        return job
+
+    def _expand_source(self, job: PaperJob) -> PaperJob:
+        """Pipeline stage: run latexpand on sources the in-process expander left over."""
+        if job.source_dir and not job.expanded_path:
+            job.expanded_path = self.client.expand_latex(job.paper, job.source_dir)
+        return job
+
+    def download_papers(self, papers: Iterable[LHCbPaper]) -> Iterator[PaperJob]:
+        """Download PDF, LaTeX source and abstract for a stream of papers.
+
+        Papers flow through a staged pipeline (PDF/abstract download, source
+        download, tarball extraction with in-process include expansion, latexpand
+        fallback), each stage with its own worker pool and a bounded queue in front
+        of it, so network transfers, disk I/O and expansion overlap across papers.
+
+        Parameters
+        ----------
+        papers: Iterable[LHCbPaper]
+            Papers to download; consumed lazily, so listing overlaps with downloading
+
+        Yields
+        ------
+        PaperJob
+            Finished jobs, in completion order
+        """
+        pipeline = Pipeline(
+            [
+                Stage("pdf", self._fetch_pdf_and_abstract, self.config.download_workers),
+                Stage("source", self._fetch_source, self.config.download_workers),
+                Stage("extract", self._extract_source, self.config.extract_workers),
+                Stage("latexpand", self._expand_source, self.config.latexpand_workers),
+            ],
+            queue_size=self.config.queue_size,
+        )
+        source_formats = Counter()
+        try:
+            for job in pipeline.run(PaperJob(paper) for paper in papers):
+                if job.source_format:
+                    source_formats[job.source_format] += 1
+                if job.pdf_path:
+                    logger.debug(f"Downloaded PDF: {job.pdf_path}")
+                if job.expanded_path:
+                    logger.debug(f"Downloaded and expanded source: {job.expanded_path}")
+                if job.abstract_path:
+                    logger.debug(f"Downloaded abstract: {job.abstract_path}")
+                yield job
+        finally:
+            pipeline.log_summary()
+            self.client.latexpand.log_summary()
+            if source_formats:
+                logger.info(
+                    "Source formats: "
+                    + ", ".join(f"{fmt}={n}" for fmt, n in source_formats.most_common())
+                )
+            self.client.http.limiter.save()
+
     def build(self) -> None:
         """Enact the building of the corpus, downloading PDF and latexpanded TeX source."""
         logger.info(
             f"Starting corpus build: max_papers={self.config.max_papers}, "
-            f"download={self.config.download}, output_dir={self.config.output_dir}"
+            f"download={self.config.download}, output_dir={self.config.output_dir}, "
+            f"incremental={self.config.incremental}"
         )
-        papers: Sequence[LHCbPaper] = self.client.fetch_lhcb_papers(
+
+        sync_store = None
+        updated_since = None
+        sync_started = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        if self.config.incremental:
+            sync_store = SyncStore(self.config.output_dir / "inspire_sync.sqlite")
+            updated_since = sync_store.last_sync()
+            logger.info(
+                f"Incremental sync: fetching records updated since {updated_since}"
+                if updated_since
+                else "Incremental sync: no previous sync found, fetching all records"
+            )
+
+        try:
+            self._build(sync_store, updated_since, sync_started)
+        except Exception:
+            # a truncated listing must not advance the sync date past unseen records
+            if sync_store is not None:
+                logger.error("Build aborted: incremental sync date not advanced")
+            raise
+        finally:
+            if sync_store is not None:
+                sync_store.close()
+
+        if self.config.gc_blobs and self.client.blob_store is not None:
+            self.client.blob_store.gc()
+
+    def _build(
+        self,
+        sync_store: Optional[SyncStore],
+        updated_since: Optional[str],
+        sync_started: str,
+    ) -> None:
+        """Stream papers from INSPIRE (or a local dump of it) and download them as
+        they arrive, skipping records already synced at their current revision when
+        a sync store is given."""
+        query = dict(
             start_date=self.config.start_date,
             end_date=self.config.end_date,
             max_results=self.config.max_papers,
             sort_by="mostcited",
+            updated_since=updated_since,
         )
-
-        logger.info(f"Found {len(papers)} papers on INSPIRE")
-
-        if not papers:
-            logger.warning("No papers found matching the query criteria, exiting.")
-            return
-
-        # if requested, download PDF and source for each paper
-        if self.config.download:
-            failed_downloads = []
-            for paper in tqdm(papers, desc="Downloading and unpacking LHCb papers"):
+        papers: Iterable[LHCbPaper]
+        if self.config.inspire_dump:
+            logger.info(f"Reading papers from the INSPIRE dump {self.config.inspire_dump}")
+            papers = self.client.iter_dump_papers(self.config.inspire_dump, **query)
+        else:
+            papers = self.client.iter_lhcb_papers(**query)
+
+        if sync_store is not None:
+            papers = (p for p in papers if not sync_store.is_current(p))
+
+        n_papers = 0
+        failed_downloads = []
+        if not self.config.download:
+            for paper in tqdm(papers, desc="Listing LHCb papers"):
+                n_papers += 1
                 logger.info(
                     f"Fetched LHCb paper '{paper.title}' (arXiv:{paper.arxiv_id}) [{paper.citations} citations to date]"
                 )
-
-                try:
-                    success = self.download_paper(paper)
-                    if not success:
-                        failed_downloads.append(paper)
-                        logger.warning(
-                            f"Failed to download paper '{paper.title}' "
-                            f"(arXiv:{paper.arxiv_id})"
-                        )
-                except Exception as e:
+        else:
+            # if requested, download PDF and source for each paper
+            for job in tqdm(
+                self.download_papers(papers), desc="Downloading and unpacking LHCb papers"
+            ):
+                n_papers += 1
+                paper = job.paper
+                if not paper.arxiv_id:
+                    # INSPIRE-only records (no arXiv e-print) have nothing to download
+                    logger.info(f"No arXiv e-print for '{paper.title}', metadata only")
+                    if sync_store is not None:
+                        sync_store.record(paper)
+                elif job.success:
+                    if sync_store is not None:
+                        sync_store.record(paper)
+                else:
                     failed_downloads.append(paper)
-                    logger.error(
-                        f"Error downloading paper '{paper.title}' "
-                        f"(arXiv:{paper.arxiv_id}): {str(e)}"
+                    logger.warning(
+                        f"Failed to download paper '{paper.title}' "
+                        f"(arXiv:{paper.arxiv_id})"
                     )
 
+        logger.info(
+            f"Found {n_papers} papers on INSPIRE"
+            + (" new or changed since the last sync" if sync_store is not None else "")
+        )
+
+        if not n_papers:
+            logger.warning("No papers found matching the query criteria, exiting.")
+            self._advance_sync(sync_store, sync_started)
+            return
+
+        if self.config.download:
             logger.info(
-                f"Successfully downloaded {len(papers) - len(failed_downloads)}/{len(papers)} papers"
+                f"Successfully downloaded {n_papers - len(failed_downloads)}/{n_papers} papers"
             )
 
             if failed_downloads:
@@ -137,6 +403,17 @@ class CorpusBuilder:
                     f"Failed to download {len(failed_downloads)} papers:\n"
                     + "\n".join(f"- {title}" for title in failed_titles)
                 )
+            else:
+                # only advance the sync point once every changed record is on disk,
+                # so failed papers are listed again on the next run
+                self._advance_sync(sync_store, sync_started)
+
+    def _advance_sync(self, sync_store: Optional[SyncStore], sync_started: str) -> None:
+        """Record a successful sync, unless the run was partial (no download, or
+        capped by max_papers) and would otherwise hide unsynced records."""
+        if sync_store is None or not self.config.download or self.config.max_papers:
+            return
+        sync_store.set_last_sync(sync_started)
 
 
 def validate_date(
@@ -231,13 +508,87 @@ def validate_paper_count(
     default=Path("data"),
     help="Base directory for downloaded files",
 )
+@click.option(
+    "--incremental/--full",
+    default=False,
+    help="Only fetch and download records created or updated since the last sync",
+)
+@click.option(
+    "--http-cache",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Directory of the on-disk HTTP response cache (default: no caching)",
+)
+@click.option(
+    "--http-cache-size",
+    type=click.IntRange(1),
+    default=4096,
+    help="Size cap of the HTTP response cache in MB (default: 4096)",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Serve cached responses without revalidation (requires --http-cache)",
+)
+@click.option(
+    "--download-workers",
+    type=click.IntRange(1, 64),
+    default=4,
+    help="Concurrent PDF and source downloads (default: 4)",
+)
+@click.option(
+    "--extract-workers",
+    type=click.IntRange(1, 256),
+    default=N_CORES,
+    help="Concurrent tarball extractions (default: number of cores - 1)",
+)
+@click.option(
+    "--latexpand-workers",
+    type=click.IntRange(1, 256),
+    default=N_CORES,
+    help="Concurrent latexpand subprocesses (default: number of cores - 1)",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    help="Skip artifacts recorded as complete in the output directory's manifest",
+)
+@click.option(
+    "--extract-all",
+    is_flag=True,
+    help="Extract every tarball member, not only TeX sources, styles and bibliographies",
+)
+@click.option(
+    "--member-listing",
+    is_flag=True,
+    help=f"Write an audit listing of each tarball's members to source/<id>/{MEMBER_LISTING}",
+)
+@click.option(
+    "--blob-store",
+    is_flag=True,
+    help="Deduplicate artifacts into a content-addressed store under <output-dir>/blob_store, "
+    "linked into the usual layout",
+)
+@click.option(
+    "--gc-blobs",
+    is_flag=True,
+    help="After the build, delete blobs no artifact references any more (requires --blob-store)",
+)
+@click.option(
+    "--inspire-dump",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+    default=None,
+    help="Read paper metadata from a local INSPIRE literature dump (JSONL, optionally "
+    "gzipped) instead of the API",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
 def main(**kwargs) -> None:
     """Build an LHCb paper corpus from INSPIRE-HEP.
 
     Fetches LHCb collaboration papers from INSPIRE-HEP and optionally downloads their
     PDFs and LaTeX sources. Papers can be filtered by date range and are stored in a
-    structured directory layout.
+    structured directory layout. With --inspire-dump, the metadata is read from a
+    local INSPIRE literature dump, with no API calls.
 
     Downloads the following files for each paper (when available):
     - PDF document
@@ -251,10 +602,14 @@ def main(**kwargs) -> None:
         and kwargs["start_date"] > kwargs["end_date"]
     ):
         raise click.BadParameter("Start date must be before end date")
+    if kwargs["offline"] and not kwargs["http_cache"]:
+        raise click.UsageError("--offline requires --http-cache")
+    if kwargs["gc_blobs"] and not kwargs["blob_store"]:
+        raise click.UsageError("--gc-blobs requires --blob-store")
 
     config = CorpusConfig(**kwargs)
-    builder = CorpusBuilder(config)
-    builder.build()
+    with CorpusBuilder(config) as builder:
+        builder.build()
 
 
 if __name__ == "__main__":
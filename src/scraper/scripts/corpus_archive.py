@@ -0,0 +1,87 @@
+import click
+from loguru import logger
+from pathlib import Path
+from core.corpus_archive import LAYOUT, CorpusArchive, pack_directory, unpack_archive
+
+
+@click.group()
+def main() -> None:
+    """Convert the corpus between its directory layout and a single-file archive."""
+
+
+@main.command()
+@click.option(
+    "--data-dir",
+    "-d",
+    type=click.Path(path_type=Path, exists=True, file_okay=False),
+    default=Path("data"),
+    help="Corpus output directory to pack",
+)
+@click.option(
+    "--archive",
+    "-a",
+    type=click.Path(path_type=Path, dir_okay=False),
+    default=Path("data/corpus.lhcbz"),
+    help="Archive file to create",
+)
+@click.option(
+    "--kind",
+    "kinds",
+    multiple=True,
+    type=click.Choice(list(LAYOUT)),
+    help="Artifact kind to pack; repeatable (default: all)",
+)
+@click.option(
+    "--level",
+    type=click.IntRange(1, 22),
+    default=10,
+    help="zstd compression level (default: 10)",
+)
+def pack(data_dir: Path, archive: Path, kinds: tuple, level: int) -> None:
+    """Pack expanded/cleaned TeX and abstracts into a corpus archive."""
+    pack_directory(data_dir, archive, kinds=list(kinds) or None, level=level)
+
+
+@main.command()
+@click.option(
+    "--archive",
+    "-a",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+    default=Path("data/corpus.lhcbz"),
+    help="Archive file to unpack",
+)
+@click.option(
+    "--data-dir",
+    "-d",
+    type=click.Path(path_type=Path, file_okay=False),
+    default=Path("data"),
+    help="Corpus output directory to write into",
+)
+@click.option(
+    "--kind",
+    "kinds",
+    multiple=True,
+    help="Artifact kind to unpack; repeatable (default: all)",
+)
+def unpack(archive: Path, data_dir: Path, kinds: tuple) -> None:
+    """Write the records of a corpus archive back to the directory layout."""
+    unpack_archive(archive, data_dir, kinds=list(kinds) or None)
+
+
+@main.command()
+@click.option(
+    "--archive",
+    "-a",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+    default=Path("data/corpus.lhcbz"),
+    help="Archive file to inspect",
+)
+def info(archive: Path) -> None:
+    """Print the number of records per artifact kind."""
+    with CorpusArchive(archive) as corpus:
+        for kind in sorted({kind for _, kind in corpus.keys()}):
+            logger.info(f"{kind}: {len(corpus.keys(kind))} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import click
+from loguru import logger
+from pathlib import Path
+from typing import Optional
+from api_clients.http import HttpTransport
+from api_clients.http_cache import ResponseCache
+from api_clients.inspire import INSPIRE_API_URL, InspireSearch
+from core.metadata_store import METADATA_FILE, load_papers, update_citations
+
+
+def refresh_citations(
+    metadata: Path,
+    batch_size: int = 200,
+    http_cache: Optional[Path] = None,
+    inspire_url: str = INSPIRE_API_URL,
+) -> int:
+    """
+    Refresh the citation counts of the papers in the metadata store.
+
+    Only ``citation_count`` (and the arXiv e-prints needed to match records back to
+    papers) is requested from INSPIRE, in OR-combined queries of ``batch_size``
+    arXiv IDs, so the whole store is refreshed in a handful of requests.
+
+    Parameters
+    ----------
+    metadata : Path
+        Parquet metadata store to update
+    batch_size : int
+        Number of arXiv IDs combined into each INSPIRE query
+    http_cache : Optional[Path]
+        Directory of the on-disk HTTP response cache (no caching if None);
+        cached responses are revalidated, so counts are never stale
+    inspire_url : str
+        Base URL of the INSPIRE REST API
+
+    Returns
+    -------
+    int
+        Number of papers whose citation count changed
+    """
+    arxiv_ids = [
+        arxiv_id
+        for arxiv_id in load_papers(metadata, columns=["arxiv_id"]).column("arxiv_id").to_pylist()
+        if arxiv_id
+    ]
+    logger.info(f"Refreshing citation counts of {len(arxiv_ids)} papers in {metadata}")
+
+    # only metadata is queried: no download directories are needed
+    transport = HttpTransport(cache=ResponseCache(http_cache) if http_cache else None)
+    with transport, InspireSearch(base_url=inspire_url, transport=transport) as client:
+        metadata_by_id, missing_ids = client.fetch_by_arxiv_ids(
+            arxiv_ids, batch_size=batch_size, fields="citation_count,arxiv_eprints"
+        )
+    if missing_ids:
+        logger.warning(
+            f"No INSPIRE record for {len(missing_ids)} arXiv IDs, citation counts kept: "
+            f"{', '.join(missing_ids)}"
+        )
+
+    citations = {
+        arxiv_id: record.get("citation_count", 0)
+        for arxiv_id, record in metadata_by_id.items()
+    }
+    n_changed = update_citations(metadata, citations)
+    logger.info(f"Updated {n_changed}/{len(arxiv_ids)} citation counts in {metadata}")
+    return n_changed
+
+
+@click.command()
+@click.option(
+    "--metadata",
+    "-m",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+    default=Path("data") / METADATA_FILE,
+    help=f"Parquet metadata store to update (default: data/{METADATA_FILE})",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(1, 250),
+    default=200,
+    help="arXiv IDs combined into each INSPIRE query (default: 200)",
+)
+@click.option(
+    "--http-cache",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Directory of the on-disk HTTP response cache (default: no caching)",
+)
+def main(metadata: Path, batch_size: int, http_cache: Optional[Path]) -> None:
+    """Refresh the INSPIRE citation counts of the papers in the metadata store."""
+    refresh_citations(metadata, batch_size=batch_size, http_cache=http_cache)
+
+
+if __name__ == "__main__":
+    main()
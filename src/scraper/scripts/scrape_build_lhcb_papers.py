@@ -1,25 +1,26 @@
 from pathlib import Path
 from typing import List, Optional
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import requests
 import time
-from time import sleep
-import pandas as pd
 import re
+import json
 from loguru import logger
 from api_clients.inspire import InspireClient
-from core.models import LHCbPaper
+from api_clients.http import HttpTransport
+from api_clients.http_cache import ResponseCache
+from core.models import PaperTable
+from core.metadata_store import METADATA_FILE, paper_table_to_arrow, write_papers
 from scripts.build_lhcb_corpus import CorpusBuilder, CorpusConfig
-from scripts.post_process_latex import clean_and_expand_macros
 
 from tqdm import tqdm
-import requests
 import click
 
 
+ALCM_URL = 'https://lbfence.cern.ch/alcm/public/analysis'
+
+
 def normalize_working_group(wg: str) -> str:
     """Convert working group label to snake_case format"""
     wg = wg.strip().lower()
@@ -58,62 +59,187 @@ def parse_years(years_cells: str) -> List[str]:
         return []
     return [year.strip() for year in years_cells.split() if year.strip().isdigit()]
 
-def process_page(driver) -> List[dict]:
-    """Process a single page of papers"""
+# Cell texts of every table row with at least 8 cells, gathered in the browser and
+# returned as one JSON document, so a page costs one WebDriver round trip
+TABLE_ROWS_JS = """
+return JSON.stringify(
+    Array.from(document.querySelectorAll('tr'))
+        .map(row => Array.from(row.querySelectorAll('td')).map(cell => cell.innerText))
+        .filter(cells => cells.length >= 8)
+);
+"""
+
+# Cheap fingerprint of the table content, used to detect that the next page rendered
+TABLE_SIGNATURE_JS = """
+const rows = document.querySelectorAll('tbody tr');
+return rows.length + '|' + (rows.length ? rows[0].innerText : '') + '|'
+    + (rows.length ? rows[rows.length - 1].innerText : '');
+"""
+
+def parse_row(cells: List[str]) -> dict:
+    """Parse the cell texts of one table row into paper metadata"""
+    title = cells[2].strip()
+    years = parse_years(cells[7])
+    return {
+        'title': title,
+        'arxiv_id': cells[4].strip(),
+        'lhcb_paper_id': cells[3].strip(),
+        'journal': cells[5].strip(),
+        'working_groups': parse_working_groups(cells[6]),
+        'data_taking_years': years,
+        'run_period': determine_run_period(years)
+    }
+
+def parse_rows(rows: List[List[str]]) -> List[dict]:
+    """Parse the cell texts of the table rows of a page, skipping malformed rows"""
     page_papers = []
-    rows = driver.find_elements(By.TAG_NAME, "tr")
-    
-    for row in rows:
-        cells = row.find_elements(By.TAG_NAME, "td")
-        if len(cells) >= 8:
-            try:
-                title = cells[2].text.strip()
-                arxiv_id = cells[4].text.strip()
-                years = parse_years(cells[7].text)
-                working_groups = parse_working_groups(cells[6].text)
-                
-                paper_info = {
-                    'title': title,
-                    'arxiv_id': arxiv_id,
-                    'lhcb_paper_id': cells[3].text.strip(),
-                    'journal': cells[5].text.strip(),
-                    'working_groups': working_groups,
-                    'data_taking_years': years,
-                    'run_period': determine_run_period(years)
-                }
-                page_papers.append(paper_info)
-                logger.debug(f"Parsed paper: {paper_info['lhcb_paper_id']} - {title[:50]}...")
-            except Exception as e:
-                logger.error(f"Error parsing row: {e}")
-                continue
+    for cells in rows:
+        try:
+            paper_info = parse_row(cells)
+            page_papers.append(paper_info)
+            logger.debug(f"Parsed paper: {paper_info['lhcb_paper_id']} - {paper_info['title'][:50]}...")
+        except Exception as e:
+            logger.error(f"Error parsing row: {e}")
+            continue
     
     return page_papers
 
-def scrape_and_enrich_papers(
-    max_papers: Optional[int] = None,
-    download: bool = False,
-    output_dir: Optional[Path] = None,
-    verbose: bool = False
-) -> pd.DataFrame:
+def process_page(driver) -> List[dict]:
+    """Process a single page of papers, extracting the whole table in one script call"""
+    return parse_rows(json.loads(driver.execute_script(TABLE_ROWS_JS)))
+
+class AlcmTableParser(HTMLParser):
     """
-    Scrape papers from LHCb publication page and enrich with INSPIRE metadata.
-    
+    Collect the cell texts of the table rows and the next-page link of an HTML page.
+
+    Cell text approximates the browser's ``innerText``: line breaks and block
+    elements start a new line, so multi-valued cells split the same way as when
+    read through Selenium.
+    """
+
+    BLOCK_TAGS = {"br", "div", "p", "li"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[str]] = []
+        self.next_href: Optional[str] = None
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._anchor_href: Optional[str] = None
+        self._anchor_text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+        elif tag in self.BLOCK_TAGS and self._cell is not None:
+            self._cell.append("\n")
+        if tag == "a" and attrs.get("href"):
+            label = (attrs.get("aria-label") or "").lower()
+            if attrs.get("rel") == "next" or label == "next page":
+                self.next_href = attrs["href"]
+            self._anchor_href = attrs["href"]
+            self._anchor_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self._cell is not None and self._row is not None:
+            text = "".join(self._cell)
+            self._row.append("\n".join(line.strip() for line in text.splitlines() if line.strip()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if len(self._row) >= 8:
+                self.rows.append(self._row)
+            self._row = None
+        elif tag == "a" and self._anchor_href:
+            if self.next_href is None and "".join(self._anchor_text).strip().lower() in {"next", "›", "»", "next page"}:
+                self.next_href = self._anchor_href
+            self._anchor_href = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+        if self._anchor_href:
+            self._anchor_text.append(data)
+
+def scrape_papers_http(
+    transport: HttpTransport, url: str, max_papers: Optional[int] = None, max_pages: int = 1000
+) -> List[dict]:
+    """
+    Scrape the LHCb analysis table over plain HTTP, without a browser.
+
+    Pages are fetched through the shared transport (so they are cached when an HTTP
+    cache is configured) and parsed with the standard library HTML parser, following
+    next-page links. Only pre-rendered pages can be read: the table's JSON/CSV data
+    endpoint is not queried, so a table built client-side yields no rows, which
+    callers treat as the cue to fall back to Selenium.
+
     Parameters
     ----------
+    transport : HttpTransport
+        Pooled HTTP transport
+    url : str
+        URL of the first page of the analysis table
     max_papers : Optional[int]
-        Maximum number of papers to process
-    download : bool
-        Whether to download PDFs and LaTeX sources
-    output_dir : Optional[Path]
-        Directory to save downloaded files
-    verbose : bool
-        Enable verbose logging
+        Maximum number of papers to scrape
+    max_pages : int
+        Safety limit on the number of pages followed
+
+    Returns
+    -------
+    List[dict]
+        Parsed table rows with an arXiv ID
+    """
+    scraped_papers = []
+    seen_urls = set()
+    while url and url not in seen_urls and len(seen_urls) < max_pages:
+        seen_urls.add(url)
+        try:
+            response = transport.get(url)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch {url}: {e}")
+            break
+        
+        parser = AlcmTableParser()
+        parser.feed(response.text)
+        page_papers = parse_rows(parser.rows)
+        logger.info(f"Found {len(page_papers)} papers on {url}")
+        if not page_papers:
+            break
+        
+        scraped_papers.extend(paper for paper in page_papers if paper['arxiv_id'])
+        if max_papers and len(scraped_papers) >= max_papers:
+            logger.info(f"Reached limit of {max_papers} papers")
+            return scraped_papers[:max_papers]
+        
+        url = urljoin(url, parser.next_href) if parser.next_href else None
     
+    return scraped_papers
+
+def scrape_papers_selenium(url: str, max_papers: Optional[int] = None) -> List[dict]:
+    """
+    Scrape the LHCb analysis table with headless Chrome.
+
+    Parameters
+    ----------
+    url : str
+        URL of the ALCM analysis table
+    max_papers : Optional[int]
+        Maximum number of papers to scrape
+
     Returns
     -------
-    pd.DataFrame
-        DataFrame containing all paper metadata
+    List[dict]
+        Parsed table rows with an arXiv ID
     """
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     options = webdriver.ChromeOptions()
     options.add_argument('--headless')
     options.add_argument('--no-sandbox')
@@ -122,9 +248,7 @@ def scrape_and_enrich_papers(
     options.add_argument('--page-load-timeout=30')
     
     driver = None
-    papers_data = []
-    inspire_client = InspireClient()
-    
+    scraped_papers = []
     try:
         # Add retry logic for driver initialization
         max_retries = 3
@@ -150,7 +274,7 @@ def scrape_and_enrich_papers(
         max_page_retries = 3
         for attempt in range(max_page_retries):
             try:
-                driver.get('https://lbfence.cern.ch/alcm/public/analysis')
+                driver.get(url)
                 wait = WebDriverWait(driver, 10)
                 table = wait.until(EC.presence_of_element_located((By.TAG_NAME, "table")))
                 break
@@ -164,73 +288,11 @@ def scrape_and_enrich_papers(
             page_papers = process_page(driver)
             logger.info(f"Found {len(page_papers)} papers on current page")
             
-            for paper in page_papers:
-                if not paper['arxiv_id']:
-                    continue
-                    
-                try:
-                    # Add timeout to API request
-                    query = f'arxiv:{paper["arxiv_id"]}'
-                    params = {
-                        "q": query,
-                        "fields": ["titles,arxiv_eprints,dois,citation_count,abstracts"],
-                    }
-                    response = requests.get(
-                        f"{inspire_client.base_url}/literature",
-                        params=params,
-                        timeout=10  # Add timeout
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if data['hits']['hits']:
-                        metadata = data['hits']['hits'][0]['metadata']
-                        citations = metadata.get('citation_count', 0)
-                        abstract = inspire_client.get_arxiv_abstract(metadata.get('abstracts', []))
-                        arxiv_eprints = metadata.get('arxiv_eprints', [])
-                        arxiv_pdf = None
-                        if arxiv_eprints:
-                            arxiv_id = arxiv_eprints[0].get('value')
-                            if arxiv_id:
-                                arxiv_pdf = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-                    else:
-                        citations = 0
-                        abstract = ""
-                        arxiv_pdf = None
-                        
-                except requests.Timeout:
-                    logger.warning(f"Timeout while fetching metadata for {paper['arxiv_id']}")
-                    citations = 0
-                    abstract = ""
-                    arxiv_pdf = None
-                except Exception as e:
-                    logger.warning(f"Failed to fetch metadata for {paper['arxiv_id']}: {e}")
-                    citations = 0
-                    abstract = ""
-                    arxiv_pdf = None
-                
-                # Create enriched paper object
-                arxiv_id = paper['arxiv_id']
-                paper_obj = LHCbPaper(
-                    lhcb_paper_id=paper['lhcb_paper_id'],
-                    title=paper['title'],
-                    arxiv_id=arxiv_id,
-                    citations=citations,
-                    working_groups=paper['working_groups'],
-                    data_taking_years=paper['data_taking_years'],
-                    run_period=paper['run_period'],
-                    abstract=abstract,
-                    arxiv_pdf=f"https://arxiv.org/pdf/{arxiv_id}.pdf" if arxiv_id else None,
-                    latex_source=f"https://arxiv.org/e-print/{arxiv_id}" if arxiv_id else None
-                )
-                
-                papers_data.append(paper_obj.__dict__)
-                
-                if max_papers and len(papers_data) >= max_papers:
-                    logger.info(f"Reached limit of {max_papers} papers")
-                    break
+            scraped_papers.extend(paper for paper in page_papers if paper['arxiv_id'])
             
-            if max_papers and len(papers_data) >= max_papers:
+            if max_papers and len(scraped_papers) >= max_papers:
+                logger.info(f"Reached limit of {max_papers} papers")
+                scraped_papers = scraped_papers[:max_papers]
                 break
             
             # Check for next page with explicit timeout
@@ -242,8 +304,12 @@ def scrape_and_enrich_papers(
                     logger.info("Reached last page")
                     break
                 
+                signature = driver.execute_script(TABLE_SIGNATURE_JS)
                 next_button.click()
-                time.sleep(1)
+                # wait for the table to change instead of sleeping a fixed time
+                WebDriverWait(driver, 10).until(
+                    lambda d: d.execute_script(TABLE_SIGNATURE_JS) != signature
+                )
                 
             except TimeoutException:
                 logger.info("No more pages found (timeout)")
@@ -259,46 +325,127 @@ def scrape_and_enrich_papers(
             except:
                 pass
     
-    # Create DataFrame
-    df = pd.DataFrame(papers_data)
+    return scraped_papers
+
+def scrape_and_enrich_papers(
+    max_papers: Optional[int] = None,
+    download: bool = False,
+    output_dir: Optional[Path] = None,
+    verbose: bool = False,
+    http_cache: Optional[Path] = None,
+    enrich_batch_size: int = 50,
+    scrape_mode: str = "auto",
+    alcm_url: str = ALCM_URL,
+) -> PaperTable:
+    """
+    Scrape papers from LHCb publication page and enrich with INSPIRE metadata.
     
-    # Save data if output_dir provided
-    if output_dir:
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        df.to_pickle(output_dir / 'lhcb_papers.pkl')
-        df.to_csv(output_dir / 'lhcb_papers.csv', index=False)
-        logger.info(f"Saved paper metadata to {output_dir}")
-        
-        if download:
-            config = CorpusConfig(
-                start_date=None,
-                end_date=None,
-                max_papers=len(df),
-                download=True,
-                output_dir=output_dir,
-                verbose=verbose
+    Parameters
+    ----------
+    max_papers : Optional[int]
+        Maximum number of papers to process
+    download : bool
+        Whether to download PDFs and LaTeX sources
+    output_dir : Optional[Path]
+        Directory to save downloaded files
+    verbose : bool
+        Enable verbose logging
+    http_cache : Optional[Path]
+        Directory of the on-disk HTTP response cache shared by all INSPIRE and
+        arXiv requests (no caching if None)
+    enrich_batch_size : int
+        Number of arXiv IDs combined into each INSPIRE enrichment query
+    scrape_mode : str
+        How the analysis table is read: "http" (plain HTTP, no browser, only for
+        server-rendered pages),
+        "selenium" (headless Chrome) or "auto" (HTTP, falling back to Selenium
+        if no rows are found)
+    alcm_url : str
+        URL of the ALCM analysis table
+    
+    Returns
+    -------
+    PaperTable
+        Columnar table containing all paper metadata
+    """
+    # the transport (and its response cache and rate-limiter state) is closed once
+    # the network work is done; the client does not own a transport passed to it
+    cache = ResponseCache(http_cache) if http_cache else None
+    with HttpTransport(cache=cache) as transport:
+        inspire_client = InspireClient(transport=transport)
+    
+        scraped_papers = []
+        if scrape_mode in ("auto", "http"):
+            scraped_papers = scrape_papers_http(inspire_client.http, alcm_url, max_papers)
+            if not scraped_papers and scrape_mode == "auto":
+                logger.warning(
+                    "No table rows found over HTTP (table rendered client-side?), "
+                    "falling back to Selenium"
+                )
+        if not scraped_papers and scrape_mode in ("auto", "selenium"):
+            scraped_papers = scrape_papers_selenium(alcm_url, max_papers)
+    
+        # Enrich scraped rows with INSPIRE metadata using batched arXiv-ID queries
+        metadata_by_id, missing_ids = inspire_client.fetch_by_arxiv_ids(
+            [paper['arxiv_id'] for paper in scraped_papers],
+            batch_size=enrich_batch_size,
+        )
+        if missing_ids:
+            logger.warning(
+                f"No INSPIRE metadata retrieved for {len(missing_ids)} arXiv IDs "
+                f"(citations and abstracts left empty): {', '.join(missing_ids)}"
             )
-            builder = CorpusBuilder(config)
-            
-            failed_downloads = []
-            for _, row in tqdm(df.iterrows(), desc="Downloading and processing papers", total=len(df)):
-                paper = LHCbPaper(**row.to_dict())
-                
-                try:
-                    # Download paper
-                    success = builder.download_paper(paper)
-                    if not success:
-                        failed_downloads.append(paper.lhcb_paper_id)
-                        continue
-                
-                except Exception as e:
-                    failed_downloads.append(paper.lhcb_paper_id)
-                    logger.error(f"Error processing paper '{paper.title}': {str(e)}")
+
+        records = []
+        for paper in scraped_papers:
+            arxiv_id = paper['arxiv_id']
+            metadata = metadata_by_id.get(arxiv_id, {})
+            records.append({
+                'lhcb_paper_id': paper['lhcb_paper_id'],
+                'title': paper['title'],
+                'arxiv_id': arxiv_id,
+                'citations': metadata.get('citation_count', 0),
+                'working_groups': paper['working_groups'],
+                'data_taking_years': paper['data_taking_years'],
+                'run_period': paper['run_period'],
+                'abstract': inspire_client.get_arxiv_abstract(metadata.get('abstracts', [])) or "",
+                'arxiv_pdf': f"https://arxiv.org/pdf/{arxiv_id}.pdf",
+                'latex_source': f"https://arxiv.org/e-print/{arxiv_id}",
+                'control_number': metadata.get('control_number'),
+            })
+
+        # Validate all papers column by column in one pass
+        papers = PaperTable.from_records(records)
+    
+        # Save data if output_dir provided
+        if output_dir:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            write_papers(paper_table_to_arrow(papers), output_dir / METADATA_FILE)
+            logger.info(f"Saved paper metadata to {output_dir / METADATA_FILE}")
+        
+            if download:
+                config = CorpusConfig(
+                    start_date=None,
+                    end_date=None,
+                    max_papers=len(papers),
+                    download=True,
+                    output_dir=output_dir,
+                    verbose=verbose
+                )
+                failed_downloads = []
+                with CorpusBuilder(config, transport=inspire_client.http) as builder:
+                    # papers are materialized lazily, one row at a time, as the pipeline pulls them
+                    for job in tqdm(builder.download_papers(papers), desc="Downloading and processing papers", total=len(papers)):
+                        if not job.success:
+                            failed_downloads.append(job.paper.lhcb_paper_id)
             
-            if failed_downloads:
-                logger.warning(f"Failed to process {len(failed_downloads)} papers")
+                if failed_downloads:
+                    logger.warning(f"Failed to process {len(failed_downloads)} papers")
     
+    # imported here, as the LaTeX post-processing dependencies are only needed now
+    from scripts.post_process_latex import clean_and_expand_macros
+
     # Create cleaned_tex directory
     tex_dir = output_dir / "expanded_tex"
     cleaned_tex_dir = output_dir / "cleaned_tex"
@@ -311,7 +458,7 @@ def scrape_and_enrich_papers(
     ]
     clean_and_expand_macros(tex_dir, cleaned_tex_dir, sections_to_remove)
     
-    return df
+    return papers
 
 def validate_paper_count(
     ctx: click.Context, param: click.Parameter, value: Optional[int]
@@ -358,6 +505,31 @@ def validate_paper_count(
     default=Path("data"),
     help="Base directory for downloaded files",
 )
+@click.option(
+    "--http-cache",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Directory of the on-disk HTTP response cache (default: no caching)",
+)
+@click.option(
+    "--enrich-batch-size",
+    type=click.IntRange(1, 250),
+    default=50,
+    help="Number of arXiv IDs per batched INSPIRE metadata query (default: 50)",
+)
+@click.option(
+    "--scrape-mode",
+    type=click.Choice(["auto", "http", "selenium"]),
+    default="auto",
+    help="Read the analysis table over plain HTTP, with headless Chrome, or over HTTP "
+    "falling back to Chrome if no rows are found (default: auto). HTTP mode only reads "
+    "server-rendered pages; it finds no rows in a table built client-side",
+)
+@click.option(
+    "--alcm-url",
+    default=ALCM_URL,
+    help="URL of the ALCM analysis table",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
 def main(**kwargs) -> None:
     """Scrape LHCb papers and optionally download their content."""
@@ -373,14 +545,18 @@ def main(**kwargs) -> None:
     logger.add(lambda msg: click.echo(msg, err=True), level=log_level)
     
     # Scrape and process papers
-    df = scrape_and_enrich_papers(
+    papers = scrape_and_enrich_papers(
         max_papers=kwargs.get('max_papers'),
         download=kwargs.get('download'),
         output_dir=kwargs.get('output_dir'),
-        verbose=kwargs.get('verbose')
+        verbose=kwargs.get('verbose'),
+        http_cache=kwargs.get('http_cache'),
+        enrich_batch_size=kwargs.get('enrich_batch_size'),
+        scrape_mode=kwargs.get('scrape_mode'),
+        alcm_url=kwargs.get('alcm_url'),
     )
     
-    logger.info(f"Successfully processed {len(df)} papers")
+    logger.info(f"Successfully processed {len(papers)} papers")
 
 
 
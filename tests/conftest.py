@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the scraper modules import each other as top-level packages (core, api_clients, ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scraper"))
@@ -0,0 +1,67 @@
+from pathlib import Path
+import os
+import stat
+
+from core.blob_store import BlobStore, write_atomic
+from core.manifest import sha256_file
+
+
+def test_ingest_links_artifacts_to_read_only_blobs(tmp_path: Path) -> None:
+    pdf = tmp_path / "pdfs" / "2101.00001.pdf"
+    write_atomic(pdf, b"%PDF-1.5 shared")
+    copy = tmp_path / "pdfs" / "2101.00002.pdf"
+    write_atomic(copy, b"%PDF-1.5 shared")
+
+    with BlobStore(tmp_path / "store") as store:
+        digest = store.ingest("2101.00001", pdf)
+        assert store.ingest("2101.00002", copy) == digest == sha256_file(pdf)
+
+        blob = store.blob_path(digest)
+        assert stat.S_IMODE(blob.stat().st_mode) == 0o444
+        # identical content is stored once
+        assert [p.name for p in store.blob_dir.glob("*/*")] == [digest]
+        assert pdf.read_bytes() == copy.read_bytes() == b"%PDF-1.5 shared"
+        if pdf.stat().st_ino == blob.stat().st_ino:
+            assert blob.stat().st_nlink == 3
+
+        # replacing an artifact leaves the shared blob and the other paper alone
+        write_atomic(pdf, b"%PDF-1.5 new version")
+        assert blob.read_bytes() == copy.read_bytes() == b"%PDF-1.5 shared"
+
+
+def test_restore_recreates_deleted_artifacts(tmp_path: Path) -> None:
+    source_dir = tmp_path / "latex" / "2101.00001"
+    write_atomic(source_dir / "main.tex", "\\input{sec/intro}")
+    write_atomic(source_dir / "sec" / "intro.tex", "Introduction.")
+
+    with BlobStore(tmp_path / "store") as store:
+        assert store.ingest("2101.00001", source_dir) is None
+        assert len(list(store.refs("2101.00001"))) == 2
+
+        (source_dir / "sec" / "intro.tex").unlink()
+        (source_dir / "sec").rmdir()
+        assert store.restore("2101.00001", source_dir)
+        assert (source_dir / "sec" / "intro.tex").read_text() == "Introduction."
+        assert not store.restore("2101.00002", source_dir)
+
+
+def test_gc_removes_only_unreferenced_blobs(tmp_path: Path) -> None:
+    source_dir = tmp_path / "latex" / "2101.00001"
+    write_atomic(source_dir / "main.tex", "v1 main")
+    write_atomic(source_dir / "old.tex", "v1 section")
+
+    with BlobStore(tmp_path / "store") as store:
+        store.ingest("2101.00001", source_dir)
+        old = sha256_file(source_dir / "old.tex")
+        main = sha256_file(source_dir / "main.tex")
+
+        # a new version of the paper drops old.tex
+        os.unlink(source_dir / "old.tex")
+        write_atomic(source_dir / "new.tex", "v2 section")
+        store.ingest("2101.00001", source_dir)
+        assert {p.name for p, _ in store.refs("2101.00001")} == {"main.tex", "new.tex"}
+
+        assert store.gc() == (1, len("v1 section"))
+        assert not store.has(old)
+        assert store.has(main) and store.has(sha256_file(source_dir / "new.tex"))
+        assert store.gc() == (0, 0)
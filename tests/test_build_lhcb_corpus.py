@@ -0,0 +1,44 @@
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import pytest
+from click.testing import CliRunner
+
+from scripts.build_lhcb_corpus import CorpusBuilder, CorpusConfig, main
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--offline"], "--offline requires --http-cache"),
+        (["--gc-blobs"], "--gc-blobs requires --blob-store"),
+    ],
+)
+def test_flag_dependencies_are_checked_at_startup(
+    tmp_path: Path, args: List[str], message: str
+) -> None:
+    result = CliRunner().invoke(main, ["-o", str(tmp_path), *args])
+    assert result.exit_code == 2
+    assert message in result.output
+    assert not (tmp_path / "manifest.sqlite").exists()
+
+
+def test_builder_closes_its_resources(tmp_path: Path) -> None:
+    config = CorpusConfig(
+        start_date=None,
+        end_date=None,
+        max_papers=None,
+        download=True,
+        output_dir=tmp_path,
+        verbose=False,
+        http_cache=tmp_path / "http_cache",
+        blob_store=True,
+        log_file=tmp_path / "corpus_build.log",
+    )
+    with CorpusBuilder(config) as builder:
+        client = builder.client
+    # the manifest, blob store and response cache databases are closed
+    for conn in [client.manifest._conn, client.blob_store._conn, client.http.cache._conn]:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,21 @@
+import os
+from pathlib import Path
+
+from core.corpus_archive import CorpusArchiveWriter, unpack_archive
+
+
+def test_unpack_replaces_hardlinked_targets(tmp_path: Path) -> None:
+    archive = tmp_path / "corpus.lhcbz"
+    with CorpusArchiveWriter(archive) as writer:
+        writer.add("2101.00001", "expanded_tex", "new text")
+
+    blob = tmp_path / "blob"
+    blob.write_text("old text")
+    blob.chmod(0o444)
+    target = tmp_path / "data" / "expanded_tex" / "2101.00001.tex"
+    target.parent.mkdir(parents=True)
+    os.link(blob, target)
+
+    assert unpack_archive(archive, tmp_path / "data") == 1
+    assert target.read_text() == "new text"
+    assert blob.read_text() == "old text"
@@ -0,0 +1,92 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+import hashlib
+import threading
+
+import pytest
+
+from api_clients.http import DownloadTooLarge, HttpTransport, UnexpectedContent
+from bench.mock_server import FaultProfile, MockCorpus, MockServer
+
+HTML_PAGE = b"<!DOCTYPE html><html><body>captcha</body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the bodies the mock server cannot: mislabelled HTML and bodies sent
+    without a Content-Length."""
+
+    def do_GET(self) -> None:
+        content_type, body, sized = {
+            "/page.html": ("text/html; charset=utf-8", HTML_PAGE, True),
+            "/disguised.tar.gz": ("application/gzip", b"\n  " + HTML_PAGE, True),
+            "/unsized.pdf": ("application/pdf", b"%PDF" + b"0" * 100_000, False),
+        }[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if sized:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def base_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_download_reports_size_and_sha256(tmp_path: Path) -> None:
+    corpus = MockCorpus.synthesize(1, seed=0, section_kb=50)
+    arxiv_id = MockCorpus.arxiv_id(corpus.hits[0])
+    body = corpus.eprints[arxiv_id]
+    with MockServer(corpus, faults=FaultProfile(latency=0.0)) as server:
+        with HttpTransport() as transport:
+            result = transport.download(
+                f"{server.arxiv_url}/e-print/{arxiv_id}", tmp_path / "src.tar.gz", chunk_size=4096
+            )
+
+    assert result.path.read_bytes() == body
+    assert result.size == len(body)
+    assert result.sha256 == hashlib.sha256(body).hexdigest()
+    assert result.content_type == "application/gzip"
+    assert [p.name for p in tmp_path.iterdir()] == ["src.tar.gz"]
+
+
+@pytest.mark.parametrize("path", ["/page.html", "/disguised.tar.gz"])
+def test_download_aborts_on_html(base_url: str, tmp_path: Path, path: str) -> None:
+    dest = tmp_path / "source"
+    with HttpTransport() as transport:
+        with pytest.raises(UnexpectedContent):
+            transport.download(base_url + path, dest, reject_html=True)
+        # without reject_html the page is an ordinary body
+        assert transport.download(base_url + path, dest).path.exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["source"]
+
+
+def test_download_aborts_past_the_size_cap(base_url: str, tmp_path: Path) -> None:
+    corpus = MockCorpus.synthesize(1, seed=0, pdf_kb=64)
+    arxiv_id = MockCorpus.arxiv_id(corpus.hits[0])
+    with HttpTransport() as transport:
+        with MockServer(corpus, faults=FaultProfile(latency=0.0)) as server:
+            # declared by Content-Length
+            with pytest.raises(DownloadTooLarge, match="declares"):
+                transport.download(
+                    f"{server.arxiv_url}/pdf/{arxiv_id}.pdf", tmp_path / "a.pdf", max_bytes=1024
+                )
+        # only noticed while streaming
+        with pytest.raises(DownloadTooLarge, match="exceeded"):
+            transport.download(
+                f"{base_url}/unsized.pdf", tmp_path / "b.pdf", max_bytes=10_000, chunk_size=1024
+            )
+    # neither the destination nor a partial file is left behind
+    assert list(tmp_path.iterdir()) == []
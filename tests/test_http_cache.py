@@ -0,0 +1,113 @@
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple
+import threading
+
+import pytest
+import requests
+
+from api_clients.http import HttpTransport
+from api_clients.http_cache import ResponseCache
+
+
+class _RecordingHandler(SimpleHTTPRequestHandler):
+    """Serves a directory (with ``Last-Modified``/``If-Modified-Since`` support),
+    recording the status of every response."""
+
+    statuses: List[int]
+
+    def log_request(self, code: Any = "-", size: Any = "-") -> None:
+        self.statuses.append(int(code))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def served(tmp_path: Path) -> Iterator[Tuple[str, Path, List[int]]]:
+    """Yield the base URL of a local server, the directory it serves and the
+    statuses it answered with."""
+    root = tmp_path / "served"
+    root.mkdir()
+    statuses: List[int] = []
+    handler = type("Handler", (_RecordingHandler,), {"statuses": statuses})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", root, statuses
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _response(url: str, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    return response
+
+
+def test_not_modified_is_served_from_the_cache(served, tmp_path: Path) -> None:
+    base, root, statuses = served
+    (root / "page.json").write_bytes(b'{"hits": []}')
+
+    with HttpTransport(cache=ResponseCache(tmp_path / "cache")) as transport:
+        first = transport.get(f"{base}/page.json")
+        second = transport.get(f"{base}/page.json")
+
+    assert statuses == [200, 304]
+    assert "X-From-Cache" not in first.headers
+    assert second.status_code == 200 and second.headers["X-From-Cache"] == "1"
+    assert second.content == first.content == b'{"hits": []}'
+
+
+def test_offline_cache_does_not_touch_the_network(served, tmp_path: Path) -> None:
+    base, root, statuses = served
+    (root / "paper.pdf").write_bytes(b"%PDF-1.5 body")
+    (root / "page.json").write_bytes(b"{}")
+    with HttpTransport(cache=ResponseCache(tmp_path / "cache")) as transport:
+        transport.download(f"{base}/paper.pdf", tmp_path / "online.pdf")
+        transport.get(f"{base}/page.json")
+    assert statuses == [200, 200]
+
+    offline = ResponseCache(tmp_path / "cache", offline=True)
+    with HttpTransport(cache=offline) as transport:
+        result = transport.download(f"{base}/paper.pdf", tmp_path / "offline.pdf")
+        page = transport.get(f"{base}/page.json")
+
+    assert statuses == [200, 200]
+    assert result.from_cache and (tmp_path / "offline.pdf").read_bytes() == b"%PDF-1.5 body"
+    assert page.content == b"{}"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache", max_bytes=250)
+    keys = [cache.request_key(f"http://host/{i}") for i in range(3)]
+    cache.store(keys[0], _response("http://host/0", b"a" * 100))
+    cache.store(keys[1], _response("http://host/1", b"b" * 100))
+    # using the first entry makes the second the least recently used
+    cache.load(cache.lookup(keys[0]))
+    cache.store(keys[2], _response("http://host/2", b"c" * 100))
+
+    assert cache.lookup(keys[1]) is None
+    assert cache.lookup(keys[0]) is not None and cache.lookup(keys[2]) is not None
+    assert cache._total == cache.total_bytes() == 200
+    cache.close()
+
+
+def test_evicted_body_is_a_cache_miss(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache")
+    key = cache.request_key("http://host/x")
+    cache.store(key, _response("http://host/x", b"body"))
+    entry = cache.lookup(key)
+    # evicted by a concurrent store between the lookup and the read
+    cache._blob_path(entry.blob).unlink()
+
+    assert cache.load(entry) is None
+    assert not cache.materialize(entry, tmp_path / "x")
+    assert not (tmp_path / "x").exists()
+    assert cache.lookup(key) is None and cache._total == 0
+    cache.close()
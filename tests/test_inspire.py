@@ -0,0 +1,275 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+import io
+import json
+import tarfile
+import re
+
+import pytest
+
+from api_clients.inspire import InspireClient
+from bench.mock_server import MockCorpus, MockServer
+from core.manifest import ArtifactManifest
+
+
+@pytest.fixture
+def client(tmp_path: Path) -> InspireClient:
+    return InspireClient(
+        abstract_dir=tmp_path / "abstracts",
+        pdf_dir=tmp_path / "pdfs",
+        source_dir=tmp_path / "source",
+        expanded_tex_dir=tmp_path / "expanded_tex",
+    )
+
+
+def test_paper_from_hit_with_eprint(client: InspireClient) -> None:
+    hit = {
+        "updated": "2024-01-01T00:00:00+00:00",
+        "metadata": {
+            "control_number": 1,
+            "titles": [{"title": "Observation of a decay"}],
+            "arxiv_eprints": [{"value": "2101.00001"}],
+            "citation_count": 12,
+            "abstracts": [{"source": "arXiv", "value": "We observe a decay."}],
+        },
+    }
+    paper = client._paper_from_hit(hit)
+    assert paper.arxiv_id == "2101.00001"
+    assert paper.citations == 12
+    assert paper.abstract == "We observe a decay."
+    assert paper.arxiv_pdf == "https://arxiv.org/pdf/2101.00001.pdf"
+    assert paper.updated == "2024-01-01T00:00:00+00:00"
+
+
+def test_paper_from_hit_without_eprint(client: InspireClient) -> None:
+    # INSPIRE-only articles (e.g. the JINST detector paper) have no arXiv e-print
+    hit = {
+        "metadata": {
+            "control_number": 2,
+            "titles": [{"title": "The LHCb detector at the LHC"}],
+            "citation_count": 5000,
+        },
+    }
+    paper = client._paper_from_hit(hit)
+    assert paper.arxiv_id is None
+    assert paper.arxiv_pdf is None
+    assert paper.latex_source is None
+    assert paper.abstract == ""
+    assert client.download_abstract(paper) is None
+
+
+def _listing(hits: List[Dict[str, Any]]) -> Callable[[Dict[str, Any], int], Dict[str, Any]]:
+    """Stand-in for ``_get_page`` answering the date and sort terms of a query."""
+
+    def get_page(params: Dict[str, Any], page: int) -> Dict[str, Any]:
+        q = params["q"]
+        date_from = max(re.findall(r"date>=(\S+)", q), default=None)
+        date_to = min(re.findall(r"date<=(\S+)", q), default=None)
+        selected = []
+        for hit in hits:
+            earliest = hit["metadata"].get("earliest_date")
+            if "not date:*" in q:
+                if earliest is None:
+                    selected.append(hit)
+            elif date_from or date_to:
+                if earliest and date_from <= earliest <= date_to:
+                    selected.append(hit)
+            else:
+                selected.append(hit)
+        if params["sort"] == "mostcited":
+            selected.sort(key=lambda hit: -hit["metadata"]["citation_count"])
+        else:
+            selected.sort(key=lambda hit: hit["metadata"].get("earliest_date") or "", reverse=True)
+        size = params["size"]
+        return {"hits": {"total": len(selected), "hits": selected[(page - 1) * size : page * size]}}
+
+    return get_page
+
+
+@pytest.fixture
+def listed_client(client: InspireClient, monkeypatch: pytest.MonkeyPatch) -> InspireClient:
+    hits = [
+        {
+            "metadata": {
+                "control_number": i,
+                "titles": [{"title": f"Paper {i}"}],
+                "citation_count": (7 * i) % 20,
+                "earliest_date": f"{2010 + i}-01-01" if i % 5 else None,
+            }
+        }
+        for i in range(1, 15)
+    ]
+    client.window_hits = 3
+    client.page_size = 2
+    monkeypatch.setattr(client, "_get_page", _listing(hits))
+    return client
+
+
+def test_full_listing_keeps_undated_papers_and_sort_order(listed_client: InspireClient) -> None:
+    papers = listed_client.fetch_lhcb_papers(sort_by="mostcited")
+    assert sorted(p.control_number for p in papers) == list(range(1, 15))
+    citations = [p.citations for p in papers]
+    assert citations == sorted(citations, reverse=True)
+
+    papers = listed_client.fetch_lhcb_papers(sort_by="mostrecent")
+    assert [p.control_number for p in papers] == [14, 13, 12, 11, 9, 8, 7, 6, 4, 3, 2, 1, 5, 10]
+
+
+def test_full_listing_rejects_unsupported_sort(listed_client: InspireClient) -> None:
+    with pytest.raises(ValueError):
+        listed_client.fetch_lhcb_papers(sort_by="mostrelevant")
+
+
+def test_pdf_only_eprint_is_not_fetched_again(tmp_path: Path) -> None:
+    client = InspireClient(
+        abstract_dir=tmp_path / "abstracts",
+        pdf_dir=tmp_path / "pdfs",
+        source_dir=tmp_path / "source",
+        expanded_tex_dir=tmp_path / "expanded_tex",
+        manifest=ArtifactManifest(tmp_path / "manifest.sqlite"),
+    )
+    paper = client._paper_from_hit(
+        {"metadata": {"titles": [{"title": "A paper"}], "arxiv_eprints": [{"value": "2101.00001"}]}}
+    )
+    source_file = tmp_path / "source" / "2101.00001_source.tar.gz"
+    source_file.write_bytes(b"%PDF-1.4\n" + b"0" * 2000)
+
+    assert client.unpack_source(paper, source_file) is None
+    assert client.manifest.no_source(paper.arxiv_id) == "pdf"
+    assert client.no_source(paper)
+
+
+def test_malformed_batch_is_reported_missing(
+    client: InspireClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fetch_batch(arxiv_ids: List[str], fields: str) -> List[Dict[str, Any]]:
+        if "2101.00003" in arxiv_ids:
+            return [{"no metadata": {}}]
+        return [{"metadata": {"arxiv_eprints": [{"value": a}]}} for a in arxiv_ids]
+
+    monkeypatch.setattr(client, "_fetch_arxiv_batch", fetch_batch)
+    found, missing = client.fetch_by_arxiv_ids(
+        ["2101.00001", "2101.00002", "2101.00003", "2101.00004"], batch_size=2
+    )
+    assert sorted(found) == ["2101.00001", "2101.00002"]
+    assert missing == ["2101.00003", "2101.00004"]
+
+
+def test_dump_skips_invalid_records(client: InspireClient, tmp_path: Path) -> None:
+    def record(control_number: int, **metadata: Any) -> str:
+        return json.dumps(
+            {
+                "metadata": {
+                    "control_number": control_number,
+                    "titles": [{"title": f"Paper {control_number}"}],
+                    "collaborations": [{"value": "LHCb"}],
+                    "document_type": ["article"],
+                    **metadata,
+                }
+            }
+        )
+
+    dump = tmp_path / "literature.jsonl"
+    dump.write_text(
+        "\n".join(
+            [record(1), record(2, citation_count="many"), record(3, titles=[])]
+        )
+        + "\n"
+    )
+    assert [p.control_number for p in client.iter_dump_papers(dump)] == [1]
+
+
+def test_main_file_is_recorded_with_the_sources(tmp_path: Path) -> None:
+    client = InspireClient(
+        abstract_dir=tmp_path / "abstracts",
+        pdf_dir=tmp_path / "pdfs",
+        source_dir=tmp_path / "source",
+        expanded_tex_dir=tmp_path / "expanded_tex",
+        manifest=ArtifactManifest(tmp_path / "manifest.sqlite"),
+    )
+    paper = client._paper_from_hit(
+        {"metadata": {"titles": [{"title": "A paper"}], "arxiv_eprints": [{"value": "2101.00001"}]}}
+    )
+    files = {
+        "lhcb-paper.tex": b"\\documentclass{article}\n\\begin{document}\n\\input{intro}\n\\end{document}\n",
+        "intro.tex": b"Introduction text.\n",
+    }
+    source_file = tmp_path / "source" / "2101.00001_source.tar.gz"
+    with tarfile.open(source_file, "w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    unpacked = client.unpack_source(paper, source_file)
+    assert unpacked is not None
+    assert client.manifest.main_file(paper.arxiv_id) == "lhcb-paper.tex"
+
+    expanded = client.expand_members(paper, unpacked[1])
+    assert expanded is not None
+    assert "Introduction text." in expanded.read_text()
+
+
+def test_html_eprint_is_retried_on_the_next_build(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    corpus = MockCorpus.synthesize(1, figure_kb=0, pdf_kb=0)
+    with MockServer(corpus) as server, InspireClient(
+        abstract_dir=tmp_path / "abstracts",
+        pdf_dir=tmp_path / "pdfs",
+        source_dir=tmp_path / "source",
+        expanded_tex_dir=tmp_path / "expanded_tex",
+        manifest=ArtifactManifest(tmp_path / "manifest.sqlite"),
+        arxiv_url=server.arxiv_url,
+        arxiv_export_url=server.arxiv_url,
+    ) as client:
+        throttled: List[str] = []
+        monkeypatch.setattr(client.http, "throttled", throttled.append)
+        paper = client._paper_from_hit(corpus.hits[0])
+
+        # first build: a CAPTCHA page slipped through as the e-print
+        source_file = tmp_path / "source" / f"{paper.arxiv_id}_source.tar.gz"
+        source_file.write_bytes(b"<!DOCTYPE html><html><body>captcha</body></html>")
+        assert client.unpack_source(paper, source_file) is None
+        assert throttled == [f"{server.arxiv_url}/e-print/{paper.arxiv_id}"]
+        assert not client.no_source(paper)
+
+        # next build: the e-print is downloaded and extracted again
+        source_file = client.fetch_source(paper)
+        assert source_file is not None
+        assert client.unpack_source(paper, source_file) is not None
+        assert client.completed_artifact(paper, "source") is not None
+
+
+def test_included_members_are_extracted_whatever_their_extension(
+    client: InspireClient, tmp_path: Path
+) -> None:
+    paper = client._paper_from_hit(
+        {"metadata": {"titles": [{"title": "A paper"}], "arxiv_eprints": [{"value": "2101.00002"}]}}
+    )
+    files = {
+        "main.tex": b"\\documentclass{article}\n\\begin{document}\n\\input{figs/plot.pgf}\n"
+        b"\\end{document}\n",
+        "figs/plot.pgf": b"\\begin{pgfpicture}\\input{figs/axis.tikz}\\end{pgfpicture}\n",
+        "figs/axis.tikz": b"\\draw (0,0) -- (1,1);\n",
+        "figs/unused.pgf": b"\\begin{pgfpicture}\\end{pgfpicture}\n",
+        "figs/photo.png": b"\x89PNG\r\n",
+    }
+    source_file = tmp_path / "source" / "2101.00002_source.tar.gz"
+    with tarfile.open(source_file, "w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    unpacked = client.unpack_source(paper, source_file)
+    assert unpacked is not None
+    paper_dir, texts = unpacked
+    assert (paper_dir / "figs" / "plot.pgf").is_file()
+    assert (paper_dir / "figs" / "axis.tikz").is_file()
+    assert not (paper_dir / "figs" / "unused.pgf").exists()
+    assert not (paper_dir / "figs" / "photo.png").exists()
+
+    expanded = client.expand_members(paper, texts)
+    assert expanded is not None
+    assert "\\draw (0,0) -- (1,1);" in expanded.read_text()
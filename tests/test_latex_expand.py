@@ -0,0 +1,44 @@
+import pytest
+
+from core.latex_expand import UnsupportedLatex, expand_members
+
+
+def test_includes_are_inlined() -> None:
+    members = {
+        "main.tex": "\\begin{document}\n\\input{sections/intro}\n\\include{summary}\n\\end{document}\n",
+        "sections/intro.tex": "Introduction. % a comment\n",
+        "summary.tex": "Summary.\n",
+    }
+    expanded = expand_members(members, "main.tex")
+    assert "Introduction." in expanded
+    assert "a comment" not in expanded
+    assert "\\clearpage\nSummary.\n\n\\clearpage" in expanded
+
+
+def test_system_inputs_are_left_in_place() -> None:
+    members = {"main.tex": "\\input glyphtounicode\n\\begin{document}\n\\end{document}\n"}
+    assert "\\input glyphtounicode" in expand_members(members, "main.tex")
+
+
+def test_unresolved_include_defers_to_latexpand() -> None:
+    members = {"main.tex": "\\begin{document}\n\\input{figs/plot.pgf}\n\\end{document}\n"}
+    with pytest.raises(UnsupportedLatex, match="figs/plot.pgf"):
+        expand_members(members, "main.tex")
+
+
+def test_subfiles_are_inlined_without_their_preamble() -> None:
+    members = {
+        "main.tex": (
+            "\\documentclass{article}\n\\usepackage{subfiles}\n"
+            "\\begin{document}\n\\subfile{sections/intro}\n\\end{document}\n"
+        ),
+        "sections/intro.tex": (
+            "\\documentclass[../main.tex]{subfiles}\n"
+            "\\begin{document}\nIntroduction.\n\\end{document}\n"
+        ),
+    }
+    expanded = expand_members(members, "main.tex")
+    assert "Introduction." in expanded
+    assert expanded.count("\\documentclass") == 1
+    assert expanded.count("\\begin{document}") == 1
+    assert expanded.count("\\end{document}") == 1
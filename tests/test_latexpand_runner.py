@@ -0,0 +1,18 @@
+from pathlib import Path
+
+from core.latexpand_runner import LatexpandRunner
+
+
+def test_output_is_returned_but_not_kept(tmp_path: Path) -> None:
+    main_tex = tmp_path / "main.tex"
+    main_tex.write_text("\\documentclass{article}\n")
+    # ``cat`` stands in for latexpand: it prints the file it is given
+    runner = LatexpandRunner(executable="cat")
+
+    result = runner.run(main_tex)
+
+    assert result.ok and result.stdout == main_tex.read_text()
+    (summary,) = runner._results
+    assert summary.ok and summary.main_tex == main_tex
+    assert not hasattr(summary, "stdout")
+    runner.log_summary()
@@ -0,0 +1,53 @@
+import sqlite3
+from pathlib import Path
+
+from core.manifest import ArtifactManifest
+
+
+def _artifact(tmp_path: Path) -> Path:
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+def test_changed_record_makes_artifact_stale(tmp_path: Path) -> None:
+    manifest = ArtifactManifest(tmp_path / "manifest.sqlite")
+    path = _artifact(tmp_path)
+    manifest.record("1234.5678", "pdf", path, inspire_updated="2024-01-01T00:00:00")
+
+    assert manifest.completed("1234.5678", "pdf", "2024-01-01T00:00:00") == path
+    assert manifest.completed("1234.5678", "pdf", "2024-06-01T00:00:00") is None
+    assert manifest.completed("1234.5678", "pdf") == path
+    manifest.close()
+
+
+def test_old_manifest_gains_revision_column(tmp_path: Path) -> None:
+    db = tmp_path / "manifest.sqlite"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE artifacts (arxiv_id TEXT NOT NULL, artifact TEXT NOT NULL, "
+        "status TEXT NOT NULL, path TEXT, size INTEGER, sha256 TEXT, source_url TEXT, "
+        "pipeline_version TEXT NOT NULL, updated_at TEXT NOT NULL, "
+        "PRIMARY KEY (arxiv_id, artifact))"
+    )
+    conn.commit()
+    conn.close()
+
+    manifest = ArtifactManifest(db)
+    path = _artifact(tmp_path)
+    manifest.record("1234.5678", "pdf", path, inspire_updated="2024-01-01T00:00:00")
+    assert manifest.completed("1234.5678", "pdf", "2024-01-01T00:00:00") == path
+    manifest.close()
+
+
+def test_no_source_is_terminal_until_record_changes(tmp_path: Path) -> None:
+    manifest = ArtifactManifest(tmp_path / "manifest.sqlite")
+    manifest.record_no_source("1234.5678", "pdf", inspire_updated="2024-01-01T00:00:00")
+
+    assert manifest.no_source("1234.5678", "2024-01-01T00:00:00") == "pdf"
+    assert manifest.no_source("1234.5678", "2024-06-01T00:00:00") is None
+    assert manifest.completed("1234.5678", "source") is None
+
+    manifest.record_failure("1234.5678", "source")
+    assert manifest.no_source("1234.5678") is None
+    manifest.close()
@@ -0,0 +1,15 @@
+import requests
+
+from bench.mock_server import MockCorpus, MockServer
+
+
+def test_date_query_fails_on_undated_hits() -> None:
+    corpus = MockCorpus.synthesize(3, figure_kb=0, pdf_kb=0)
+    del corpus.hits[0]["metadata"]["earliest_date"]
+    with MockServer(corpus) as server:
+        url = f"{server.inspire_url}/literature"
+        response = requests.get(url, params={"q": "date>=2010-01-01", "size": 10})
+        assert response.status_code == 400
+
+        response = requests.get(url, params={"q": "not date:*", "size": 10})
+        assert response.json()["hits"]["total"] == 1
@@ -0,0 +1,35 @@
+from typing import Iterator
+
+import pytest
+
+from core.pipeline import Pipeline, Stage
+
+
+def test_items_pass_through_every_stage() -> None:
+    pipeline = Pipeline([Stage("double", lambda x: 2 * x, 2), Stage("inc", lambda x: x + 1, 3)])
+    assert sorted(pipeline.run(range(10))) == [2 * x + 1 for x in range(10)]
+
+
+def test_stage_failure_forwards_item() -> None:
+    def fail_on_three(x: int) -> int:
+        if x == 3:
+            raise ValueError("boom")
+        return x
+
+    pipeline = Pipeline([Stage("check", fail_on_three, 1)])
+    assert sorted(pipeline.run(range(5))) == [0, 1, 2, 3, 4]
+    assert pipeline.stats[0].failed == 1
+
+
+def test_source_failure_is_raised_after_draining() -> None:
+    def source() -> Iterator[int]:
+        yield 1
+        yield 2
+        raise RuntimeError("listing failed")
+
+    pipeline = Pipeline([Stage("identity", lambda x: x, 2)])
+    received = []
+    with pytest.raises(RuntimeError, match="listing failed"):
+        for item in pipeline.run(source()):
+            received.append(item)
+    assert sorted(received) == [1, 2]
@@ -0,0 +1,75 @@
+from pathlib import Path
+import time
+
+import pytest
+
+from api_clients.http import HttpTransport
+from api_clients.rate_limit import AdaptiveRateLimiter
+from bench.mock_server import FaultProfile, MockCorpus, MockServer
+
+
+def test_rate_increases_additively_and_decreases_multiplicatively() -> None:
+    limiter = AdaptiveRateLimiter(
+        hosts=["arxiv.org"], initial_rate=0.5, min_rate=0.1, max_rate=0.6, increase=0.05
+    )
+    limiter.on_success("arxiv.org")
+    assert limiter.rate("arxiv.org") == pytest.approx(0.55)
+    for _ in range(5):
+        limiter.on_success("arxiv.org")
+    assert limiter.rate("arxiv.org") == pytest.approx(0.6)
+
+    limiter.on_throttle("arxiv.org")
+    assert limiter.rate("arxiv.org") == pytest.approx(0.3)
+    for _ in range(5):
+        limiter.on_throttle("arxiv.org")
+    assert limiter.rate("arxiv.org") == pytest.approx(0.1)
+
+    # hosts not listed are neither adapted nor paced
+    limiter.on_throttle("inspirehep.net")
+    assert limiter.rate("inspirehep.net") == pytest.approx(0.5)
+
+
+def test_retry_after_blocks_the_host() -> None:
+    limiter = AdaptiveRateLimiter(hosts=["arxiv.org"], initial_rate=100.0, max_rate=100.0)
+    limiter.on_throttle("arxiv.org", retry_after=0.3)
+    start = time.monotonic()
+    limiter.acquire("arxiv.org")
+    assert time.monotonic() - start >= 0.25
+    start = time.monotonic()
+    limiter.acquire("inspirehep.net")
+    assert time.monotonic() - start < 0.1
+
+
+def test_state_persists_across_runs(tmp_path: Path) -> None:
+    state_file = tmp_path / "limits.json"
+    limiter = AdaptiveRateLimiter(hosts=["arxiv.org"], initial_rate=0.4, state_file=state_file)
+    limiter.on_throttle("arxiv.org", retry_after=600)
+
+    restored = AdaptiveRateLimiter(hosts=["arxiv.org"], initial_rate=0.4, state_file=state_file)
+    assert restored.rate("arxiv.org") == pytest.approx(0.2)
+    assert restored._blocked_until["arxiv.org"] > time.time() + 500
+
+    # restored rates are clamped to the bounds of the new run
+    clamped = AdaptiveRateLimiter(hosts=["arxiv.org"], min_rate=0.3, state_file=state_file)
+    assert clamped.rate("arxiv.org") == pytest.approx(0.3)
+
+    state_file.write_text("{not json")
+    assert AdaptiveRateLimiter(state_file=state_file).rate("arxiv.org") == pytest.approx(1 / 3)
+
+
+def test_transport_reports_throttling_to_the_limiter(tmp_path: Path) -> None:
+    corpus = MockCorpus.synthesize(1, seed=0, section_kb=1, figure_kb=1, pdf_kb=1)
+    arxiv_id = MockCorpus.arxiv_id(corpus.hits[0])
+    limiter = AdaptiveRateLimiter(
+        hosts=["127.0.0.1"], initial_rate=100.0, max_rate=100.0, state_file=tmp_path / "s.json"
+    )
+    with MockServer(corpus, faults=FaultProfile(latency=0.0, throttle_rate=1.0)) as server:
+        with HttpTransport(retries=0, limiter=limiter) as transport:
+            response = transport.get(f"{server.arxiv_url}/pdf/{arxiv_id}.pdf")
+
+    assert response.status_code == 429
+    assert limiter.rate("127.0.0.1") == pytest.approx(50.0)
+    # closing the transport saved the adapted rate
+    assert AdaptiveRateLimiter(
+        hosts=["127.0.0.1"], max_rate=100.0, state_file=tmp_path / "s.json"
+    ).rate("127.0.0.1") == pytest.approx(50.0)
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from bench.mock_server import MockCorpus, MockServer
+from core.metadata_store import METADATA_FILE, load_papers, papers_to_table, write_papers
+from scripts.refresh_citations import refresh_citations
+
+
+def test_refresh_citations_updates_counts_only(tmp_path: Path) -> None:
+    corpus = MockCorpus.synthesize(3, figure_kb=0, pdf_kb=0)
+    arxiv_ids = [MockCorpus.arxiv_id(hit) for hit in corpus.hits]
+    metadata = tmp_path / METADATA_FILE
+    write_papers(
+        papers_to_table(
+            {"arxiv_id": arxiv_id, "title": arxiv_id, "citations": -1, "run_period": "Run2"}
+            for arxiv_id in arxiv_ids
+        ),
+        metadata,
+    )
+
+    with MockServer(corpus) as server:
+        assert refresh_citations(metadata, inspire_url=server.inspire_url) == 3
+
+    stored = dict(
+        zip(*load_papers(metadata, columns=["arxiv_id", "citations"]).to_pydict().values())
+    )
+    assert stored == {
+        MockCorpus.arxiv_id(hit): hit["metadata"]["citation_count"] for hit in corpus.hits
+    }
+    # no download directories next to the metadata store
+    assert sorted(p.name for p in tmp_path.iterdir()) == [METADATA_FILE]
@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+import requests
+
+from api_clients.http import HttpTransport
+from api_clients.rate_limit import AdaptiveRateLimiter
+from bench.mock_server import FaultProfile, MockCorpus, MockServer
+from core.models import LHCbPaper
+from core.sync_store import SyncStore
+from scripts.build_lhcb_corpus import CorpusBuilder, CorpusConfig
+
+
+def _paper(control_number: Any, updated: str) -> LHCbPaper:
+    return LHCbPaper(
+        lhcb_paper_id=None,
+        title="A measurement",
+        run_period=None,
+        abstract="",
+        arxiv_id="2101.00001",
+        control_number=control_number,
+        updated=updated,
+    )
+
+
+def test_records_are_current_until_updated(tmp_path: Path) -> None:
+    path = tmp_path / "sync.sqlite"
+    with SyncStore(path) as store:
+        paper = _paper(1_000_000, "2024-01-01T00:00:00+00:00")
+        assert store.last_sync() is None
+        assert not store.is_current(paper)
+        store.record(paper)
+        store.set_last_sync("2024-02-01")
+
+    with SyncStore(path) as store:
+        assert store.last_sync() == "2024-02-01"
+        assert store.is_current(paper)
+        assert not store.is_current(_paper(1_000_000, "2024-03-01T00:00:00+00:00"))
+        # records without a control number cannot be matched across runs
+        store.record(_paper(None, "2024-01-01T00:00:00+00:00"))
+        assert not store.is_current(_paper(None, "2024-01-01T00:00:00+00:00"))
+
+
+def _build(tmp_path: Path, server: MockServer, **overrides: Any) -> SyncStore:
+    """Run an incremental build against the mock server and return its sync store."""
+    config = CorpusConfig(
+        **{
+            "start_date": None,
+            "end_date": None,
+            "max_papers": None,
+            "download": True,
+            "output_dir": tmp_path / "corpus",
+            "verbose": False,
+            "incremental": True,
+            "inspire_url": server.inspire_url,
+            "arxiv_url": server.arxiv_url,
+            "arxiv_export_url": server.arxiv_url,
+            "log_file": tmp_path / "corpus_build.log",
+            **overrides,
+        }
+    )
+    transport = HttpTransport(retries=0, limiter=AdaptiveRateLimiter(hosts=()))
+    with transport, CorpusBuilder(config, transport=transport) as builder:
+        builder.build()
+    return SyncStore(config.output_dir / "inspire_sync.sqlite")
+
+
+def _downloads(server: MockServer) -> Dict[str, int]:
+    """Return the number of requests per PDF and e-print path."""
+    return {
+        path: n for path, n in server.stats.attempts.items() if not path.startswith("/api")
+    }
+
+
+@pytest.fixture
+def corpus() -> MockCorpus:
+    return MockCorpus.synthesize(3, seed=0, section_kb=1, figure_kb=1, pdf_kb=1)
+
+
+def test_sync_date_advances_after_a_complete_build(tmp_path: Path, corpus: MockCorpus) -> None:
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    with MockServer(corpus, faults=FaultProfile(latency=0.0)) as server:
+        with _build(tmp_path, server) as store:
+            assert store.last_sync() == today
+        downloads = _downloads(server)
+        assert sum(downloads.values()) == 6
+        # every record is current: the next run lists them and downloads nothing
+        with _build(tmp_path, server) as store:
+            assert store.last_sync() == today
+        assert _downloads(server) == downloads
+
+
+def test_sync_date_stays_while_a_paper_failed(tmp_path: Path, corpus: MockCorpus) -> None:
+    failing = MockCorpus.arxiv_id(corpus.hits[0])
+    del corpus.eprints[failing], corpus.pdfs[failing]
+    corpus.hits[0]["metadata"]["abstracts"] = []
+
+    with MockServer(corpus, faults=FaultProfile(latency=0.0)) as server:
+        with _build(tmp_path, server) as store:
+            assert store.last_sync() is None
+            # the other papers are not downloaded again
+            current = [
+                store.is_current(paper)
+                for paper in [
+                    _paper(hit["metadata"]["control_number"], hit["updated"])
+                    for hit in corpus.hits
+                ]
+            ]
+            assert current == [False, True, True]
+
+
+@pytest.mark.parametrize("overrides", [{"max_papers": 2}, {"download": False}])
+def test_sync_date_stays_after_a_partial_build(
+    tmp_path: Path, corpus: MockCorpus, overrides: dict
+) -> None:
+    with MockServer(corpus, faults=FaultProfile(latency=0.0)) as server:
+        with _build(tmp_path, server, **overrides) as store:
+            assert store.last_sync() is None
+
+
+def test_sync_date_stays_when_the_listing_fails(tmp_path: Path, corpus: MockCorpus) -> None:
+    with MockServer(corpus, faults=FaultProfile(latency=0.0, error_rate=1.0)) as server:
+        with pytest.raises(requests.RequestException):
+            _build(tmp_path, server)
+    with SyncStore(tmp_path / "corpus" / "inspire_sync.sqlite") as store:
+        assert store.last_sync() is None